@@ -0,0 +1,111 @@
+"""Benchmark decrypt_image on 100 KB to 10 MB images.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_decrypt
+"""
+
+from __future__ import annotations
+
+from hashlib import md5
+import io
+import os
+import time
+
+from Crypto.Cipher import AES
+
+from pyezvizapi.utils import ImageDecryptor, decrypt_image, decrypt_image_stream
+
+PASSWORD = "ABCDEF"
+SIZES = [100 * 1024, 1024 * 1024, 4 * 1024 * 1024, 10 * 1024 * 1024]
+SNAPSHOT_SIZE = 8 * 1024
+SNAPSHOT_COUNT = 2000
+
+
+def encrypt_image(data: bytes, password: str = PASSWORD) -> bytes:
+    """Build a 'hikencodepicture' payload the way cameras do."""
+    key = str.encode(password.ljust(16, "\u0000")[:16])
+    iv_code = bytes([48, 49, 50, 51, 52, 53, 54, 55, 0, 0, 0, 0, 0, 0, 0, 0])
+    padding = AES.block_size - len(data) % AES.block_size
+    passwd_hash = md5(str.encode(md5(str.encode(password)).hexdigest())).hexdigest()
+    return (
+        b"hikencodepicture"
+        + str.encode(passwd_hash)
+        + AES.new(key, AES.MODE_CBC, iv_code).encrypt(data + bytes([padding]) * padding)
+    )
+
+
+def decrypt_image_concat(input_data: bytes, password: str) -> bytes:
+    """Previous implementation, growing the output with += per chunk."""
+    key = str.encode(password.ljust(16, "\u0000")[:16])
+    iv_code = bytes([48, 49, 50, 51, 52, 53, 54, 55, 0, 0, 0, 0, 0, 0, 0, 0])
+    cipher = AES.new(key, AES.MODE_CBC, iv_code)
+
+    next_chunk = b""
+    output_data = b""
+    finished = False
+    i = 48
+    chunk_size = 1024 * AES.block_size
+    while not finished:
+        chunk, next_chunk = next_chunk, cipher.decrypt(input_data[i : i + chunk_size])
+        if len(next_chunk) == 0:
+            padding_length = chunk[-1]
+            chunk = chunk[:-padding_length]
+            finished = True
+        output_data += chunk
+        i += chunk_size
+    return output_data
+
+
+def best_of(func, repeat: int = 5) -> float:
+    """Return the fastest run time in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def decrypt_image_uncached(input_data: bytes, password: str) -> bytes:
+    """Derive key material on every call, as before the cached decryptor."""
+    passwd_hash = md5(str.encode(md5(str.encode(password)).hexdigest())).hexdigest()
+    if input_data[16:48] != str.encode(passwd_hash):
+        raise ValueError("Invalid password")
+    return ImageDecryptor(password).decrypt(input_data)
+
+
+def main() -> None:
+    """Print timings for every implementation and size."""
+    print(f"{'size':>10} {'concat':>10} {'buffer':>10} {'stream':>10}")
+    for size in SIZES:
+        plain = os.urandom(size)
+        encrypted = encrypt_image(plain)
+        assert decrypt_image(encrypted, PASSWORD) == plain
+
+        concat = best_of(lambda: decrypt_image_concat(encrypted, PASSWORD))
+        buffer = best_of(lambda: decrypt_image(encrypted, PASSWORD))
+        stream = best_of(
+            lambda: decrypt_image_stream(io.BytesIO(encrypted), PASSWORD, io.BytesIO())
+        )
+        print(
+            f"{size // 1024:>8}KB {concat * 1000:>8.2f}ms "
+            f"{buffer * 1000:>8.2f}ms {stream * 1000:>8.2f}ms"
+        )
+
+    snapshots = [
+        encrypt_image(os.urandom(SNAPSHOT_SIZE)) for _ in range(SNAPSHOT_COUNT)
+    ]
+    decryptor = ImageDecryptor(PASSWORD)
+    uncached = best_of(
+        lambda: [decrypt_image_uncached(image, PASSWORD) for image in snapshots], 3
+    )
+    cached = best_of(lambda: list(decryptor.decrypt_many(snapshots)), 3)
+    print(
+        f"{SNAPSHOT_COUNT} x {SNAPSHOT_SIZE // 1024}KB snapshots: "
+        f"uncached {uncached * 1000:.1f}ms, decrypt_many {cached * 1000:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
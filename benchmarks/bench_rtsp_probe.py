@@ -0,0 +1,79 @@
+"""Probe a fleet of local RTSP stand-in cameras concurrently.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_rtsp_probe [cameras]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import statistics
+import sys
+import time
+
+from pyezvizapi.rtsp_probe import RTSPStreamProbe
+from pyezvizapi.rtsp_scanner import RTSPCredentialScanner
+
+from .rtsp_server import RTSPStandInServer
+
+PASSWORD = "ABCDEF"
+
+
+async def run(cameras: int) -> None:
+    """Start stand-in cameras, then scan and probe all of them."""
+    servers = [
+        RTSPStandInServer(password=PASSWORD, first_packet_delay=0.01 * (i % 10))
+        for i in range(cameras)
+    ]
+    for server in servers:
+        await server.start()
+
+    targets = [
+        {"host": "127.0.0.1", "port": server.port, "password": PASSWORD}
+        for server in servers
+    ]
+    # One camera with a wrong password, and one port nobody listens on.
+    targets[0] = {**targets[0], "password": "wrong"}
+    await servers[-1].stop()
+
+    start = time.perf_counter()
+    scanned = await RTSPCredentialScanner(timeout=2).scan(targets)
+    print(
+        f"scan: {sum(1 for r in scanned if r.valid)} valid, "
+        f"{sum(1 for r in scanned if r.valid is False)} invalid, "
+        f"{sum(1 for r in scanned if r.valid is None)} errors "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+
+    start = time.perf_counter()
+    probed = await RTSPStreamProbe(timeout=2, duration=1).probe_many(targets)
+    elapsed = time.perf_counter() - start
+    available = [r for r in probed if r.available]
+    print(f"probe: {len(available)}/{len(probed)} streams available in {elapsed:.2f}s")
+    for result in probed:
+        if not result.available:
+            print(f"  {result.port}: {result.stage} {result.error}")
+    if available:
+        ttfp = [r.time_to_first_packet * 1000 for r in available]
+        print(
+            f"  time to first packet ms: median {statistics.median(ttfp):.1f} "
+            f"max {max(ttfp):.1f}"
+        )
+        print(
+            "  jitter ms: median "
+            f"{statistics.median(r.jitter_ms or 0 for r in available):.2f}, "
+            f"packets: {sum(r.packets for r in available)}"
+        )
+
+    for server in servers[:-1]:
+        await server.stop()
+
+
+def main() -> None:
+    """Parse the camera count and run."""
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 50))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Benchmark CLI startup: import time and heavy modules loaded.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_startup
+"""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+
+RUNS = 7
+HEAVY_MODULES = ["pandas", "numpy", "paho", "Crypto", "requests", "asyncio", "sqlite3"]
+
+# Each snippet imports what one kind of CLI invocation imports.
+SCENARIOS = {
+    "import pyezvizapi": "import pyezvizapi",
+    "cli: parse only": (
+        "import pyezvizapi.__main__ as m; "
+        "m.build_parser().parse_args(['-u', 'u', '-p', 'p', 'camera', '--serial', "
+        "'X', 'move', '--direction', 'up'])"
+    ),
+    "cli: camera command": (
+        "import pyezvizapi.__main__ as m; from pyezvizapi.client import EzvizClient; "
+        "from pyezvizapi.camera import EzvizCamera"
+    ),
+    "cli: mqtt command": (
+        "import pyezvizapi.__main__ as m; from pyezvizapi.client import EzvizClient; "
+        "from pyezvizapi.mqtt import MQTTClient"
+    ),
+}
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(elapsed, ",".join(heavy))
+"""
+
+
+def measure(code: str) -> tuple[float, str]:
+    """Return the fastest import time in a fresh interpreter, and heavy modules."""
+    timings = []
+    heavy = ""
+    for _ in range(RUNS):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(code=code, heavy=HEAVY_MODULES)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.split()
+        timings.append(float(output[0]))
+        heavy = output[1] if len(output) > 1 else "-"
+    return min(timings), heavy
+
+
+def main() -> None:
+    """Print import times per scenario."""
+    for name, code in SCENARIOS.items():
+        elapsed, heavy = measure(code)
+        print(f"{name:<22} {elapsed * 1000:7.1f}ms  loaded: {heavy}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Benchmark xor_enc_dec against the previous per byte implementation.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_xor
+"""
+
+from __future__ import annotations
+
+from io import BytesIO
+from itertools import cycle
+import os
+import time
+
+from pyezvizapi.cas_codec import xor_enc_dec
+from pyezvizapi.constants import XOR_KEY
+
+SIZES = [9, 256, 4 * 1024, 64 * 1024, 1024 * 1024]
+
+
+def xor_enc_dec_bytewise(msg, xor_key=XOR_KEY):
+    """Previous implementation, a generator over every byte."""
+    with BytesIO(msg) as stream:
+        xor_msg = bytes(a ^ b for a, b in zip(stream.read(), cycle(xor_key)))
+    return xor_msg
+
+
+def per_call(func, data: bytes) -> float:
+    """Return the fastest time per call in seconds, running about 0.2s per round."""
+    iterations = max(1, 200_000 // max(len(data), 1))
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func(data)
+        timings.append((time.perf_counter() - start) / iterations)
+    return min(timings)
+
+
+def main() -> None:
+    """Print time per call and per byte for both implementations."""
+    print(
+        f"{'size':>9} {'bytewise':>12} {'bulk':>12} "
+        f"{'ns/B before':>12} {'ns/B after':>11}"
+    )
+    for size in SIZES:
+        data = os.urandom(size)
+        assert xor_enc_dec(data) == xor_enc_dec_bytewise(data)
+
+        before = per_call(xor_enc_dec_bytewise, data)
+        after = per_call(xor_enc_dec, data)
+        print(
+            f"{size:>8}B {before * 1e6:>10.2f}us {after * 1e6:>10.2f}us "
+            f"{before / size * 1e9:>12.2f} {after / size * 1e9:>11.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
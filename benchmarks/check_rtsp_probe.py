@@ -0,0 +1,108 @@
+"""Check the RTSP probe and scanner against local stand-in cameras.
+
+Run from the repository root, exits with status 1 on a failed check:
+
+    python -m benchmarks.check_rtsp_probe
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+
+from pyezvizapi.rtsp_probe import RTSPProbeResult, RTSPStreamProbe
+from pyezvizapi.rtsp_scanner import RTSPCredentialScanner
+
+from .rtsp_server import RTSPStandInServer
+
+PASSWORD = "ABCDEF"
+
+
+async def probe(server: RTSPStandInServer, **kwargs) -> RTSPProbeResult:
+    """Start the server, probe it once and stop it."""
+    port = await server.start()
+    try:
+        return await RTSPStreamProbe(timeout=1, duration=1).probe(
+            "127.0.0.1", port, **{"password": PASSWORD, **kwargs}
+        )
+    finally:
+        await server.stop()
+
+
+async def check_digest() -> list[str]:
+    """Digest credentials are accepted by the probe and the scanner."""
+    failures = []
+    result = await probe(RTSPStandInServer(password=PASSWORD))
+    if not (result.available and result.stage == "ok" and result.error is None):
+        failures.append(f"digest: valid password not available: {result}")
+
+    result = await probe(RTSPStandInServer(password=PASSWORD), password="wrong")
+    if result.available or result.stage != "describe" or result.status != 401:
+        failures.append(f"digest: wrong password not rejected: {result}")
+
+    server = RTSPStandInServer(password=PASSWORD)
+    port = await server.start()
+    valid, invalid = await RTSPCredentialScanner(timeout=1).scan(
+        [
+            {"host": "127.0.0.1", "port": port, "password": PASSWORD},
+            {"host": "127.0.0.1", "port": port, "password": "wrong"},
+        ]
+    )
+    await server.stop()
+    if valid.valid is not True or valid.auth != "digest":
+        failures.append(f"digest: scanner rejected the valid password: {valid}")
+    if invalid.valid is not False:
+        failures.append(f"digest: scanner accepted a wrong password: {invalid}")
+    return failures
+
+
+async def check_jitter() -> list[str]:
+    """Random packet delays show up as interarrival jitter."""
+    steady = await probe(RTSPStandInServer(fps=50, jitter=0))
+    jittery = await probe(RTSPStandInServer(fps=50, jitter=0.03))
+    if not (steady.available and jittery.available):
+        return [f"jitter: streams not available: {steady} {jittery}"]
+    if not (jittery.jitter_ms or 0) > max(steady.jitter_ms or 0, 2):
+        return [
+            f"jitter: {jittery.jitter_ms}ms with 30ms random delay, "
+            f"{steady.jitter_ms}ms without"
+        ]
+    return []
+
+
+async def check_timeout() -> list[str]:
+    """A stream without packets and a dead port time out at the right stage."""
+    failures = []
+    result = await probe(RTSPStandInServer(first_packet_delay=3))
+    if result.available or result.stage != "stream" or result.error != "Timed out":
+        failures.append(f"timeout: silent stream not reported: {result}")
+
+    server = RTSPStandInServer()
+    port = await server.start()
+    await server.stop()
+    result = await RTSPStreamProbe(timeout=1).probe("127.0.0.1", port)
+    if result.available or result.stage != "connect" or result.error is None:
+        failures.append(f"timeout: closed port not reported: {result}")
+    return failures
+
+
+async def run() -> list[str]:
+    """Run every check and return the failures."""
+    failures = []
+    for check in (check_digest, check_jitter, check_timeout):
+        found = await check()
+        print(f"{check.__name__:<14} {'FAIL' if found else 'ok'}")
+        failures += found
+    return failures
+
+
+def main() -> int:
+    """Run the checks from the command line."""
+    failures = asyncio.run(run())
+    for failure in failures:
+        print(failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
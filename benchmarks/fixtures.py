@@ -0,0 +1,169 @@
+"""Synthetic API payloads for the benchmark suite.
+
+The shapes follow what the Ezviz API returns for a pagelist request with
+the full section filter, one camera in every LIGHT_BULB_EVERY devices is a
+light bulb. Everything is deterministic so runs are comparable.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+LIGHT_BULB_EVERY = 10
+PAGE_SIZE = 30
+
+
+def serial(index: int) -> str:
+    """Return the serial of the index-th device."""
+    return f"BF{index:07d}"
+
+
+def _device_info(index: int) -> dict[str, Any]:
+    """Return the deviceInfos entry of one device."""
+    light_bulb = index % LIGHT_BULB_EVERY == LIGHT_BULB_EVERY - 1
+    return {
+        "deviceSerial": serial(index),
+        "name": f"Device {index}",
+        "version": "V5.3.8 build 230101",
+        "status": 1 if index % 7 else 2,
+        "deviceCategory": "lighting" if light_bulb else "IPC",
+        "deviceSubCategory": "LB1" if light_bulb else "C6N",
+        "mac": "00:11:22:" + ":".join(
+            f"{index >> shift & 255:02x}" for shift in (16, 8, 0)
+        ),
+        "offlineNotify": 0,
+        "offlineTime": "2024-01-01 00:00:00",
+        "channelNumber": 1,
+        "hik": True,
+        "supportExt": json.dumps({str(key): str(key % 3) for key in range(1, 120)}),
+        "ezDeviceCapability": json.dumps({"ptz": 1, "talk": 1}),
+    }
+
+
+def _feature(index: int) -> dict[str, Any]:
+    """Return the FEATURE section of a light bulb."""
+    return {
+        "featureJson": json.dumps(
+            {
+                "productId": "LB1-A",
+                "featureItemDtos": [
+                    {"itemKey": "light_switch", "dataValue": index % 2 == 0},
+                    {"itemKey": "brightness", "dataValue": index % 100},
+                    {"itemKey": "color_temperature", "dataValue": 4000},
+                ],
+            }
+        )
+    }
+
+
+def page(offset: int, count: int, total: int) -> dict[str, Any]:
+    """Return one pagelist response with devices offset to offset + count."""
+    indexes = range(offset, min(offset + count, total))
+    resource = {index: f"res{index:07d}" for index in indexes}
+    return {
+        "meta": {"code": 200},
+        "page": {"offset": offset, "limit": count, "hasNext": offset + count < total},
+        "deviceInfos": [_device_info(index) for index in indexes],
+        "resourceInfos": [
+            {"deviceSerial": serial(index), "resourceId": resource[index]}
+            for index in indexes
+        ],
+        "CLOUD": {
+            resource[index]: {"deviceSerial": serial(index), "status": 1}
+            for index in indexes
+        },
+        "VTM": {resource[index]: {"domain": "vtm.example"} for index in indexes},
+        "CHANNEL": {resource[index]: {"channelNo": 1} for index in indexes},
+        "VIDEO_QUALITY": {resource[index]: [{"videoLevel": 2}] for index in indexes},
+        "STATUS": {
+            serial(index): {
+                "globalStatus": 1,
+                "isEncrypt": 0,
+                "alarmSoundMode": index % 3,
+                "upgradeStatus": -1,
+                "optionals": {
+                    "powerRemaining": str(index % 100),
+                    "timeZone": "UTC+01:00",
+                    "Alarm_Light": json.dumps({"luminance": 50}),
+                    "Alarm_DetectHumanCar": json.dumps({"type": 1}),
+                    "diskCapacity": "119000,0",
+                    "NightVision_Model": json.dumps({"graphicType": 0}),
+                },
+            }
+            for index in indexes
+        },
+        "SWITCH": {
+            serial(index): [
+                {"type": switch, "enable": bool((index + switch) % 2)}
+                for switch in (1, 3, 7, 21, 22, 29)
+            ]
+            for index in indexes
+        },
+        "CONNECTION": {
+            serial(index): {
+                "localIp": "192.168.1.2",
+                "netIp": "1.2.3.4",
+                "localRtspPort": 554,
+            }
+            for index in indexes
+        },
+        "WIFI": {
+            serial(index): {"address": "192.168.1.2", "signal": 80}
+            for index in indexes
+        },
+        "TIME_PLAN": {serial(index): [{"type": 2, "enable": 1}] for index in indexes},
+        "NODISTURB": {
+            serial(index): {"alarmEnable": 0, "callingEnable": 0}
+            for index in indexes
+        },
+        "UPGRADE": {serial(index): {"isNeedUpgrade": 0} for index in indexes},
+        "FEATURE": {
+            serial(index): _feature(index)
+            for index in indexes
+            if index % LIGHT_BULB_EVERY == LIGHT_BULB_EVERY - 1
+        },
+        "P2P": {serial(index): [] for index in indexes},
+        "KMS": {serial(index): {"secretKey": "x"} for index in indexes},
+        "QOS": {serial(index): {"opened": 1} for index in indexes},
+        "CUSTOM_TAG": {serial(index): {} for index in indexes},
+        "FEATURE_INFO": {serial(index): {} for index in indexes},
+    }
+
+
+def page_list(total: int) -> dict[str, Any]:
+    """Return all devices in one response, as merged by _api_get_pagelist."""
+    return page(0, total, total)
+
+
+def alarm_info() -> dict[str, Any]:
+    """Return a get_alarminfo response with one old alarm."""
+    return {
+        "meta": {"code": 200},
+        "page": {"totalResults": 1},
+        "alarms": [
+            {
+                "alarmId": "1",
+                "alarmStartTimeStr": "2024-01-01 12:00:00",
+                "alarmType": 10000,
+                "sampleName": "Motion",
+                "picUrl": "https://example.invalid/pic.jpg",
+            }
+        ],
+    }
+
+
+def mqtt_payload(index: int) -> bytes:
+    """Return an MQTT push message for the index-th device."""
+    ext = [
+        "1",
+        "2024-01-01 12:00:00",
+        serial(index),
+        "1",
+        "10000",
+        *["0"] * 11,
+        "https://example.invalid/pic.jpg",
+    ]
+    return json.dumps(
+        {"id": str(index), "alert": "Motion detected", "ext": ",".join(ext)}
+    ).encode()
@@ -0,0 +1,411 @@
+"""Load test EzvizClient against an in-process mock of the Ezviz API.
+
+Run from the repository root:
+
+    python -m benchmarks.loadtest --accounts 20 --devices 30 --duration 120
+    python -m benchmarks.loadtest --latency 80 --jitter 30 --error-rate 0.02
+    python -m benchmarks.loadtest --duration 600 --speed 30 --json load.json
+
+Every account gets its own EzvizClient and thread running a polling mix:
+a full device refresh, alarm polls of every camera, PTZ bursts and switch
+toggles. The intervals are in seconds of simulated time, --speed runs
+that many simulated seconds per real second, so hours of polling fit in
+a few minutes. Requests never leave the process, a requests adapter
+mounted on each client answers them after the injected latency. With
+--error-rate, some requests get a 401 and the client refreshes its
+session and retries. With --fail-rate, some get a 500 that reaches the
+caller.
+
+Throughput, p50/p95/p99 latency per operation, retries, failures and
+traced memory are printed every --report seconds and at the end.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections import Counter, defaultdict
+import heapq
+import json
+import random
+import re
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Any
+
+import requests
+from requests.adapters import BaseAdapter
+
+from pyezvizapi.client import EzvizClient
+
+from . import fixtures
+
+# Simulated seconds between two runs of each operation.
+WORKLOAD = {
+    "refresh": 30.0,
+    "alarm_poll": 5.0,
+    "ptz_burst": 60.0,
+    "switch_toggle": 45.0,
+}
+PTZ_BURST_MOVES = 5
+
+PAGELIST = re.compile(r"/v3/userdevices/v1/resources/pagelist$")
+ALARMS = re.compile(r"/v3/alarms/v2/advanced$")
+PTZ = re.compile(r"/v3/devices/[^/]+/ptzControl$")
+SWITCH = re.compile(r"/v3/devices/[^/]+/\d+/\d+/\d+/switchStatus$")
+REFRESH = re.compile(r"/v3/apigateway/login$")
+
+OK = json.dumps({"meta": {"code": 200}})
+
+# The client logs in again and retries these after a 401, PTZ fails.
+RETRIED_ENDPOINTS = {"pagelist", "alarms", "switch"}
+
+
+class MockEzvizAPI(BaseAdapter):
+    """Answer Ezviz API requests from fixtures, with latency and errors."""
+
+    def __init__(
+        self,
+        devices: int,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        fail_rate: float = 0.0,
+        seed: int | None = None,
+    ) -> None:
+        """Initialize the mock with a fleet of devices per account."""
+        super().__init__()
+        self._pages = {
+            offset: json.dumps(fixtures.page(offset, fixtures.PAGE_SIZE, devices))
+            for offset in range(0, max(devices, 1), fixtures.PAGE_SIZE)
+        }
+        self._alarms = json.dumps(fixtures.alarm_info())
+        self._latency = latency
+        self._jitter = jitter
+        self._error_rate = error_rate
+        self._fail_rate = fail_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests: Counter[str] = Counter()
+        self.injected: Counter[str] = Counter()
+        self.retried = 0
+
+    def _endpoint(self, path: str) -> str:
+        """Return a short name for the requested endpoint."""
+        for name, pattern in (
+            ("pagelist", PAGELIST),
+            ("alarms", ALARMS),
+            ("ptz", PTZ),
+            ("switch", SWITCH),
+            ("refresh", REFRESH),
+        ):
+            if pattern.search(path):
+                return name
+        return "unknown"
+
+    def _answer(self, endpoint: str, request: requests.PreparedRequest) -> tuple:
+        """Return status code and body for a request."""
+        if endpoint == "pagelist":
+            offset = int(re.search(r"[?&]offset=(\d+)", request.url).group(1))
+            return 200, self._pages[offset]
+        if endpoint == "alarms":
+            return 200, self._alarms
+        if endpoint in ("ptz", "switch"):
+            return 200, OK
+        if endpoint == "refresh":
+            session = f"{self._random.getrandbits(64):016x}"
+            return 200, json.dumps(
+                {
+                    "meta": {"code": 200},
+                    "sessionInfo": {"sessionId": session, "refreshSessionId": session},
+                }
+            )
+        return 404, json.dumps({"meta": {"code": 404}})
+
+    def send(  # pylint: disable=arguments-differ
+        self, request: requests.PreparedRequest, **kwargs: Any
+    ) -> requests.Response:
+        """Answer one request after the injected latency."""
+        endpoint = self._endpoint(request.path_url.split("?")[0])
+
+        with self._lock:
+            self.requests[endpoint] += 1
+            delay = max(0.0, self._random.gauss(self._latency, self._jitter))
+            roll = self._random.random()
+
+        time.sleep(delay)
+
+        status, body = self._answer(endpoint, request)
+        if endpoint != "refresh" and roll < self._error_rate:
+            status, body = 401, json.dumps({"meta": {"code": 401}})
+        elif endpoint != "refresh" and roll < self._error_rate + self._fail_rate:
+            status, body = 500, json.dumps({"meta": {"code": 500}})
+        if status >= 400:
+            with self._lock:
+                self.injected[str(status)] += 1
+                if status == 401 and endpoint in RETRIED_ENDPOINTS:
+                    self.retried += 1
+
+        response = requests.Response()
+        response.status_code = status
+        response._content = body.encode()  # pylint: disable=protected-access
+        response.headers["Content-Type"] = "application/json"
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+class Metrics:
+    """Collect operation latencies and failures from all accounts."""
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self._lock = threading.Lock()
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.failures: Counter[str] = Counter()
+        self._window: list[float] = []
+
+    def record(self, operation: str, elapsed: float, failed: bool) -> None:
+        """Record one finished operation."""
+        with self._lock:
+            self.latencies[operation].append(elapsed)
+            self._window.append(elapsed)
+            if failed:
+                self.failures[operation] += 1
+
+    def take_window(self) -> list[float]:
+        """Return and reset the latencies since the last call."""
+        with self._lock:
+            window, self._window = self._window, []
+        return window
+
+
+def percentiles(values: list[float]) -> tuple[float, float, float]:
+    """Return p50, p95 and p99 of values in seconds."""
+    if not values:
+        return 0.0, 0.0, 0.0
+    if len(values) == 1:
+        return values[0], values[0], values[0]
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return cuts[49], cuts[94], cuts[98]
+
+
+class Account:
+    """One client polling its fleet on the workload schedule."""
+
+    def __init__(
+        self, number: int, adapter: MockEzvizAPI, metrics: Metrics, speed: float
+    ) -> None:
+        """Create the client, already logged in, with the mock mounted."""
+        self.client = EzvizClient(
+            token={
+                "session_id": f"session{number}",
+                "rf_session_id": f"refresh{number}",
+                "username": f"user{number}",
+                "api_url": "api.loadtest.invalid",
+                "service_urls": {"pushAddr": "push.loadtest.invalid"},
+            }
+        )
+        # pylint: disable=protected-access
+        self.client._session.mount("https://", adapter)
+        self._metrics = metrics
+        self._speed = speed
+        self._random = random.Random(number)
+        self._cameras: list[str] = []
+
+    def _run_operation(self, operation: str) -> None:
+        """Run one operation of the workload."""
+        if operation == "refresh" or not self._cameras:
+            self._cameras = list(self.client.load_cameras())
+            return
+
+        if operation == "alarm_poll":
+            for serial in self._cameras:
+                self.client.get_alarminfo(serial)
+
+        elif operation == "ptz_burst":
+            serial = self._random.choice(self._cameras)
+            for _ in range(PTZ_BURST_MOVES):
+                direction = self._random.choice(["UP", "DOWN", "LEFT", "RIGHT"])
+                self.client.ptz_control(direction, serial, "START")
+                self.client.ptz_control(direction, serial, "STOP")
+
+        elif operation == "switch_toggle":
+            serial = self._random.choice(self._cameras)
+            self.client.switch_status(serial, 7, self._random.randint(0, 1))
+
+    def run(self, stop: threading.Event) -> None:
+        """Run operations when they are due until stop is set."""
+        start = time.monotonic()
+        # Spread the first runs so accounts do not poll in lock step.
+        queue = [
+            (self._random.uniform(0, interval) / self._speed, operation)
+            for operation, interval in WORKLOAD.items()
+        ]
+        heapq.heapify(queue)
+
+        while not stop.is_set():
+            due, operation = heapq.heappop(queue)
+            if stop.wait(max(0.0, start + due - time.monotonic())):
+                return
+
+            began = time.perf_counter()
+            failed = False
+            try:
+                self._run_operation(operation)
+            except Exception:  # pylint: disable=broad-except
+                failed = True
+            self._metrics.record(operation, time.perf_counter() - began, failed)
+
+            heapq.heappush(queue, (due + WORKLOAD[operation] / self._speed, operation))
+
+
+def main() -> int:
+    """Run the load test from the command line."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest")
+    parser.add_argument("--accounts", type=int, default=10)
+    parser.add_argument("--devices", type=int, default=20, help="Devices per account")
+    parser.add_argument(
+        "--duration", type=float, default=60, help="Real seconds to run"
+    )
+    parser.add_argument(
+        "--speed", type=float, default=1, help="Simulated seconds per real second"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=50, help="Mean API latency in ms"
+    )
+    parser.add_argument("--jitter", type=float, default=20, help="Latency stdev in ms")
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of 401 answers"
+    )
+    parser.add_argument(
+        "--fail-rate", type=float, default=0.0, help="Share of 500 answers"
+    )
+    parser.add_argument(
+        "--report", type=float, default=10, help="Seconds between progress lines"
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", help="Write the summary to this file")
+    args = parser.parse_args()
+
+    tracemalloc.start()
+
+    adapter = MockEzvizAPI(
+        args.devices,
+        args.latency / 1000,
+        args.jitter / 1000,
+        args.error_rate,
+        args.fail_rate,
+        args.seed,
+    )
+    metrics = Metrics()
+    stop = threading.Event()
+    threads = [
+        threading.Thread(
+            target=Account(number, adapter, metrics, args.speed).run,
+            args=(stop,),
+            daemon=True,
+        )
+        for number in range(args.accounts)
+    ]
+
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+
+    print(
+        f"{'time':>6} {'ops/s':>7} {'req/s':>7} {'p50':>8} {'p95':>8} {'p99':>8} "
+        f"{'401':>5} {'500':>5} {'failed':>6} {'memory':>9}"
+    )
+    requests_before = 0
+    # Growth is measured from the first report, after the clients warmed up.
+    memory_start: int | None = None
+    try:
+        while time.monotonic() - started < args.duration:
+            time.sleep(min(args.report, args.duration - (time.monotonic() - started)))
+            window = metrics.take_window()
+            total_requests = sum(adapter.requests.values())
+            p50, p95, p99 = percentiles(window)
+            memory = tracemalloc.get_traced_memory()[0]
+            if memory_start is None:
+                memory_start = memory
+            elapsed = time.monotonic() - started
+            print(
+                f"{elapsed:>5.0f}s {len(window) / args.report:>7.1f} "
+                f"{(total_requests - requests_before) / args.report:>7.1f} "
+                f"{p50 * 1e3:>6.0f}ms {p95 * 1e3:>6.0f}ms {p99 * 1e3:>6.0f}ms "
+                f"{adapter.injected['401']:>5} {adapter.injected['500']:>5} "
+                f"{sum(metrics.failures.values()):>6} "
+                f"{memory / 2**20:>7.1f}MB",
+                flush=True,
+            )
+            requests_before = total_requests
+
+    except KeyboardInterrupt:
+        pass
+
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    memory_end, memory_peak = tracemalloc.get_traced_memory()
+
+    operations = {}
+    for operation, values in sorted(metrics.latencies.items()):
+        p50, p95, p99 = percentiles(values)
+        operations[operation] = {
+            "count": len(values),
+            "per_second": len(values) / elapsed,
+            "failed": metrics.failures[operation],
+            "p50": p50,
+            "p95": p95,
+            "p99": p99,
+        }
+
+    summary = {
+        "accounts": args.accounts,
+        "devices": args.devices,
+        "seconds": elapsed,
+        "simulated_seconds": elapsed * args.speed,
+        "requests": dict(adapter.requests),
+        "requests_per_second": sum(adapter.requests.values()) / elapsed,
+        "retries": adapter.retried,
+        "server_errors": adapter.injected["500"],
+        "operations": operations,
+        "memory_growth": memory_end - (memory_start or memory_end),
+        "memory_peak": memory_peak,
+    }
+
+    print(
+        f"\n{'operation':<14} {'count':>7} {'ops/s':>7} {'failed':>6} "
+        f"{'p50':>8} {'p95':>8} {'p99':>8}"
+    )
+    for operation, item in operations.items():
+        print(
+            f"{operation:<14} {item['count']:>7} {item['per_second']:>7.2f} "
+            f"{item['failed']:>6} {item['p50'] * 1e3:>6.0f}ms "
+            f"{item['p95'] * 1e3:>6.0f}ms {item['p99'] * 1e3:>6.0f}ms"
+        )
+    print(
+        f"\n{summary['requests_per_second']:.1f} requests/s, "
+        f"{summary['retries']} retries, {summary['server_errors']} server errors, "
+        f"memory {summary['memory_growth'] / 2**20:+.1f}MB "
+        f"(peak {memory_peak / 2**20:.1f}MB)"
+    )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as output:
+            json.dump(summary, output, indent=2)
+            output.write("\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
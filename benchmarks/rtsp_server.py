@@ -0,0 +1,170 @@
+"""Local RTSP stand-in server for exercising the RTSP probe and scanner.
+
+It answers DESCRIBE, SETUP, PLAY and TEARDOWN with Digest auth and sends
+RTP packets interleaved over the RTSP connection after PLAY.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import random
+import re
+
+SDP = (
+    "v=0\r\n"
+    "o=- 0 0 IN IP4 127.0.0.1\r\n"
+    "s=Stand-in\r\n"
+    "t=0 0\r\n"
+    "m=video 0 RTP/AVP 96\r\n"
+    "a=rtpmap:96 H264/90000\r\n"
+    "a=control:trackID=1\r\n"
+)
+AUTH_PARAM_RE = re.compile(r'(\w+)="([^"]*)"')
+
+
+class RTSPStandInServer:
+    """A tiny RTSP camera stand-in.
+
+    fps sets the RTP packet rate, first_packet_delay delays the first
+    packet after PLAY and jitter adds up to that many seconds of random
+    delay per packet.
+    """
+
+    def __init__(
+        self,
+        username: str = "admin",
+        password: str = "ABCDEF",
+        fps: float = 25,
+        first_packet_delay: float = 0.05,
+        jitter: float = 0.002,
+        payload_size: int = 1200,
+    ) -> None:
+        """Initialize the server."""
+        self.username = username
+        self.password = password
+        self.fps = fps
+        self.first_packet_delay = first_packet_delay
+        self.jitter = jitter
+        self.payload_size = payload_size
+        self.nonce = os.urandom(8).hex()
+        self.port = 0
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Start listening, returns the port."""
+        self._server = await asyncio.start_server(self._handle, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self) -> None:
+        """Stop the server."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def _authorized(self, method: str, url: str, authorization: str | None) -> bool:
+        """Check a Digest Authorization header signed for the request URL."""
+        if not authorization or not authorization.startswith("Digest "):
+            return False
+        params = dict(AUTH_PARAM_RE.findall(authorization))
+        if params.get("uri") != url:
+            return False
+        ha1 = hashlib.md5(
+            f"{self.username}:{params.get('realm')}:{self.password}".encode()
+        ).hexdigest()
+        ha2 = hashlib.md5(f"{method}:{params.get('uri')}".encode()).hexdigest()
+        expected = hashlib.md5(f"{ha1}:{self.nonce}:{ha2}".encode()).hexdigest()
+        return params.get("username") == self.username and (
+            params.get("response") == expected
+        )
+
+    async def _stream(self, writer: asyncio.StreamWriter) -> None:
+        """Send RTP packets on interleaved channel 0."""
+        await asyncio.sleep(self.first_packet_delay)
+        sequence = random.randrange(0x10000)
+        timestamp = random.randrange(0x100000000)
+        payload = os.urandom(self.payload_size)
+        while True:
+            header = bytes([0x80, 96]) + sequence.to_bytes(2, "big")
+            header += timestamp.to_bytes(4, "big") + b"\x00\x00\x00\x01"
+            packet = header + payload
+            writer.write(b"$\x00" + len(packet).to_bytes(2, "big") + packet)
+            await writer.drain()
+            sequence = (sequence + 1) & 0xFFFF
+            timestamp = (timestamp + int(90000 / self.fps)) & 0xFFFFFFFF
+            await asyncio.sleep(1 / self.fps + random.uniform(0, self.jitter))
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve one client connection."""
+        stream: asyncio.Task | None = None
+        try:
+            while True:
+                method, url, headers = await read_rtsp_request(reader)
+                reply = [f"CSeq: {headers.get('cseq', '0')}"]
+                body = b""
+
+                if not self._authorized(method, url, headers.get("authorization")):
+                    status = "401 Unauthorized"
+                    reply.append(
+                        f'WWW-Authenticate: Digest realm="StandIn", '
+                        f'nonce="{self.nonce}"'
+                    )
+                elif method == "DESCRIBE":
+                    status = "200 OK"
+                    body = SDP.encode()
+                    reply += [
+                        f"Content-Base: {url.rstrip('/')}/",
+                        "Content-Type: application/sdp",
+                    ]
+                elif method == "SETUP":
+                    status = "200 OK"
+                    reply += [
+                        f"Transport: {headers.get('transport', '')}",
+                        "Session: 12345678;timeout=60",
+                    ]
+                elif method == "PLAY":
+                    status = "200 OK"
+                    reply.append("Session: 12345678")
+                elif method == "TEARDOWN":
+                    status = "200 OK"
+                else:
+                    status = "405 Method Not Allowed"
+
+                reply.append(f"Content-Length: {len(body)}")
+                head = "".join(f"{line}\r\n" for line in [f"RTSP/1.0 {status}", *reply])
+                writer.write(f"{head}\r\n".encode() + body)
+                await writer.drain()
+
+                if method == "PLAY" and status == "200 OK" and stream is None:
+                    stream = asyncio.create_task(self._stream(writer))
+                if method == "TEARDOWN":
+                    break
+
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+
+        finally:
+            if stream is not None:
+                stream.cancel()
+            writer.close()
+
+
+async def read_rtsp_request(
+    reader: asyncio.StreamReader,
+) -> tuple[str, str, dict[str, str]]:
+    """Read one request, returns (method, url, lower case headers)."""
+    head = (await reader.readuntil(b"\r\n\r\n")).decode()
+    lines = head.split("\r\n")
+    method, url, _ = lines[0].split(" ", 2)
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(":")
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    if int(headers.get("content-length", "0")):
+        await reader.readexactly(int(headers["content-length"]))
+    return method, url, headers
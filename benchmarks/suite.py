@@ -0,0 +1,324 @@
+"""Benchmark suite for the client hot paths, offline on synthetic fixtures.
+
+Run from the repository root:
+
+    python -m benchmarks.suite                      # all cases and sizes
+    python -m benchmarks.suite --quick              # sizes up to 1000
+    python -m benchmarks.suite --case get_device_infos --json results.json
+    python -m benchmarks.suite --save-baseline
+    python -m benchmarks.suite --compare benchmarks/baseline.json
+
+Every case is timed per size over several rounds. Results are written as
+JSON, --compare prints the ratio of the median round to a stored run and
+exits with status 1 when a case got slower than --threshold. Timings only
+compare on the same machine, so the baseline is not part of the
+repository: save one with --save-baseline on the main branch, then
+compare a change against it.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Callable
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Any
+
+from pyezvizapi.camera import EzvizCamera
+from pyezvizapi.cas_codec import xor_enc_dec
+from pyezvizapi.client import EzvizClient
+from pyezvizapi.light_bulb import EzvizLightBulb
+from pyezvizapi.mqtt import MQTTClient
+from pyezvizapi.utils import convert_to_dict, decrypt_image
+
+from . import fixtures
+from .bench_decrypt import PASSWORD, encrypt_image
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+FLEET_SIZES = [10, 100, 1000, 10000]
+KIB_SIZES = [10, 100, 1000, 10000]
+QUICK_LIMIT = 1000
+ROUNDS = 9
+# Fast cases are repeated within a round until it lasts this long.
+MIN_ROUND = 0.2
+# Rounds stop early once a case has run this long in total.
+TIME_BUDGET = 5.0
+
+
+class FakeResponse:
+    """Just enough of requests.Response for the client."""
+
+    def __init__(self, text: str) -> None:
+        """Initialize the response."""
+        self.text = text
+
+    def raise_for_status(self) -> None:
+        """Never fail."""
+
+    def json(self) -> Any:
+        """Decode the body like requests does."""
+        return json.loads(self.text)
+
+
+class FakeSession:
+    """Serve recorded pagelist pages by offset."""
+
+    def __init__(self, total: int) -> None:
+        """Encode every page of a fleet of total devices once."""
+        self.pages = {
+            offset: json.dumps(fixtures.page(offset, fixtures.PAGE_SIZE, total))
+            for offset in range(0, max(total, 1), fixtures.PAGE_SIZE)
+        }
+
+    def get(self, url: str, params: dict, timeout: Any = None) -> FakeResponse:
+        """Return the page at params["offset"]."""
+        return FakeResponse(self.pages[params["offset"]])
+
+
+def offline_client(total: int = 0) -> EzvizClient:
+    """Return a client answering from fixtures instead of the API."""
+    # Every call walks the page list, as it does once the cache expired.
+    client = EzvizClient(
+        token={"session_id": "x", "api_url": "api.invalid"}, device_cache_ttl=0
+    )
+    client._session = FakeSession(total)  # pylint: disable=protected-access
+    alarm_info = fixtures.alarm_info()
+    client.get_alarminfo = lambda serial, limit=1, max_retries=0: alarm_info
+    return client
+
+
+def case_pagelist(size: int) -> Callable[[], Any]:
+    """_api_get_pagelist walking all pages, merged with deep_merge."""
+    client = offline_client(size)
+    # pylint: disable=protected-access
+    return lambda: client._api_get_pagelist("CLOUD", limit=fixtures.PAGE_SIZE)
+
+
+def case_get_device_infos(size: int) -> Callable[[], Any]:
+    """get_device_infos joining the sections of every device."""
+    client = offline_client()
+    page_list = fixtures.page_list(size)
+    client._get_page_list = lambda *args: page_list  # pylint: disable=protected-access
+    return client.get_device_infos
+
+
+def _device_objects(size: int, light_bulbs: bool) -> tuple[EzvizClient, dict]:
+    """Return a client and the device details of one kind."""
+    client = offline_client()
+    page_list = fixtures.page_list(size)
+    client._get_page_list = lambda *args: page_list  # pylint: disable=protected-access
+    devices = {
+        serial: data
+        for serial, data in client.get_device_infos().items()
+        if (data["deviceInfos"]["deviceCategory"] == "lighting") == light_bulbs
+    }
+    return client, devices
+
+
+def case_camera_status(size: int) -> Callable[[], Any]:
+    """EzvizCamera construction and status() for the cameras of a fleet."""
+    client, devices = _device_objects(size, light_bulbs=False)
+    return lambda: [
+        EzvizCamera(client, serial, data).status() for serial, data in devices.items()
+    ]
+
+
+def case_light_bulb_status(size: int) -> Callable[[], Any]:
+    """EzvizLightBulb construction and status() for the bulbs of a fleet."""
+    client, devices = _device_objects(size, light_bulbs=True)
+    return lambda: [
+        EzvizLightBulb(client, serial, data).status()
+        for serial, data in devices.items()
+    ]
+
+
+def case_convert_to_dict(size: int) -> Callable[[], Any]:
+    """convert_to_dict on the STATUS optionals of every device."""
+    optionals = [
+        status["optionals"] for status in fixtures.page_list(size)["STATUS"].values()
+    ]
+    return lambda: [convert_to_dict(dict(item)) for item in optionals]
+
+
+def case_decrypt_image(size: int) -> Callable[[], Any]:
+    """decrypt_image on an image of size KiB."""
+    data = encrypt_image(os.urandom(size * 1024))
+    return lambda: decrypt_image(data, PASSWORD)
+
+
+def case_xor_enc_dec(size: int) -> Callable[[], Any]:
+    """xor_enc_dec on size KiB."""
+    data = os.urandom(size * 1024)
+    return lambda: xor_enc_dec(data)
+
+
+class _Message:
+    """MQTT message as passed to on_message."""
+
+    __slots__ = ("payload",)
+
+    def __init__(self, payload: bytes) -> None:
+        """Initialize the message."""
+        self.payload = payload
+
+
+def case_mqtt_on_message(size: int) -> Callable[[], Any]:
+    """MQTTClient.on_message for one push message per device."""
+    mqtt = MQTTClient({"service_urls": {"pushAddr": "push.invalid"}})
+    messages = [_Message(fixtures.mqtt_payload(index)) for index in range(size)]
+
+    def run() -> None:
+        for message in messages:
+            mqtt.on_message(None, None, message)
+
+    return run
+
+
+# name: (setup, sizes, unit)
+CASES: dict[str, tuple[Callable[[int], Callable[[], Any]], list[int], str]] = {
+    "pagelist": (case_pagelist, FLEET_SIZES, "devices"),
+    "get_device_infos": (case_get_device_infos, FLEET_SIZES, "devices"),
+    "camera_status": (case_camera_status, FLEET_SIZES, "devices"),
+    "light_bulb_status": (case_light_bulb_status, FLEET_SIZES, "devices"),
+    "convert_to_dict": (case_convert_to_dict, FLEET_SIZES, "devices"),
+    "decrypt_image": (case_decrypt_image, KIB_SIZES, "KiB"),
+    "xor_enc_dec": (case_xor_enc_dec, KIB_SIZES, "KiB"),
+    "mqtt_on_message": (case_mqtt_on_message, FLEET_SIZES, "messages"),
+}
+
+
+def measure(func: Callable[[], Any]) -> list[float]:
+    """Return the time per call of up to ROUNDS rounds."""
+    start = time.perf_counter()
+    func()
+    first = time.perf_counter() - start
+    calls = max(1, int(MIN_ROUND / max(first, 1e-9)))
+
+    # A slow first call already is a round of its own.
+    timings: list[float] = [first] if calls == 1 else []
+    spent = first
+    while len(timings) < ROUNDS and spent < TIME_BUDGET:
+        # Like timeit, keep collections of earlier rounds out of the timing.
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            for _ in range(calls):
+                func()
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        spent += elapsed
+        timings.append(elapsed / calls)
+    return timings
+
+
+def run(names: list[str], quick: bool = False) -> dict[str, Any]:
+    """Run the named cases and return the results document."""
+    results = []
+    for name in names:
+        setup, sizes, unit = CASES[name]
+        for size in sizes:
+            if quick and size > QUICK_LIMIT:
+                continue
+            timings = measure(setup(size))
+            result = {
+                "case": name,
+                "size": size,
+                "unit": unit,
+                "rounds": len(timings),
+                "min": min(timings),
+                "median": statistics.median(timings),
+            }
+            results.append(result)
+            print(
+                f"{name:<18} {size:>6} {unit:<8} {result['median'] * 1e3:>10.3f}ms "
+                f"{result['median'] / size * 1e6:>9.3f}us/{unit.rstrip('s')}",
+                flush=True,
+            )
+
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def compare(
+    results: dict[str, Any], baseline: dict[str, Any], threshold: float
+) -> list[str]:
+    """Print the median ratio to the baseline per case, return the regressions."""
+    for key in ("python", "implementation", "machine"):
+        if baseline.get(key) != results[key]:
+            print(
+                f"Baseline {key} {baseline.get(key)} differs from {results[key]}, "
+                "ratios are not meaningful"
+            )
+    previous = {(item["case"], item["size"]): item for item in baseline["results"]}
+    regressions = []
+    print(f"\n{'case':<18} {'size':>6} {'baseline':>11} {'now':>11} {'ratio':>7}")
+    for item in results["results"]:
+        before = previous.get((item["case"], item["size"]))
+        if before is None:
+            continue
+        ratio = item["median"] / before["median"]
+        flag = ""
+        if ratio > threshold:
+            flag = "  slower"
+            regressions.append(f"{item['case']}[{item['size']}]")
+        print(
+            f"{item['case']:<18} {item['size']:>6} {before['median'] * 1e3:>9.3f}ms "
+            f"{item['median'] * 1e3:>9.3f}ms {ratio:>6.2f}x{flag}"
+        )
+    return regressions
+
+
+def main() -> int:
+    """Run the suite from the command line."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    parser.add_argument(
+        "--case", action="append", choices=sorted(CASES), help="Run only this case"
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help=f"Skip sizes above {QUICK_LIMIT}"
+    )
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--compare", help="Baseline results to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=2.0,
+        help="Slowdown ratio reported as a regression (default: 2.0)",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help=f"Store the results as {os.path.relpath(BASELINE)}",
+    )
+    args = parser.parse_args()
+
+    results = run(args.case or list(CASES), args.quick)
+
+    for path in filter(None, [args.json, BASELINE if args.save_baseline else None]):
+        with open(path, "w", encoding="utf-8") as output:
+            json.dump(results, output, indent=2)
+            output.write("\n")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline:
+            regressions = compare(results, json.load(baseline), args.threshold)
+        if regressions:
+            print(f"\nSlower than {args.threshold}x baseline: {', '.join(regressions)}")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,9 @@
 """init pyezvizapi."""
-from .camera import EzvizCamera
-from .cas import EzvizCAS
-from .client import EzvizClient
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
 from .constants import (
     BatteryCameraWorkMode,
     DefenseModeType,
@@ -23,13 +25,69 @@ from .exceptions import (
     InvalidURL,
     PyEzvizError,
 )
-from .light_bulb import EzvizLightBulb
-from .mqtt import MQTTClient
-from .test_cam_rtsp import TestRTSPAuth
+
+if TYPE_CHECKING:
+    from .alarm_images import EzvizAlarmImageDownloader
+    from .camera import EzvizCamera
+    from .cas import EzvizCAS
+    from .cas_async import AsyncEzvizCAS
+    from .client import EzvizClient
+    from .daemon import EzvizDaemon
+    from .journal import EzvizEventJournal
+    from .history import EzvizMessageHistory
+    from .light_bulb import EzvizLightBulb
+    from .message_store import EzvizMessageStore
+    from .messages import EzvizMessage
+    from .mqtt import MQTTClient
+    from .mqtt_mux import MQTTMultiplexer
+    from .rtsp_probe import RTSPStreamProbe
+    from .rtsp_scanner import RTSPCredentialScanner
+    from .test_cam_rtsp import TestRTSPAuth
+    from .token_store import EzvizTokenStore
+
+# Classes are imported on first access, so importing the package (and the
+# CLI) does not pay for requests, paho, pycryptodome or asyncio up front.
+_LAZY_IMPORTS = {
+    "AsyncEzvizCAS": ".cas_async",
+    "EzvizAlarmImageDownloader": ".alarm_images",
+    "EzvizCAS": ".cas",
+    "EzvizCamera": ".camera",
+    "EzvizClient": ".client",
+    "EzvizDaemon": ".daemon",
+    "EzvizEventJournal": ".journal",
+    "EzvizLightBulb": ".light_bulb",
+    "EzvizMessage": ".messages",
+    "EzvizMessageHistory": ".history",
+    "EzvizMessageStore": ".message_store",
+    "EzvizTokenStore": ".token_store",
+    "MQTTClient": ".mqtt",
+    "MQTTMultiplexer": ".mqtt_mux",
+    "RTSPCredentialScanner": ".rtsp_scanner",
+    "RTSPStreamProbe": ".rtsp_probe",
+    "TestRTSPAuth": ".test_cam_rtsp",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Import exported classes on first access."""
+    if name in _LAZY_IMPORTS:
+        value = getattr(import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    """List lazily imported names too."""
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
 
 __all__ = [
+    "AsyncEzvizCAS",
+    "EzvizAlarmImageDownloader",
     "EzvizCamera",
     "EzvizClient",
+    "EzvizDaemon",
     "PyEzvizError",
     "InvalidURL",
     "HTTPError",
@@ -38,8 +96,14 @@ __all__ = [
     "EzvizAuthTokenExpired",
     "EzvizAuthVerificationCode",
     "EzvizCAS",
+    "EzvizEventJournal",
     "EzvizLightBulb",
+    "EzvizMessage",
+    "EzvizMessageHistory",
+    "EzvizMessageStore",
+    "EzvizTokenStore",
     "MQTTClient",
+    "MQTTMultiplexer",
     "DefenseModeType",
     "IntelligentDetectionMode",
     "BatteryCameraWorkMode",
@@ -50,5 +114,7 @@ __all__ = [
     "DeviceSwitchType",
     "SupportExt",
     "SoundMode",
+    "RTSPCredentialScanner",
+    "RTSPStreamProbe",
     "TestRTSPAuth",
 ]
@@ -1,22 +1,67 @@
 """pyezvizapi command line."""
+from __future__ import annotations
+
 import argparse
+from collections.abc import Iterable
+from contextlib import ExitStack
+from datetime import date
 import json
 import logging
 import sys
 from typing import Any
 
-import pandas as pd
-
-from .camera import EzvizCamera
-from .client import EzvizClient
-from .constants import BatteryCameraWorkMode, DefenseModeType
+from .constants import BatteryCameraWorkMode, DefenseModeType, MessageFilterType
 from .exceptions import EzvizAuthVerificationCode
-from .light_bulb import EzvizLightBulb
-from .mqtt import MQTTClient
-
-
-def main() -> Any:
-    """Initiate arg parser."""
+from .output import OUTPUT_FORMATS, write_rows
+
+# Heavy modules (requests, paho, pandas) are imported by the commands that
+# need them, so every command only pays for its own imports.
+
+CAMERA_STATUS_COLUMNS = [
+    "name",
+    # version,
+    # upgrade_available,
+    "status",
+    "device_category",
+    "device_sub_category",
+    "sleep",
+    "privacy",
+    "audio",
+    "ir_led",
+    "state_led",
+    # follow_move,
+    # alarm_notify,
+    # alarm_schedules_enabled,
+    # alarm_sound_mod,
+    # encrypted,
+    "local_ip",
+    "local_rtsp_port",
+    "detection_sensibility",
+    "battery_level",
+    "alarm_schedules_enabled",
+    "alarm_notify",
+    "Motion_Trigger",
+    # last_alarm_time,
+    # last_alarm_pic
+]
+
+LIGHT_STATUS_COLUMNS = [
+    "name",
+    # "version",
+    # "upgrade_available",
+    "status",
+    "device_category",
+    "device_sub_category",
+    "local_ip",
+    "productId",
+    "is_on",
+    "brightness",
+    "color_temperature",
+]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser."""
     parser = argparse.ArgumentParser(prog="pyezvizapi")
     parser.add_argument("-u", "--username", required=True, help="Ezviz username")
     parser.add_argument("-p", "--password", required=True, help="Ezviz Password")
@@ -30,6 +75,38 @@ def main() -> Any:
     parser.add_argument(
         "--debug", "-d", action="store_true", help="Print debug messages to stderr"
     )
+    parser.add_argument(
+        "--token-file",
+        default=None,
+        help="File caching login tokens between runs (default: ~/.cache/pyezvizapi)",
+    )
+    parser.add_argument(
+        "--no-token-cache",
+        action="store_true",
+        help="Always log in, do not read or write cached login tokens",
+    )
+    parser.add_argument(
+        "--format",
+        default="table",
+        choices=OUTPUT_FORMATS,
+        help="Status output format, jsonl and csv print each device as it loads",
+    )
+    parser.add_argument(
+        "--pandas",
+        action="store_true",
+        help="Render tables with pandas instead of the built-in renderer",
+    )
+
+    parser.add_argument(
+        "--socket",
+        default=None,
+        help="Control socket of the daemon (default: $XDG_RUNTIME_DIR/pyezvizapi.sock)",
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Run the command here even when a daemon is running",
+    )
 
     subparsers = parser.add_subparsers(dest="action")
 
@@ -43,6 +120,18 @@ def main() -> Any:
         help="Device action to perform",
         choices=["device", "status", "switch", "connection"],
     )
+    parser_device.add_argument(
+        "--watch",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Poll status every SECONDS and print only what changed",
+    )
+    parser_device.add_argument(
+        "--mqtt",
+        action="store_true",
+        help="With --watch, take alarm columns from MQTT push messages",
+    )
 
     parser_device_lights = subparsers.add_parser(
         "devices_light", help="Get all the light bulbs"
@@ -72,6 +161,87 @@ def main() -> Any:
         "--mode", required=False, help="Choose mode", choices=["HOME_MODE", "AWAY_MODE"]
     )
 
+    parser_history = subparsers.add_parser(
+        "history", help="Export alarm and message history as jsonl or csv"
+    )
+    parser_history.add_argument(
+        "--serial",
+        action="append",
+        default=None,
+        help="Camera SERIAL, repeat for several (default: all cameras)",
+    )
+    parser_history.add_argument(
+        "--start",
+        type=date.fromisoformat,
+        default=None,
+        help="First day, YYYY-MM-DD (default: --end)",
+    )
+    parser_history.add_argument(
+        "--end",
+        type=date.fromisoformat,
+        default=None,
+        help="Last day, YYYY-MM-DD (default: today)",
+    )
+    parser_history.add_argument(
+        "--type",
+        default="ALL_ALARM",
+        choices=[name[len("FILTER_TYPE_") :] for name in MessageFilterType.__members__],
+        help="Message type",
+    )
+    parser_history.add_argument("--tags", default="ALL", help="Message tags")
+    parser_history.add_argument(
+        "--workers", default=4, type=int, help="Days fetched at the same time"
+    )
+    parser_history.add_argument(
+        "--checkpoint",
+        default=None,
+        help="File keeping the position, an interrupted export continues from it",
+    )
+    parser_history.add_argument(
+        "--output", default=None, help="Write to this file instead of stdout"
+    )
+    parser_history.add_argument(
+        "--format",
+        dest="history_format",
+        default=None,
+        choices=[name for name in OUTPUT_FORMATS if name != "table"],
+        help="Output format (default: jsonl, or the global --format csv)",
+    )
+    parser_history.add_argument(
+        "--alarms",
+        action="store_true",
+        help="Export the latest alarms per --serial instead of messages",
+    )
+    parser_history.add_argument(
+        "--limit", default=50, type=int, help="Alarms per camera with --alarms"
+    )
+
+    parser_daemon = subparsers.add_parser(
+        "daemon", help="Keep a logged in client running for other commands"
+    )
+    parser_daemon.add_argument(
+        "daemon_action",
+        nargs="?",
+        default="start",
+        help="Daemon action to perform",
+        choices=["start", "stop", "status"],
+    )
+    parser_daemon.add_argument(
+        "--device-ttl",
+        default=30,
+        type=float,
+        help="Seconds to reuse device details between commands",
+    )
+    parser_daemon.add_argument(
+        "--mqtt",
+        action="store_true",
+        help="Collect MQTT push messages, shown by 'daemon status'",
+    )
+
+    subparsers.add_parser(
+        "shell", help="Interactive shell reusing one session and device list"
+    )
+
     parser_camera = subparsers.add_parser("camera", help="Camera actions")
     parser_camera.add_argument("--serial", required=True, help="camera SERIAL")
 
@@ -184,13 +354,314 @@ Movement is still recorded even if do-not-disturb is enabled.",
         choices=[mode.name for mode in BatteryCameraWorkMode if mode is not BatteryCameraWorkMode.UNKNOWN],
     )
 
-    args = parser.parse_args()
+    return parser
+
+
+def print_rows(
+    args: argparse.Namespace, rows: Iterable[tuple[str, dict]], columns: list[str]
+) -> None:
+    """Print (serial, row) pairs in the selected output format."""
+    if args.format == "table" and args.pandas:
+        import pandas as pd  # pylint: disable=import-outside-toplevel
+
+        rows = dict(rows)
+        print(pd.DataFrame.from_dict(data=rows, orient="index", columns=columns))
+        return
+
+    write_rows(rows, columns, args.format)
+
+
+def watch_devices(client: Any, args: argparse.Namespace) -> None:
+    """Print camera status changes until interrupted."""
+    # pylint: disable=import-outside-toplevel
+    from .watch import StatusWatcher
+
+    mqtt = None
+    if args.mqtt:
+        from .mqtt import MQTTClient
+
+        mqtt = MQTTClient(client.login())
+        mqtt.run()
+
+    try:
+        StatusWatcher(
+            client, CAMERA_STATUS_COLUMNS, args.watch, args.format, mqtt=mqtt
+        ).run()
+
+    finally:
+        if mqtt is not None:
+            mqtt.stop()
+
+
+def handle_devices(client: Any, args: argparse.Namespace) -> None:
+    """Run the devices command."""
+    if args.device_action == "device":
+        print(json.dumps(client.get_device(), indent=2))
+
+    elif args.device_action == "status" and args.watch:
+        watch_devices(client, args)
+
+    elif args.device_action == "status":
+        print_rows(args, client.iter_cameras(), CAMERA_STATUS_COLUMNS)
+
+    elif args.device_action == "switch":
+        print(json.dumps(client.get_switch(), indent=2))
+
+    elif args.device_action == "connection":
+        print(json.dumps(client.get_connection(), indent=2))
+
+    else:
+        print(f"Action not implemented: {args.device_action}")
+
+
+def handle_devices_light(client: Any, args: argparse.Namespace) -> None:
+    """Run the devices_light command."""
+    if args.devices_light_action == "status":
+        print_rows(args, client.iter_light_bulbs(), LIGHT_STATUS_COLUMNS)
+
+
+def handle_light(
+    client: Any, args: argparse.Namespace, devices: dict | None = None
+) -> None:
+    """Run the light command, devices are cached device details per serial."""
+    from .light_bulb import EzvizLightBulb  # pylint: disable=import-outside-toplevel
+
+    # load light bulb object
+    light_bulb = EzvizLightBulb(client, args.serial, (devices or {}).get(args.serial))
+    logging.debug("Light bulb loaded")
+
+    if args.light_action == "toggle":
+        light_bulb.toggle_switch()
+
+    elif args.light_action == "status":
+        print(json.dumps(light_bulb.status(), indent=2))
+
+
+def handle_home_defence_mode(client: Any, args: argparse.Namespace) -> None:
+    """Run the home_defence_mode command."""
+    if args.mode:
+        print(
+            json.dumps(
+                client.api_set_defence_mode(getattr(DefenseModeType, args.mode).value),
+                indent=2,
+            )
+        )
+
+
+def handle_mqtt(client: Any, args: argparse.Namespace) -> None:
+    """Run the mqtt command."""
+    from .mqtt import MQTTClient  # pylint: disable=import-outside-toplevel
+
+    logging.basicConfig()
+    logging.getLogger().setLevel(logging.DEBUG)
+
+    token = client.login()
+    mqtt = MQTTClient(token)
+    mqtt.start()
+
+
+def handle_camera(
+    client: Any, args: argparse.Namespace, devices: dict | None = None
+) -> None:
+    """Run the camera command, devices are cached device details per serial."""
+    from .camera import EzvizCamera  # pylint: disable=import-outside-toplevel
+
+    # load camera object
+    camera = EzvizCamera(client, args.serial, (devices or {}).get(args.serial))
+    logging.debug("Camera loaded")
+
+    if args.camera_action == "move":
+        camera.move(args.direction, args.speed)
+
+    elif args.camera_action == "move_coords":
+        camera.move_coordinates(args.x, args.y)
+
+    elif args.camera_action == "status":
+        print(json.dumps(camera.status(), indent=2))
+
+    elif args.camera_action == "switch":
+        if args.switch == "ir":
+            camera.switch_device_ir_led(args.enable)
+        elif args.switch == "state":
+            print(args.enable)
+            camera.switch_device_state_led(args.enable)
+        elif args.switch == "audio":
+            camera.switch_device_audio(args.enable)
+        elif args.switch == "privacy":
+            camera.switch_privacy_mode(args.enable)
+        elif args.switch == "sleep":
+            camera.switch_sleep_mode(args.enable)
+        elif args.switch == "follow_move":
+            camera.switch_follow_move(args.enable)
+        elif args.switch == "sound_alarm":
+            # Map 0|1 enable flog to operation type: 1 for off and 2 for on.
+            camera.switch_sound_alarm(args.enable + 1)
+
+    elif args.camera_action == "alarm":
+        if args.sound is not None:
+            camera.alarm_sound(args.sound)
+        if args.notify is not None:
+            camera.alarm_notify(args.notify)
+        if args.sensibility is not None:
+            camera.alarm_detection_sensibility(args.sensibility)
+        if args.do_not_disturb is not None:
+            camera.do_not_disturb(args.do_not_disturb)
+        if args.schedule is not None:
+            camera.change_defence_schedule(args.schedule)
+
+    elif args.camera_action == "select":
+        if args.battery_work_mode is not None:
+            camera.set_battery_camera_work_mode(
+                getattr(BatteryCameraWorkMode, args.battery_work_mode)
+            )
+
+    else:
+        print("Action not implemented, try running with -h switch for help")
+
+
+def handle_history(client: Any, args: argparse.Namespace) -> None:
+    """Run the history command."""
+    # pylint: disable=import-outside-toplevel
+    from .history import (
+        ALARM_COLUMNS,
+        MESSAGE_COLUMNS,
+        EzvizMessageHistory,
+        alarm_rows,
+        message_rows,
+    )
+
+    # A table needs every row before printing and cannot be appended to.
+    output_format = args.history_format or ("csv" if args.format == "csv" else "jsonl")
+
+    resume = False
+    if args.alarms:
+        if not args.serial:
+            print("--alarms needs at least one --serial")
+            return
+        messages = None
+        rows = alarm_rows(client, args.serial, args.limit)
+        columns, index_name = ALARM_COLUMNS, "alarmId"
+    else:
+        history = EzvizMessageHistory(
+            client,
+            serials=args.serial,
+            s_type=MessageFilterType[f"FILTER_TYPE_{args.type}"].value,
+            tags=args.tags,
+            start_date=args.start,
+            end_date=args.end,
+            workers=args.workers,
+            checkpoint_path=args.checkpoint,
+        )
+        resume = history.load_checkpoint() is not None
+        messages = iter(history)
+        rows = message_rows(messages)
+        columns, index_name = MESSAGE_COLUMNS, "msg_id"
+
+    with ExitStack() as stack:
+        # Closing the walk saves the checkpoint when the export is interrupted.
+        if messages is not None:
+            stack.callback(messages.close)
+        stream = sys.stdout
+        if args.output:
+            # Appending keeps what an interrupted run already wrote.
+            stream = stack.enter_context(
+                open(args.output, "a" if resume else "w", encoding="utf-8")
+            )
+        write_rows(rows, columns, output_format, stream, index_name, header=not resume)
+
+
+def handle_daemon(client: Any, args: argparse.Namespace) -> None:
+    """Run the daemon command."""
+    from .daemon import run_daemon  # pylint: disable=import-outside-toplevel
+
+    run_daemon(client, args)
+
+
+def handle_shell(client: Any, args: argparse.Namespace) -> None:
+    """Run the shell command."""
+    from .shell import run_shell  # pylint: disable=import-outside-toplevel
+
+    run_shell(client, args)
+
+
+HANDLERS = {
+    "devices": handle_devices,
+    "devices_light": handle_devices_light,
+    "light": handle_light,
+    "home_defence_mode": handle_home_defence_mode,
+    "mqtt": handle_mqtt,
+    "camera": handle_camera,
+    "daemon": handle_daemon,
+    "history": handle_history,
+    "shell": handle_shell,
+}
+
+
+# Commands that stay in this process instead of going to a running daemon.
+LOCAL_ACTIONS = {"daemon", "history", "mqtt", "shell"}
+
+
+def runs_locally(args: argparse.Namespace) -> bool:
+    """Return True for commands a daemon should not run.
+
+    These are endless commands, and jsonl or csv output, which prints rows
+    as they load while a daemon only replies once the command finished.
+    """
+    return (
+        args.action in LOCAL_ACTIONS
+        or bool(getattr(args, "watch", None))
+        or getattr(args, "format", "table") != "table"
+    )
+
 
-    # print("--------------args")
-    # print("--------------args: %s",args)
-    # print("--------------args")
+def forward_to_daemon(args: argparse.Namespace, argv: list[str]) -> bool:
+    """Run the command in a running daemon, False if none is listening.
+
+    Only a failed connect falls back to running locally, errors after the
+    request was sent are reported instead.
+    """
+    # pylint: disable=import-outside-toplevel
+    from .daemon import send_request
+
+    try:
+        reply = send_request({"argv": argv}, args.socket)
+
+    except (FileNotFoundError, ConnectionRefusedError, PermissionError) as err:
+        # Could not connect, the daemon never saw the command.
+        logging.debug("Daemon unavailable, running locally: %s", err)
+        return False
+
+    except (OSError, ValueError) as err:
+        # The daemon may have run the command already, running it again here
+        # could e.g. toggle a light twice.
+        print(f"No reply from the daemon, the command may have run: {err}")
+        return True
+
+    if reply["output"]:
+        print(reply["output"], end="")
+    if reply["error"]:
+        print(reply["error"])
+    return True
+
+
+def login(args: argparse.Namespace) -> Any:
+    """Create a client and log in, asking for an MFA code if needed.
+
+    A cached token of the same account, region and password is used as
+    is, the client refreshes it when the API rejects it and writes the new
+    one back to the cache.
+    """
+    # pylint: disable=import-outside-toplevel
+    from .client import EzvizClient
+    from .token_store import EzvizTokenStore
+
+    token_store = None if args.no_token_cache else EzvizTokenStore(args.token_file)
+    client = EzvizClient(
+        args.username, args.password, args.region, token_store=token_store
+    )
+    if client.has_token():
+        return client
 
-    client = EzvizClient(args.username, args.password, args.region)
     try:
         client.login()
 
@@ -201,6 +672,36 @@ Movement is still recorded even if do-not-disturb is enabled.",
     except Exception as exp:  # pylint: disable=broad-except
         print(exp)
 
+    return client
+
+
+def main() -> Any:
+    """Initiate arg parser."""
+    argv = sys.argv[1:]
+    args = build_parser().parse_args(argv)
+
+    handler = HANDLERS.get(args.action)
+    if handler is None:
+        print(f"Action not implemented: {args.action}")
+        return None
+
+    if (
+        not args.no_daemon
+        and not runs_locally(args)
+        and forward_to_daemon(args, argv)
+    ):
+        return None
+
+    if args.action == "daemon" and args.daemon_action != "start":
+        # Talking to the daemon needs no login of its own.
+        try:
+            handler(None, args)
+        except OSError as err:
+            print(f"No daemon running on {args.socket or 'the default socket'}: {err}")
+        return None
+
+    client = login(args)
+
     if args.debug:
         # You must initialize logging, otherwise you'll not see debug output.
         logging.basicConfig()
@@ -209,250 +710,16 @@ Movement is still recorded even if do-not-disturb is enabled.",
         requests_log.setLevel(logging.DEBUG)
         requests_log.propagate = True
 
-    if args.action == "devices":
-
-        if args.device_action == "device":
-            try:
-                print(json.dumps(client.get_device(), indent=2))
-            except Exception as exp:  # pylint: disable=broad-except
-                print(exp)
-            finally:
-                client.close_session()
-
-        elif args.device_action == "status":
-            try:
-                print(
-                    pd.DataFrame.from_dict(
-                        data=client.load_cameras(),
-                        orient="index",
-                        columns=[
-                            "name",
-                            # version,
-                            # upgrade_available,
-                            "status",
-                            "device_category",
-                            "device_sub_category",
-                            "sleep",
-                            "privacy",
-                            "audio",
-                            "ir_led",
-                            "state_led",
-                            # follow_move,
-                            # alarm_notify,
-                            # alarm_schedules_enabled,
-                            # alarm_sound_mod,
-                            # encrypted,
-                            "local_ip",
-                            "local_rtsp_port",
-                            "detection_sensibility",
-                            "battery_level",
-                            "alarm_schedules_enabled",
-                            "alarm_notify",
-                            "Motion_Trigger",
-                            # last_alarm_time,
-                            # last_alarm_pic
-                        ],
-                    )
-                )
-            except Exception as exp:  # pylint: disable=broad-except
-                print(exp)
-            finally:
-                client.close_session()
-
-        elif args.device_action == "switch":
-            try:
-                print(json.dumps(client.get_switch(), indent=2))
-            except Exception as exp:  # pylint: disable=broad-except
-                print(exp)
-            finally:
-                client.close_session()
-
-        elif args.device_action == "connection":
-            try:
-                print(json.dumps(client.get_connection(), indent=2))
-            except Exception as exp:  # pylint: disable=broad-except
-                print(exp)
-            finally:
-                client.close_session()
-
-        else:
-            print("Action not implemented: %s", args.device_action)
-
-    elif args.action == "devices_light":
-        if args.devices_light_action == "status":
-            try:
-                print(
-                    pd.DataFrame.from_dict(
-                        data=client.load_light_bulbs(),
-                        orient="index",
-                        columns=[
-                            "name",
-                            # "version",
-                            # "upgrade_available",
-                            "status",
-                            "device_category",
-                            "device_sub_category",
-                            "local_ip",
-                            "productId",
-                            "is_on",
-                            "brightness",
-                            "color_temperature",
-                        ],
-                    )
-                )
-            except Exception as exp:  # pylint: disable=broad-except
-                print(exp)
-            finally:
-                client.close_session()
-
-    elif args.action == "light":
-        # load light bulb object
-        try:
-            light_bulb = EzvizLightBulb(client, args.serial)
-            logging.debug("Light bulb loaded")
-        except Exception as exp:  # pylint: disable=broad-except
-            print(exp)
-            client.close_session()
-
-        if args.light_action == "toggle":
-            try:
-                light_bulb.toggle_switch()
-            except Exception as exp:  # pylint: disable=broad-except
-                print(exp)
-            finally:
-                client.close_session()
-
-        elif args.light_action == "status":
-            try:
-                print(json.dumps(light_bulb.status(), indent=2))
-
-            except Exception as exp:  # pylint: disable=broad-except
-                print(exp)
-            finally:
-                client.close_session()
-
-    elif args.action == "home_defence_mode":
-
-        if args.mode:
-            try:
-                print(
-                    json.dumps(
-                        client.api_set_defence_mode(
-                            getattr(DefenseModeType, args.mode).value
-                        ),
-                        indent=2,
-                    )
-                )
-            except Exception as exp:  # pylint: disable=broad-except
-                print(exp)
-            finally:
-                client.close_session()
-
-    elif args.action == "mqtt":
-
-        logging.basicConfig()
-        logging.getLogger().setLevel(logging.DEBUG)
-
-        try:
-            token = client.login()
-            mqtt = MQTTClient(token)
-            mqtt.start()
-
-        except Exception as exp:  # pylint: disable=broad-except
-            print(exp)
-        finally:
-            client.close_session()
+    try:
+        handler(client, args)
 
-    elif args.action == "camera":
+    except Exception as exp:  # pylint: disable=broad-except
+        print(exp)
 
-        # load camera object
-        try:
-            camera = EzvizCamera(client, args.serial)
-            logging.debug("Camera loaded")
-        except Exception as exp:  # pylint: disable=broad-except
-            print(exp)
-            client.close_session()
-
-        if args.camera_action == "move":
-            try:
-                camera.move(args.direction, args.speed)
-            except Exception as exp:  # pylint: disable=broad-except
-                print(exp)
-            finally:
-                client.close_session()
-
-        elif args.camera_action == "move_coords":
-            try:
-                camera.move_coordinates(args.x, args.y)
-            except Exception as exp:  # pylint: disable=broad-except
-                print(exp)
-            finally:
-                client.close_session()
-
-        elif args.camera_action == "status":
-            try:
-                print(json.dumps(camera.status(), indent=2))
-
-            except Exception as exp:  # pylint: disable=broad-except
-                print(exp)
-            finally:
-                client.close_session()
-
-        elif args.camera_action == "switch":
-            try:
-                if args.switch == "ir":
-                    camera.switch_device_ir_led(args.enable)
-                elif args.switch == "state":
-                    print(args.enable)
-                    camera.switch_device_state_led(args.enable)
-                elif args.switch == "audio":
-                    camera.switch_device_audio(args.enable)
-                elif args.switch == "privacy":
-                    camera.switch_privacy_mode(args.enable)
-                elif args.switch == "sleep":
-                    camera.switch_sleep_mode(args.enable)
-                elif args.switch == "follow_move":
-                    camera.switch_follow_move(args.enable)
-                elif args.switch == "sound_alarm":
-                    # Map 0|1 enable flog to operation type: 1 for off and 2 for on.
-                    camera.switch_sound_alarm(args.enable + 1)
-            except Exception as exp:  # pylint: disable=broad-except
-                print(exp)
-            finally:
-                client.close_session()
-
-        elif args.camera_action == "alarm":
-            try:
-                if args.sound is not None:
-                    camera.alarm_sound(args.sound)
-                if args.notify is not None:
-                    camera.alarm_notify(args.notify)
-                if args.sensibility is not None:
-                    camera.alarm_detection_sensibility(args.sensibility)
-                if args.do_not_disturb is not None:
-                    camera.do_not_disturb(args.do_not_disturb)
-                if args.schedule is not None:
-                    camera.change_defence_schedule(args.schedule)
-            except Exception as exp:  # pylint: disable=broad-except
-                print(exp)
-            finally:
-                client.close_session()
-
-        elif args.camera_action == "select":
-            try:
-                if args.battery_work_mode is not None:
-                    camera.set_battery_camera_work_mode(getattr(BatteryCameraWorkMode, args.battery_work_mode))
-
-            except Exception as exp:  # pylint: disable=broad-except
-                print(exp)
-            finally:
-                client.close_session()
-
-        else:
-            print("Action not implemented, try running with -h switch for help")
+    finally:
+        client.close_session()
 
-    else:
-        print("Action not implemented: %s", args.action)
+    return None
 
 
 if __name__ == "__main__":
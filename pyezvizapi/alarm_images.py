@@ -0,0 +1,223 @@
+"""Download and decrypt alarm pictures."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import os
+import threading
+from typing import IO, TYPE_CHECKING, Any
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .constants import DEFAULT_TIMEOUT, REQUEST_HEADER
+from .exceptions import HTTPError, InvalidURL, PyEzvizError
+from .utils import ImageStreamDecryptor
+
+if TYPE_CHECKING:
+    from .client import EzvizClient
+
+_LOGGER = logging.getLogger(__name__)
+
+IMAGE_HEADER = b"hikencodepicture"
+IMAGE_HEADER_SIZE = 48
+
+
+class EzvizAlarmImageDownloader:
+    """Fetch alarm pictures concurrently and decrypt them while streaming.
+
+    Pictures are read in chunks and every chunk goes straight through an
+    ImageStreamDecryptor into the destination, so an image is never held
+    in memory twice. Camera encryption keys are fetched with get_cam_key
+    only for encrypted pictures and cached per serial.
+    """
+
+    def __init__(
+        self,
+        client: EzvizClient,
+        max_workers: int = 4,
+        chunk_size: int = 64 * 1024,
+        timeout: int = DEFAULT_TIMEOUT,
+    ) -> None:
+        """Initialize the downloader."""
+        self._client = client
+        self._max_workers = max_workers
+        self._chunk_size = chunk_size
+        self._timeout = timeout
+        self._session = requests.session()
+        self._session.headers.update(REQUEST_HEADER)
+        self._session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers),
+        )
+        self._keys: dict[str, str] = {}
+        self._keys_lock = threading.Lock()
+        self._fetch_locks: dict[str, threading.Lock] = {}
+
+    def get_password(self, serial: str) -> str:
+        """Return the cached camera encryption key, fetching it once.
+
+        Only downloads of the same camera wait for its key to be fetched.
+        """
+        with self._keys_lock:
+            if serial in self._keys:
+                return self._keys[serial]
+            fetch_lock = self._fetch_locks.setdefault(serial, threading.Lock())
+
+        with fetch_lock:
+            with self._keys_lock:
+                if serial in self._keys:
+                    return self._keys[serial]
+
+            password = self._client.get_cam_key(serial)
+
+            with self._keys_lock:
+                # A key set with set_password meanwhile wins.
+                return self._keys.setdefault(serial, password)
+
+    def set_password(self, serial: str, password: str) -> None:
+        """Set the encryption key for a camera, e.g. a custom one."""
+        with self._keys_lock:
+            self._keys[serial] = password
+
+    def invalidate_password(self, serial: str) -> None:
+        """Forget the cached encryption key for a camera."""
+        with self._keys_lock:
+            self._keys.pop(serial, None)
+
+    def download(self, url: str, serial: str, destination: str | IO[bytes]) -> int:
+        """Download one picture to a file path or writable binary buffer.
+
+        Returns the number of bytes written. Paths are written through a
+        temporary file that is renamed once the picture is complete.
+        """
+        if isinstance(destination, (str, os.PathLike)):
+            tmp_path = f"{destination}.part"
+            try:
+                with open(tmp_path, "wb") as output:
+                    written = self._download(url, serial, output)
+                os.replace(tmp_path, destination)
+
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+            return written
+
+        return self._download(url, serial, destination)
+
+    def _download(self, url: str, serial: str, output: IO[bytes]) -> int:
+        """Stream a picture through the decryptor into output.
+
+        Picture URLs are signed and may point at any host, so the account
+        session is not sent along.
+        """
+        try:
+            req = self._session.get(url, stream=True, timeout=self._timeout)
+            req.raise_for_status()
+
+        except requests.ConnectionError as err:
+            raise InvalidURL("A Invalid URL or Proxy error occurred") from err
+
+        except requests.HTTPError as err:
+            raise HTTPError from err
+
+        except requests.RequestException as err:
+            raise PyEzvizError(f"Could not download picture: {err}") from err
+
+        try:
+            return self._write_picture(req, serial, output)
+
+        except requests.RequestException as err:
+            # e.g. a read timeout or a connection dropped mid picture.
+            raise PyEzvizError(f"Could not download picture: {err}") from err
+
+    def _write_picture(
+        self, req: requests.Response, serial: str, output: IO[bytes]
+    ) -> int:
+        """Write the response body to output, decrypting it if needed."""
+        with req:
+            chunks = req.iter_content(chunk_size=self._chunk_size)
+
+            # Read just enough to see whether the picture is encrypted.
+            head = b""
+            for chunk in chunks:
+                head += chunk
+                if len(head) >= IMAGE_HEADER_SIZE:
+                    break
+
+            if not head.startswith(IMAGE_HEADER):
+                written = output.write(head)
+                for chunk in chunks:
+                    written += output.write(chunk)
+                return written
+
+            decryptor = ImageStreamDecryptor(self.get_password(serial))
+            try:
+                written = output.write(decryptor.update(head))
+
+            except PyEzvizError:
+                # Key may have been changed on the camera, refetch next time.
+                self.invalidate_password(serial)
+                raise
+
+            for chunk in chunks:
+                written += output.write(decryptor.update(chunk))
+            written += output.write(decryptor.finalize())
+
+        return written
+
+    def download_many(
+        self, jobs: Iterable[tuple[str, str, str | IO[bytes]]]
+    ) -> list[dict[str, Any]]:
+        """Download (url, serial, destination) jobs concurrently.
+
+        Returns one result per job, in order, with the number of bytes
+        written or the error raised for that picture.
+        """
+
+        def _run(job: tuple[str, str, str | IO[bytes]]) -> dict[str, Any]:
+            url, serial, destination = job
+            result: dict[str, Any] = {
+                "url": url,
+                "serial": serial,
+                "destination": destination,
+                "bytes": 0,
+                "error": None,
+            }
+            try:
+                result["bytes"] = self.download(url, serial, destination)
+
+            except (PyEzvizError, OSError) as err:
+                # One bad picture or file must not abort the other downloads.
+                _LOGGER.warning("Could not download alarm picture %s: %s", url, err)
+                result["error"] = err
+
+            return result
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            return list(executor.map(_run, jobs))
+
+    def download_alarms(
+        self, alarms: Iterable[dict[str, Any]], directory: str
+    ) -> list[dict[str, Any]]:
+        """Download the pictures of alarms returned by get_alarminfo."""
+        os.makedirs(directory, exist_ok=True)
+        return self.download_many(
+            (
+                alarm["picUrl"],
+                alarm["deviceSerial"],
+                os.path.join(
+                    directory, f"{alarm['deviceSerial']}_{alarm['alarmId']}.jpg"
+                ),
+            )
+            for alarm in alarms
+            if alarm.get("picUrl")
+        )
+
+    def close(self) -> None:
+        """Close the HTTP session."""
+        self._session.close()
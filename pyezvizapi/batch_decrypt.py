@@ -0,0 +1,170 @@
+"""Decrypt archives of encrypted alarm pictures on a process pool."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+import logging
+import mmap
+import os
+import time
+from typing import Any
+
+from .exceptions import PyEzvizError
+from .utils import ImageDecryptor
+
+_LOGGER = logging.getLogger(__name__)
+
+IMAGE_HEADER = b"hikencodepicture"
+
+
+class BatchDecryptStats:
+    """Progress and throughput counters for a batch decryption run."""
+
+    __slots__ = (
+        "files",
+        "decrypted",
+        "skipped",
+        "failed",
+        "bytes_in",
+        "bytes_out",
+        "started",
+        "elapsed",
+        "errors",
+    )
+
+    def __init__(self) -> None:
+        """Initialize empty counters."""
+        self.files = 0
+        self.decrypted = 0
+        self.skipped = 0
+        self.failed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.started = time.monotonic()
+        self.elapsed = 0.0
+        self.errors: list[tuple[str, str]] = []
+
+    @property
+    def files_per_second(self) -> float:
+        """Return processed files per second."""
+        return self.files / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def megabytes_per_second(self) -> float:
+        """Return encrypted input throughput in MB/s."""
+        return self.bytes_in / self.elapsed / 1_000_000 if self.elapsed else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters as a plain dictionary."""
+        return {
+            "files": self.files,
+            "decrypted": self.decrypted,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "elapsed": self.elapsed,
+            "files_per_second": self.files_per_second,
+            "megabytes_per_second": self.megabytes_per_second,
+            "errors": self.errors,
+        }
+
+
+def _decrypt_file(source: str, destination: str, password: str) -> tuple[str, int, int]:
+    """Decrypt one file, returns (result, bytes read, bytes written)."""
+    with open(source, "rb") as input_file:
+        size = os.fstat(input_file.fileno()).st_size
+        if size < len(IMAGE_HEADER):
+            return "skipped", size, 0
+
+        with mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[: len(IMAGE_HEADER)] != IMAGE_HEADER:
+                return "skipped", size, 0
+
+            output_data = ImageDecryptor(password).decrypt(data)  # type: ignore[arg-type]
+
+    os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+    tmp_path = f"{destination}.part"
+    with open(tmp_path, "wb") as output_file:
+        output_file.write(output_data)
+    os.replace(tmp_path, destination)
+
+    return "decrypted", size, len(output_data)
+
+
+def _iter_jobs(
+    sources: str | Iterable[str], output_dir: str
+) -> Iterator[tuple[str, str]]:
+    """Yield (source, destination) pairs for a directory or list of files."""
+    if isinstance(sources, str) and os.path.isdir(sources):
+        for root, _, files in os.walk(sources):
+            for name in sorted(files):
+                source = os.path.join(root, name)
+                yield source, os.path.join(output_dir, os.path.relpath(source, sources))
+        return
+
+    for source in [sources] if isinstance(sources, str) else sources:
+        yield source, os.path.join(output_dir, os.path.basename(source))
+
+
+def decrypt_files(
+    sources: str | Iterable[str],
+    password: str,
+    output_dir: str,
+    max_workers: int | None = None,
+    max_in_flight: int | None = None,
+    progress: Callable[[BatchDecryptStats], None] | None = None,
+) -> BatchDecryptStats:
+    """Decrypt a directory tree or an iterable of encrypted picture files.
+
+    Files are memory mapped by the worker processes and written below
+    output_dir. At most max_in_flight files (default twice the worker
+    count) are queued at once, which bounds memory for very large archives.
+    Files without the 'hikencodepicture' header are skipped. progress is
+    called with the running stats after every finished file.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or max_workers * 2
+    stats = BatchDecryptStats()
+    pending: dict[Future, str] = {}
+
+    def _collect(done: Iterable[Future]) -> None:
+        for future in done:
+            source = pending.pop(future)
+            stats.files += 1
+            try:
+                result, bytes_in, bytes_out = future.result()
+
+            except (OSError, ValueError, PyEzvizError) as err:
+                stats.failed += 1
+                stats.errors.append((source, str(err)))
+                _LOGGER.warning("Could not decrypt %s: %s", source, err)
+
+            else:
+                stats.bytes_in += bytes_in
+                stats.bytes_out += bytes_out
+                if result == "decrypted":
+                    stats.decrypted += 1
+                else:
+                    stats.skipped += 1
+
+            stats.elapsed = time.monotonic() - stats.started
+            if progress:
+                progress(stats)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for source, destination in _iter_jobs(sources, output_dir):
+            if len(pending) >= max_in_flight:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                _collect(done)
+            pending[executor.submit(_decrypt_file, source, destination, password)] = (
+                source
+            )
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            _collect(done)
+
+    stats.elapsed = time.monotonic() - stats.started
+    return stats
@@ -95,9 +95,14 @@ class EzvizCamera:
 
         return False
 
-    def status(self) -> dict[Any, Any]:
-        """Return the status of the camera."""
-        self._alarm_list()
+    def status(self, refresh_alarm: bool = True) -> dict[Any, Any]:
+        """Return the status of the camera.
+
+        Without refresh_alarm the last alarm is not requested and the alarm
+        fields keep their defaults, e.g. when alarms come from MQTT instead.
+        """
+        if refresh_alarm:
+            self._alarm_list()
 
         return {
             "serial": self._serial,
@@ -1,29 +1,269 @@
 """pyezvizapi CAS API Functions."""
 
-from io import BytesIO
-from itertools import cycle
-import random
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+import logging
+import select
 import socket
 import ssl
+import threading
+import time
+
+from .cas_codec import (  # noqa: F401
+    CAS_HEADER,
+    CAS_TAIL_SIZE,
+    defence_request,
+    encryption_request,
+    has_tail,
+    parse_header,
+    parse_response,
+    parse_session,
+    response_result,
+    xor_enc_dec,
+)
+from .constants import DEFAULT_TIMEOUT
+from .exceptions import InvalidHost, PyEzvizError
+
+_LOGGER = logging.getLogger(__name__)
+
+CAS_CIPHERS = "DEFAULT:!aNULL:!eNULL:!MD5:!3DES:!DES:!RC4:!IDEA:!SEED:!aDSS:!SRP:!PSK"
+
+# Replies are small XML documents, anything bigger is a framing error.
+MAX_BODY_LENGTH = 1024 * 1024
+# How long to wait for a tail sent after the announced body length.
+TAIL_TIMEOUT = 0.5
+
+
+def cas_ssl_context() -> ssl.SSLContext:
+    """Return a new SSL context for CAS servers."""
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS)
+    context.set_ciphers(CAS_CIPHERS)
+    return context
+
+
+def recv_exactly(sock: socket.socket, size: int) -> bytes:
+    """Read exactly size bytes from a socket."""
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise PyEzvizError("CAS server closed the connection early")
+        data += chunk
+    return bytes(data)
+
+
+def recv_reply(sock: socket.socket) -> bytes:
+    """Read one framed CAS reply, header and body.
+
+    Exactly the length announced in the header is read.
+    """
+    header = recv_exactly(sock, CAS_HEADER.size)
+    _, _, body_length = parse_header(header)
+    if body_length > MAX_BODY_LENGTH:
+        raise PyEzvizError(f"CAS reply too large: {body_length} bytes")
+    return header + recv_exactly(sock, body_length)
+
+
+def drain_tail(sock: socket.socket, reply: bytes) -> bool:
+    """Read a tail left after the announced body, True if sock is clean.
+
+    The body length of CAS replies includes the 32 byte tail. Should a
+    reply end with the XML instead, its tail is read here so it does not
+    end up in front of the next reply on a pooled connection. False means
+    the tail did not arrive in time and the connection must be closed.
+    """
+    if has_tail(reply[CAS_HEADER.size :]):
+        return True
 
-from Crypto.Cipher import AES
-import xmltodict
+    timeout = sock.gettimeout()
+    sock.settimeout(TAIL_TIMEOUT)
+    try:
+        recv_exactly(sock, CAS_TAIL_SIZE)
+
+    except (OSError, PyEzvizError):
+        return False
+
+    finally:
+        sock.settimeout(timeout)
+
+    return True
+
+
+class CASConnectionPool:
+    """Reuse TLS connections to CAS servers.
+
+    One SSLContext is built per pool, TLS sessions are kept per server so
+    new connections resume instead of doing a full handshake, and released
+    connections stay open for reuse while the server keeps them alive.
+    """
+
+    def __init__(
+        self,
+        max_idle: int = 4,
+        idle_timeout: float = 30,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        """Initialize the pool."""
+        self._max_idle = max_idle
+        self._idle_timeout = idle_timeout
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._context: ssl.SSLContext | None = None
+        self._sessions: dict[tuple[str, int], ssl.SSLSession] = {}
+        self._idle: dict[tuple[str, int], list[tuple[ssl.SSLSocket, float]]] = {}
+
+    @property
+    def context(self) -> ssl.SSLContext:
+        """Return the shared SSL context, creating it once."""
+        with self._lock:
+            if self._context is None:
+                self._context = cas_ssl_context()
+            return self._context
+
+    @staticmethod
+    def _is_alive(sock: ssl.SSLSocket) -> bool:
+        """Check that an idle connection was not closed by the server."""
+        try:
+            readable, _, _ = select.select([sock], [], [], 0)
+        except (OSError, ValueError):
+            return False
+        # An idle connection has nothing to read unless the peer closed it.
+        return not readable and not sock.pending()
+
+    def acquire(self, host: str, port: int) -> ssl.SSLSocket:
+        """Return an idle connection to the server or open a new one."""
+        key = (host, port)
+        now = time.monotonic()
+
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                sock, released = idle.pop()
+                if now - released < self._idle_timeout and self._is_alive(sock):
+                    return sock
+                sock.close()
+            session = self._sessions.get(key)
 
-from .constants import FEATURE_CODE, XOR_KEY
-from .exceptions import InvalidHost
+        try:
+            raw_socket = socket.create_connection((host, port), timeout=self._timeout)
 
+        except (socket.gaierror, ConnectionRefusedError) as err:
+            raise InvalidHost("Invalid IP or Hostname") from err
 
-def xor_enc_dec(msg, xor_key=XOR_KEY):
-    """Xor encodes camera serial."""
-    with BytesIO(msg) as stream:
-        xor_msg = bytes(a ^ b for a, b in zip(stream.read(), cycle(xor_key)))
-    return xor_msg
+        try:
+            sock = self.context.wrap_socket(
+                raw_socket, server_hostname=host, session=session
+            )
+
+        except ssl.SSLError:
+            raw_socket.close()
+            if session is None:
+                raise
+            # Session could not be resumed, retry with a full handshake.
+            with self._lock:
+                self._sessions.pop(key, None)
+            return self.acquire(host, port)
+
+        except OSError:
+            raw_socket.close()
+            raise
+
+        with self._lock:
+            if sock.session is not None:
+                self._sessions[key] = sock.session
+
+        return sock
+
+    def release(self, host: str, port: int, sock: ssl.SSLSocket) -> None:
+        """Return a connection for reuse, or close it if the pool is full."""
+        with self._lock:
+            # TLS 1.3 tickets only arrive after the first read, refresh it here.
+            if sock.session is not None:
+                self._sessions[(host, port)] = sock.session
+            idle = self._idle.setdefault((host, port), [])
+            if len(idle) < self._max_idle and self._is_alive(sock):
+                idle.append((sock, time.monotonic()))
+                return
+        sock.close()
+
+    @contextmanager
+    def connection(self, host: str, port: int) -> Iterator[ssl.SSLSocket]:
+        """Borrow a connection, closing it instead of reusing it on errors."""
+        sock = self.acquire(host, port)
+        try:
+            yield sock
+
+        except BaseException:
+            sock.close()
+            raise
+
+        self.release(host, port, sock)
+
+    def close(self) -> None:
+        """Close every idle connection and forget TLS sessions."""
+        with self._lock:
+            for idle in self._idle.values():
+                for sock, _ in idle:
+                    sock.close()
+            self._idle.clear()
+            self._sessions.clear()
+
+
+class CASKeyCache:
+    """Cache CAS session keys and operation codes per device serial."""
+
+    def __init__(self, ttl: float = 300) -> None:
+        """Initialize the cache, entries expire after ttl seconds."""
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._keys: dict[tuple[str, str], tuple[str, str, float]] = {}
+
+    def get(self, client_id: str, serial: str) -> tuple[str, str] | None:
+        """Return (key, operation code) if cached and not expired."""
+        with self._lock:
+            entry = self._keys.get((client_id, serial))
+            if entry is None:
+                return None
+            if time.monotonic() >= entry[2]:
+                del self._keys[(client_id, serial)]
+                return None
+            return entry[0], entry[1]
+
+    def set(self, client_id: str, serial: str, key: str, operation_code: str) -> None:
+        """Store a key and operation code for a device."""
+        with self._lock:
+            self._keys[(client_id, serial)] = (
+                key,
+                operation_code,
+                time.monotonic() + self.ttl,
+            )
+
+    def invalidate(self, client_id: str, serial: str | None = None) -> None:
+        """Drop the cached key for a device, or all keys of a client."""
+        with self._lock:
+            if serial is not None:
+                self._keys.pop((client_id, serial), None)
+                return
+            for cached in [item for item in self._keys if item[0] == client_id]:
+                del self._keys[cached]
+
+
+# Shared by default so short lived EzvizCAS objects still reuse connections.
+CAS_CONNECTION_POOL = CASConnectionPool()
+CAS_KEY_CACHE = CASKeyCache()
 
 
 class EzvizCAS:
     """Ezviz CAS server client."""
 
-    def __init__(self, token) -> None:
+    def __init__(
+        self,
+        token,
+        pool: CASConnectionPool | None = None,
+        key_cache: CASKeyCache | None = None,
+    ) -> None:
         """Initialize the client object."""
         self._session = None
         self._token = token or {
@@ -33,137 +273,108 @@ class EzvizCAS:
             "api_url": "apiieu.ezvizlife.com",
         }
         self._service_urls = token["service_urls"]
+        self._pool = pool or CAS_CONNECTION_POOL
+        self._key_cache = key_cache or CAS_KEY_CACHE
+
+    @property
+    def _cas_server(self) -> tuple[str, int]:
+        """Return the CAS server host and port from the service urls."""
+        return (
+            self._service_urls["sysConf"][15],
+            int(self._service_urls["sysConf"][16]),
+        )
 
-    def cas_get_encryption(self, devserial):
-        """Fetch encryption code from ezviz cas server."""
+    def _exchange(self, payload: bytes) -> bytes:
+        """Send a request on a pooled connection and return the whole reply.
 
-        # Random hex 64 characters long.
-        rand_hex = random.randrange(10**80)
-        rand_hex = "%064x" % rand_hex
-        rand_hex = rand_hex[:64]
-
-        payload = (
-            f"\x9e\xba\xac\xe9\x01\x00\x00\x00\x00\x00"
-            f"\x00\x02"  # Check or order?
-            f"\x00\x00\x00\x00\x00\x00 "
-            f"\x01"  # Check or order?
-            f"\x00\x00\x00\x00\x00\x00\x02\t\x00\x00\x00\x00"
-            f'<?xml version="1.0" encoding="utf-8"?>\n<Request>\n\t'
-            f'<ClientID>{self._token["session_id"]}</ClientID>'
-            f"\n\t<Sign>{FEATURE_CODE}</Sign>\n\t"
-            f"<DevSerial>{devserial}</DevSerial>"
-            f"\n\t<ClientType>0</ClientType>\n</Request>\n"
-        ).encode("latin1")
-
-        payload_end_padding = rand_hex.encode("latin1")
-
-        context = ssl.SSLContext(ssl.PROTOCOL_TLS)
-
-        context.set_ciphers(
-            "DEFAULT:!aNULL:!eNULL:!MD5:!3DES:!DES:!RC4:!IDEA:!SEED:!aDSS:!SRP:!PSK"
-        )
+        A connection is only reused after its reply, tail included, was
+        read completely, on any error it is closed instead.
+        """
+        my_socket = self._pool.acquire(*self._cas_server)
+        try:
+            my_socket.sendall(payload)
+            response = recv_reply(my_socket)
+            clean = drain_tail(my_socket, response)
 
-        # Create a TCP/IP socket
-        my_socket = socket.create_connection(
-            (self._service_urls["sysConf"][15], self._service_urls["sysConf"][16])
-        )
-        my_socket = context.wrap_socket(
-            my_socket, server_hostname=self._service_urls["sysConf"][15]
-        )
+        except BaseException:
+            my_socket.close()
+            raise
+
+        if clean:
+            self._pool.release(*self._cas_server, my_socket)
+        else:
+            my_socket.close()
+        return response
+
+    def cas_get_encryption(self, devserial):
+        """Fetch encryption code from ezviz cas server."""
+        payload = encryption_request(self._token["session_id"], devserial)
 
         # Get CAS Encryption Key
         try:
-            my_socket.send(payload + payload_end_padding)
-            response = my_socket.recv(1024)
-            print(f"Get Encryption Key: {response}")
+            response = self._exchange(payload)
+            _LOGGER.debug("Get Encryption Key: %s", response)
 
         except (socket.gaierror, ConnectionRefusedError) as err:
             raise InvalidHost("Invalid IP or Hostname") from err
 
-        finally:
-            my_socket.close()
+        # Trim the header, parse_response skips the tail after the XML.
+        return parse_response(response[CAS_HEADER.size :])
 
-        # Trim header, tail and convert xml to dict.
-        response = response[32::]
-        response = response[:-32:]
-        response = xmltodict.parse(response)
-
-        return response
+    def get_encryption_key(self, serial: str) -> tuple[str, str]:
+        """Return the CAS session key and operation code for a device.
 
-    def set_camera_defence_state(self, serial, enable=1):
-        """Enable alarm notifications."""
-
-        # Random hex 64 characters long.
-        rand_hex = random.randrange(10**80)
-        rand_hex = "%064x" % rand_hex
-        rand_hex = rand_hex[:64]
-
-        payload = (
-            f"\x9e\xba\xac\xe9\x01\x00\x00\x00\x00\x00"
-            f"\x00\x14"  # Check or order?
-            f"\x00\x00\x00\x00\x00\x00 "
-            f"\x05"
-            f"\x00\x00\x00\x00\x00\x00\x02\xd0\x00\x00\x01\xe0"
-            f'<?xml version="1.0" encoding="utf-8"?>\n<Request>\n\t'
-            f'<Verify ClientSession="{self._token["session_id"]}" '
-            f'ToDevice="{serial}" ClientType="0" />\n\t'
-            f'<Message Length="240" />\n</Request>\n'
-            f"\x9e\xba\xac\xe9\x01\x00\x00\x00\x00\x00"
-            f"\x00\x13"
-            f"\x00\x00\x00\x00\x00\x000\x0f\xff\xff\xff\xff"
-            f"\x00\x00\x00\xb0\x00\x00\x00\x00"
-        ).encode("latin1")
-
-        payload_end_padding = rand_hex.encode("latin1")
-
-        # xor camera serial
-        xor_cam_serial = xor_enc_dec(serial.encode("latin1"))
-
-        defence_msg_string = (
-            f'{xor_cam_serial.decode()}2+,*xdv.0" '
-            f'encoding="utf-8"?>\n'
-            f"<Request>\n"
-            f"\t<OperationCode>ABCDEFG</OperationCode>\n"
-            f'\t<Defence Type="Global" Status="{enable}" Actor="V" Channel="0" />\n'
-            f"</Request>\n"
-            f"\x10\x10\x10\x10\x10\x10\x10\x10\x10\x10\x10\x10\x10\x10\x10\x10"
-        ).encode("latin1")
-
-        context = ssl.SSLContext(ssl.PROTOCOL_TLS)
-
-        context.set_ciphers(
-            "DEFAULT:!aNULL:!eNULL:!MD5:!3DES:!DES:!RC4:!IDEA:!SEED:!aDSS:!SRP:!PSK"
-        )
+        Keys are cached per device until the cache TTL expires or the CAS
+        server reports an error for the device.
+        """
+        cached = self._key_cache.get(self._token["session_id"], serial)
+        if cached:
+            return cached
 
-        # Create a TCP/IP socket
-        my_socket = socket.create_connection(
-            (self._service_urls["sysConf"][15], self._service_urls["sysConf"][16])
-        )
-        my_socket = context.wrap_socket(
-            my_socket, server_hostname=self._service_urls["sysConf"][15]
-        )
+        response = self.cas_get_encryption(serial)
+        session = (response.get("Response") or {}).get("Session") or {}
 
-        cas_client = self.cas_get_encryption(serial)
+        if not session.get("@Key") or session.get("@OperationCode") is None:
+            raise PyEzvizError(f"Could not get CAS encryption key: Got {response}")
 
-        aes_key = cas_client["Response"]["Session"]["@Key"].encode("latin1")
-        iv_value = (
-            f"{serial}{cas_client['Response']['Session']['@OperationCode']}".encode(
-                "latin1"
-            )
+        self._key_cache.set(
+            self._token["session_id"],
+            serial,
+            session["@Key"],
+            session["@OperationCode"],
         )
+        return session["@Key"], session["@OperationCode"]
 
-        # Message encryption
-        cipher = AES.new(aes_key, AES.MODE_CBC, iv_value)
+    def set_camera_defence_state(self, serial, enable=1):
+        """Enable alarm notifications.
+
+        Returns False, and logs the reply, when the CAS server answers with
+        an error Result. Connection errors are raised.
+        """
+        session_key, operation_code = self.get_encryption_key(serial)
+        payload = defence_request(
+            self._token["session_id"], serial, enable, session_key, operation_code
+        )
 
         try:
-            defence_msg_string = cipher.encrypt(defence_msg_string)
-            my_socket.send(payload + defence_msg_string + payload_end_padding)
-            print(f"Set camera response: {my_socket.recv()}")
+            response = self._exchange(payload)
+            _LOGGER.debug("Set camera response: %s", response)
 
         except (socket.gaierror, ConnectionRefusedError) as err:
+            self._key_cache.invalidate(self._token["session_id"], serial)
             raise InvalidHost("Invalid IP or Hostname") from err
 
-        finally:
-            my_socket.close()
+        except (OSError, PyEzvizError):
+            # Timeouts and resets too, the key may be what the server refused.
+            self._key_cache.invalidate(self._token["session_id"], serial)
+            raise
+
+        if response_result(response) not in (None, 0):
+            # The cached key may be stale, fetch a new one next time.
+            self._key_cache.invalidate(self._token["session_id"], serial)
+            _LOGGER.warning(
+                "Could not set camera %s defence state: Got %r", serial, response
+            )
+            return False
 
         return True
@@ -0,0 +1,242 @@
+"""Asyncio client for the Ezviz CAS server."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+import logging
+import socket
+import ssl
+import time
+from typing import Any
+
+from .cas import CAS_KEY_CACHE, MAX_BODY_LENGTH, CASKeyCache, cas_ssl_context
+from .cas_codec import (
+    CAS_HEADER,
+    defence_request,
+    encryption_request,
+    parse_header,
+    parse_session,
+    response_result,
+)
+from .constants import DEFAULT_TIMEOUT
+from .exceptions import InvalidHost, PyEzvizError
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CASResult:
+    """Outcome of one CAS operation for one device."""
+
+    __slots__ = (
+        "serial",
+        "operation",
+        "success",
+        "result",
+        "key",
+        "operation_code",
+        "response",
+        "error",
+        "elapsed",
+    )
+
+    def __init__(self, serial: str, operation: str) -> None:
+        """Initialize an unfinished result."""
+        self.serial = serial
+        self.operation = operation
+        self.success = False
+        self.result: int | None = None
+        self.key: str | None = None
+        self.operation_code: str | None = None
+        self.response: bytes | None = None
+        self.error: str | None = None
+        self.elapsed = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the result as a plain dictionary, without the key."""
+        return {
+            "serial": self.serial,
+            "operation": self.operation,
+            "success": self.success,
+            "result": self.result,
+            "error": self.error,
+            "elapsed": self.elapsed,
+        }
+
+    def __repr__(self) -> str:
+        """Return a short representation."""
+        return (
+            f"CASResult(serial={self.serial!r}, operation={self.operation!r}, "
+            f"success={self.success}, result={self.result}, error={self.error!r})"
+        )
+
+
+class AsyncEzvizCAS:
+    """Ezviz CAS server client for asyncio.
+
+    Every reply is read using the body length from its 32 byte header, so
+    replies split over several TLS records are handled. Operations on
+    different devices run concurrently, limited by max_concurrency, and
+    return CASResult objects instead of raising per device errors.
+    """
+
+    def __init__(
+        self,
+        token: dict,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_concurrency: int = 16,
+        key_cache: CASKeyCache | None = None,
+    ) -> None:
+        """Initialize the client object."""
+        self._token = token
+        self._service_urls = token["service_urls"]
+        self._timeout = timeout
+        self._max_concurrency = max_concurrency
+        self._key_cache = key_cache or CAS_KEY_CACHE
+        self._context: ssl.SSLContext | None = None
+
+    @property
+    def _cas_server(self) -> tuple[str, int]:
+        """Return the CAS server host and port from the service urls."""
+        return (
+            self._service_urls["sysConf"][15],
+            int(self._service_urls["sysConf"][16]),
+        )
+
+    async def _exchange(self, payload: bytes) -> bytes:
+        """Send one request and return the body of the framed reply."""
+        if self._context is None:
+            self._context = cas_ssl_context()
+        host, port = self._cas_server
+
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(
+                    host, port, ssl=self._context, server_hostname=host
+                ),
+                self._timeout,
+            )
+
+        except (socket.gaierror, ConnectionRefusedError) as err:
+            raise InvalidHost("Invalid IP or Hostname") from err
+
+        try:
+            writer.write(payload)
+            await asyncio.wait_for(writer.drain(), self._timeout)
+
+            header = await asyncio.wait_for(
+                reader.readexactly(CAS_HEADER.size), self._timeout
+            )
+            _, _, body_length = parse_header(header)
+            if body_length > MAX_BODY_LENGTH:
+                raise PyEzvizError(f"CAS reply too large: {body_length} bytes")
+
+            body = await asyncio.wait_for(
+                reader.readexactly(body_length), self._timeout
+            )
+
+        except asyncio.IncompleteReadError as err:
+            raise PyEzvizError("CAS server closed the connection early") from err
+
+        finally:
+            writer.close()
+
+        _LOGGER.debug("CAS reply: %s", body)
+        return body
+
+    async def _run(self, result: CASResult, operation: Any) -> CASResult:
+        """Await an operation, recording timing and errors in result."""
+        started = time.monotonic()
+        try:
+            await operation
+
+        except asyncio.TimeoutError:
+            result.error = "Timed out"
+
+        except (OSError, PyEzvizError) as err:
+            result.error = str(err) or err.__class__.__name__
+
+        result.elapsed = time.monotonic() - started
+        return result
+
+    async def get_encryption(self, serial: str) -> CASResult:
+        """Fetch the session key and operation code for a device."""
+        result = CASResult(serial, "get_encryption")
+
+        async def _get() -> None:
+            body = await self._exchange(
+                encryption_request(self._token["session_id"], serial)
+            )
+            result.response = body
+            result.result = response_result(body)
+
+            session = parse_session(body)
+            if session is None:
+                raise PyEzvizError(f"Could not get CAS encryption key: Got {body!r}")
+
+            result.key, result.operation_code = session
+            result.success = True
+            self._key_cache.set(
+                self._token["session_id"],
+                serial,
+                result.key,
+                result.operation_code,
+            )
+
+        return await self._run(result, _get())
+
+    async def get_encryption_key(self, serial: str) -> tuple[str, str]:
+        """Return the cached or fetched (key, operation code) for a device."""
+        cached = self._key_cache.get(self._token["session_id"], serial)
+        if cached:
+            return cached
+
+        result = await self.get_encryption(serial)
+        if not result.success:
+            raise PyEzvizError(
+                f"Could not get CAS encryption key for {serial}: {result.error}"
+            )
+        return result.key, result.operation_code  # type: ignore[return-value]
+
+    async def set_camera_defence_state(self, serial: str, enable: int = 1) -> CASResult:
+        """Enable or disable alarm notifications of a device."""
+        result = CASResult(serial, "set_camera_defence_state")
+
+        async def _set() -> None:
+            session_key, operation_code = await self.get_encryption_key(serial)
+            try:
+                body = await self._exchange(
+                    defence_request(
+                        self._token["session_id"],
+                        serial,
+                        enable,
+                        session_key,
+                        operation_code,
+                    )
+                )
+
+            except BaseException:
+                self._key_cache.invalidate(self._token["session_id"], serial)
+                raise
+
+            result.response = body
+            result.result = response_result(body)
+            if result.result not in (None, 0):
+                # The cached key may be stale, fetch a new one next time.
+                self._key_cache.invalidate(self._token["session_id"], serial)
+                raise PyEzvizError(f"CAS server returned result {result.result}")
+            result.success = True
+
+        return await self._run(result, _set())
+
+    async def set_defence_states(
+        self, serials: Iterable[str], enable: int = 1
+    ) -> list[CASResult]:
+        """Set the defence state of many devices concurrently, in order."""
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def _limited(serial: str) -> CASResult:
+            async with semaphore:
+                return await self.set_camera_defence_state(serial, enable)
+
+        return list(await asyncio.gather(*(_limited(serial) for serial in serials)))
@@ -2,11 +2,15 @@
 
 from __future__ import annotations
 
-from datetime import datetime
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date as dt_date, datetime, timedelta
 import hashlib
 import json
 import logging
-from typing import Any
+import threading
+import time
+from typing import TYPE_CHECKING, Any
 import urllib.parse
 from uuid import uuid4
 
@@ -53,8 +57,8 @@ from .api_endpoints import (
     API_ENDPOINT_VIDEO_ENCRYPT,
 )
 from .camera import EzvizCamera
-from .cas import EzvizCAS
 from .constants import (
+    DEFAULT_DEVICE_CACHE_TTL,
     DEFAULT_TIMEOUT,
     FEATURE_CODE,
     MAX_RETRIES,
@@ -72,8 +76,13 @@ from .exceptions import (
     PyEzvizError,
 )
 from .light_bulb import EzvizLightBulb
+from .messages import EzvizMessage
+from .token_store import password_check, store_key
 from .utils import convert_to_dict, deep_merge
 
+if TYPE_CHECKING:
+    from .token_store import EzvizTokenStore
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -87,12 +96,30 @@ class EzvizClient:
         url: str = "apiieu.ezvizlife.com",
         timeout: int = DEFAULT_TIMEOUT,
         token: dict | None = None,
+        token_store: EzvizTokenStore | None = None,
+        device_cache_ttl: float = DEFAULT_DEVICE_CACHE_TTL,
     ) -> None:
-        """Initialize the client object."""
+        """Initialize the client object.
+
+        With a token_store and no token, a stored token for the account and
+        region is reused if it was saved with the same password, and new or
+        refreshed tokens are written back to the store.
+        Device lookups reuse the last page list for device_cache_ttl
+        seconds instead of fetching the whole account again, so opening
+        several devices in a row costs one fetch. Pass 0 to always fetch,
+        or call invalidate_device_cache() to force the next lookup.
+        """
         self.account = account
         self.password = (
             hashlib.md5(password.encode("utf-8")).hexdigest() if password else None
         )  # Ezviz API sends md5 of password
+        self._token_store = token_store
+        self._region = url
+        if token is None and token_store and account:
+            # A token of another region or password is not reused.
+            token = token_store.load(
+                self._token_store_key(account), self._password_check(account)
+            )
         self._session = requests.session()
         self._session.headers.update(REQUEST_HEADER)
         self._session.headers["sessionId"] = token["session_id"] if token else None
@@ -105,6 +132,10 @@ class EzvizClient:
         self._timeout = timeout
         self._cameras: dict[str, Any] = {}
         self._light_bulbs: dict[str, Any] = {}
+        self.device_cache_ttl = device_cache_ttl
+        self._device_snapshot_cache: tuple[dict, dict] | None = None
+        self._device_snapshot_time = 0.0
+        self._login_lock = threading.RLock()
 
     def _login(self, smscode: int | None = None) -> dict[Any, Any]:
         """Login to Ezviz API."""
@@ -162,6 +193,7 @@ class EzvizClient:
             }
 
             self._token["service_urls"] = self.get_service_urls()
+            self._save_token()
 
             return self._token
 
@@ -410,7 +442,7 @@ class EzvizClient:
             raise PyEzvizError("Can't gather proper data. Max retries exceeded.")
 
         params: dict[str, int | str | None] = {
-            "serials:": serials,
+            "serials": serials,
             "stype": s_type,
             "limit": limit,
             "date": date,
@@ -455,6 +487,66 @@ class EzvizClient:
 
         return json_output
 
+    def iter_device_messages(
+        self,
+        serials: str | None = None,
+        s_type: int = MessageFilterType.FILTER_TYPE_ALL_ALARM.value,
+        start_date: dt_date | None = None,
+        end_date: dt_date | None = None,
+        tags: str = "ALL",
+        limit: int = 50,
+        stop: Callable[[EzvizMessage], bool] | None = None,
+        end_time: str | None = None,
+    ) -> Iterator[EzvizMessage]:
+        """Walk the unified message list across pages and days, newest first.
+
+        Days are walked from end_date (default today) back to start_date
+        (default end_date). While the caller handles one page the next one is
+        already being fetched in the background. Iteration ends before the
+        first message for which stop returns True. end_time is a msgId on
+        end_date to continue after, e.g. the last message of an earlier run.
+        """
+        end_date = end_date or datetime.today().date()
+        start_date = start_date or end_date
+
+        if start_date > end_date:
+            raise PyEzvizError("start_date must not be after end_date")
+
+        def _page(day: dt_date, end_time: str | None) -> dict:
+            return self.get_device_messages_list(
+                serials=serials,
+                s_type=s_type,
+                limit=limit,
+                date=day.strftime("%Y%m%d"),
+                end_time=end_time,
+                tags=tags,
+            )
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            day = end_date
+            future = executor.submit(_page, day, end_time)
+
+            while future is not None:
+                json_output = future.result()
+                future = None
+                page = json_output.get("message") or []
+                next_end_time = page[-1].get("msgId") if page else None
+
+                # Queue the next request before handing this page to the caller.
+                if next_end_time and json_output.get("hasNext"):
+                    future = executor.submit(_page, day, next_end_time)
+                elif day > start_date:
+                    day -= timedelta(days=1)
+                    future = executor.submit(_page, day, None)
+
+                for item in page:
+                    message = EzvizMessage.from_json(item)
+                    if stop and stop(message):
+                        if future is not None:
+                            future.cancel()
+                        return
+                    yield message
+
     def switch_status(
         self,
         serial: str,
@@ -1203,10 +1295,12 @@ class EzvizClient:
 
         return True
 
-    def load_devices(self) -> dict[Any, Any]:
-        """Load and return all cameras and light bulb objects."""
+    def _supported_devices(
+        self, sections: str | None = None
+    ) -> Iterator[tuple[str, dict[str, Any], bool]]:
+        """Yield serial, details and whether it is a light bulb per device."""
 
-        devices = self.get_device_infos()
+        devices = self.get_device_infos(sections=sections)
         supported_categories = [
             DeviceCatagories.COMMON_DEVICE_CATEGORY.value,
             DeviceCatagories.CAMERA_DEVICE_CATEGORY.value,
@@ -1227,17 +1321,44 @@ class EzvizClient:
                 ):
                     continue
 
-                if (
+                yield device, data, (
                     data["deviceInfos"]["deviceCategory"]
                     == DeviceCatagories.LIGHTING.value
-                ):
-                    # Create a light bulb object
-                    self._light_bulbs[device] = EzvizLightBulb(
-                        self, device, data
-                    ).status()
-                else:
-                    # Create camera object
-                    self._cameras[device] = EzvizCamera(self, device, data).status()
+                )
+
+    def iter_cameras(
+        self, sections: str | None = None, refresh_alarm: bool = True
+    ) -> Iterator[tuple[str, dict[Any, Any]]]:
+        """Yield serial and status of each camera as soon as it is loaded.
+
+        sections limits the fetched pagelist sections, see get_device_infos.
+        Without refresh_alarm the per camera alarm list is not requested.
+        """
+
+        for device, data, is_light_bulb in self._supported_devices(sections):
+            if not is_light_bulb:
+                camera = EzvizCamera(self, device, data)
+                self._cameras[device] = camera.status(refresh_alarm)
+                yield device, self._cameras[device]
+
+    def iter_light_bulbs(self) -> Iterator[tuple[str, dict[Any, Any]]]:
+        """Yield serial and status of each light bulb as soon as it is loaded."""
+
+        for device, data, is_light_bulb in self._supported_devices():
+            if is_light_bulb:
+                self._light_bulbs[device] = EzvizLightBulb(self, device, data).status()
+                yield device, self._light_bulbs[device]
+
+    def load_devices(self) -> dict[Any, Any]:
+        """Load and return all cameras and light bulb objects."""
+
+        for device, data, is_light_bulb in self._supported_devices():
+            if is_light_bulb:
+                # Create a light bulb object
+                self._light_bulbs[device] = EzvizLightBulb(self, device, data).status()
+            else:
+                # Create camera object
+                self._cameras[device] = EzvizCamera(self, device, data).status()
 
         return {**self._cameras, **self._light_bulbs}
 
@@ -1253,59 +1374,118 @@ class EzvizClient:
         self.load_devices()
         return self._light_bulbs
 
-    def get_device_infos(self, serial: str | None = None) -> dict[Any, Any]:
-        """Load all devices and build dict per device serial."""
+    @staticmethod
+    def _index_page_list(devices: dict[str, Any]) -> dict[str, Any]:
+        """Map each serial to its deviceInfos entry, resource id and resources.
+
+        Built in one pass over each section, so joining the sections of a
+        device no longer scans the whole account.
+        """
+        res_ids: dict[str, str] = {}
+        for res_id, item in (devices.get("CLOUD") or {}).items():
+            res_ids.setdefault(item.get("deviceSerial"), res_id)
+
+        resources: dict[str, list] = {}
+        for item in devices.get("resourceInfos") or []:
+            resources.setdefault(item.get("deviceSerial"), []).append(item)
+
+        return {
+            device["deviceSerial"]: (
+                device,
+                res_ids.get(device["deviceSerial"], "NONE"),
+                resources.get(device["deviceSerial"], []),
+            )
+            for device in devices["deviceInfos"]
+        }
+
+    def _device_snapshot(self) -> tuple[dict[str, Any], dict[str, Any]]:
+        """Return the page list and its per serial index.
+
+        Both are reused for device_cache_ttl seconds.
+        """
+        if (
+            self._device_snapshot_cache is not None
+            and time.monotonic() - self._device_snapshot_time < self.device_cache_ttl
+        ):
+            return self._device_snapshot_cache
 
         devices = self._get_page_list()
-        result: dict[str, Any] = {}
-        _res_id = "NONE"
-
-        for device in devices["deviceInfos"]:
-            _serial = device["deviceSerial"]
-            _res_id_list = {
-                item
-                for item in devices.get("CLOUD", {})
-                if devices["CLOUD"][item].get("deviceSerial") == _serial
-            }
-            _res_id = _res_id_list.pop() if len(_res_id_list) else "NONE"
-
-            result[_serial] = {
-                "CLOUD": {_res_id: devices.get("CLOUD", {}).get(_res_id, {})},
-                "VTM": {_res_id: devices.get("VTM", {}).get(_res_id, {})},
-                "P2P": devices.get("P2P", {}).get(_serial, {}),
-                "CONNECTION": devices.get("CONNECTION", {}).get(_serial, {}),
-                "KMS": devices.get("KMS", {}).get(_serial, {}),
-                "STATUS": devices.get("STATUS", {}).get(_serial, {}),
-                "TIME_PLAN": devices.get("TIME_PLAN", {}).get(_serial, {}),
-                "CHANNEL": {_res_id: devices.get("CHANNEL", {}).get(_res_id, {})},
-                "QOS": devices.get("QOS", {}).get(_serial, {}),
-                "NODISTURB": devices.get("NODISTURB", {}).get(_serial, {}),
-                "FEATURE": devices.get("FEATURE", {}).get(_serial, {}),
-                "UPGRADE": devices.get("UPGRADE", {}).get(_serial, {}),
-                "FEATURE_INFO": devices.get("FEATURE_INFO", {}).get(_serial, {}),
-                "SWITCH": devices.get("SWITCH", {}).get(_serial, {}),
-                "CUSTOM_TAG": devices.get("CUSTOM_TAG", {}).get(_serial, {}),
-                "VIDEO_QUALITY": {
-                    _res_id: devices.get("VIDEO_QUALITY", {}).get(_res_id, {})
-                },
-                "resourceInfos": [
-                    item
-                    for item in devices.get("resourceInfos")
-                    if item.get("deviceSerial") == _serial
-                ],  # Could be more than one
-                "WIFI": devices.get("WIFI", {}).get(_serial, {}),
-                "deviceInfos": device,
-            }
+        self._device_snapshot_cache = (devices, self._index_page_list(devices))
+        self._device_snapshot_time = time.monotonic()
+        return self._device_snapshot_cache
+
+    def invalidate_device_cache(self) -> None:
+        """Fetch the page list again on the next device lookup."""
+        self._device_snapshot_cache = None
+
+    @staticmethod
+    def _build_device_info(
+        devices: dict[str, Any],
+        device: dict[str, Any],
+        _res_id: str,
+        resources: list,
+    ) -> dict[str, Any]:
+        """Collect the sections of one device from the page list."""
+        _serial = device["deviceSerial"]
+        status = dict(devices.get("STATUS", {}).get(_serial, {}))
+        if isinstance(status.get("optionals"), dict):
+            status["optionals"] = convert_to_dict(dict(status["optionals"]))
+
+        return {
+            "CLOUD": {_res_id: devices.get("CLOUD", {}).get(_res_id, {})},
+            "VTM": {_res_id: devices.get("VTM", {}).get(_res_id, {})},
+            "P2P": devices.get("P2P", {}).get(_serial, {}),
+            "CONNECTION": devices.get("CONNECTION", {}).get(_serial, {}),
+            "KMS": devices.get("KMS", {}).get(_serial, {}),
+            "STATUS": status,
+            "TIME_PLAN": devices.get("TIME_PLAN", {}).get(_serial, {}),
+            "CHANNEL": {_res_id: devices.get("CHANNEL", {}).get(_res_id, {})},
+            "QOS": devices.get("QOS", {}).get(_serial, {}),
+            "NODISTURB": devices.get("NODISTURB", {}).get(_serial, {}),
+            "FEATURE": devices.get("FEATURE", {}).get(_serial, {}),
+            "UPGRADE": devices.get("UPGRADE", {}).get(_serial, {}),
+            "FEATURE_INFO": devices.get("FEATURE_INFO", {}).get(_serial, {}),
+            "SWITCH": devices.get("SWITCH", {}).get(_serial, {}),
+            "CUSTOM_TAG": devices.get("CUSTOM_TAG", {}).get(_serial, {}),
+            "VIDEO_QUALITY": {
+                _res_id: devices.get("VIDEO_QUALITY", {}).get(_res_id, {})
+            },
+            "resourceInfos": list(resources),  # Could be more than one
+            "WIFI": devices.get("WIFI", {}).get(_serial, {}),
             # Nested keys are still encoded as JSON strings
-            result[_serial]["deviceInfos"]["supportExt"] = json.loads(
-                result[_serial]["deviceInfos"]["supportExt"]
-            )
-            convert_to_dict(result[_serial]["STATUS"].get("optionals"))
+            "deviceInfos": {
+                **device,
+                "supportExt": json.loads(device["supportExt"])
+                if isinstance(device.get("supportExt"), str)
+                else device.get("supportExt"),
+            },
+        }
 
-        if not serial:
-            return result
+    def get_device_infos(
+        self, serial: str | None = None, sections: str | None = None
+    ) -> dict[Any, Any]:
+        """Load all devices and build dict per device serial.
 
-        return result.get(serial, {})
+        With a serial only that device is built, an empty dict is returned
+        for unknown serials. sections is a pagelist filter such as
+        "STATUS,SWITCH" to fetch fewer sections, it bypasses the cache and
+        leaves the other sections empty.
+        """
+        if sections:
+            devices = self._get_page_list(sections)
+            index = self._index_page_list(devices)
+        else:
+            devices, index = self._device_snapshot()
+
+        if serial:
+            if serial not in index:
+                return {}
+            return self._build_device_info(devices, *index[serial])
+
+        return {
+            _serial: self._build_device_info(devices, *entry)
+            for _serial, entry in index.items()
+        }
 
     def ptz_control(
         self, command: str, serial: str, action: str, speed: int = 5
@@ -1607,8 +1787,61 @@ class EzvizClient:
 
         return True
 
+    def _token_store_key(self, account: str | None = None) -> str | None:
+        """Return the key the token is stored under, per account and region."""
+        account = account or self.account or self._token.get("username")
+        return store_key(account, self._region) if account else None
+
+    def _password_check(self, account: str | None = None) -> str | None:
+        """Return the stored digest of the password, None without one."""
+        account = account or self.account
+        if not account or not self.password:
+            return None
+        return password_check(account, self.password)
+
+    def _save_token(self) -> None:
+        """Write the current token to the token store, if there is one."""
+        key = self._token_store_key()
+        if self._token_store is None or not key:
+            return
+
+        try:
+            self._token_store.save(key, self._token, self._password_check())
+
+        except OSError as err:
+            _LOGGER.warning("Could not save login token: %s", err)
+
+    def _delete_token(self) -> None:
+        """Remove the current token from the token store, if there is one."""
+        key = self._token_store_key()
+        if self._token_store is None or not key:
+            return
+
+        try:
+            self._token_store.delete(key)
+
+        except OSError as err:
+            _LOGGER.warning("Could not remove login token: %s", err)
+
+    def has_token(self) -> bool:
+        """Return True if a session token is available without logging in."""
+        return bool(self._token.get("session_id") and self._token.get("service_urls"))
+
     def login(self, sms_code: int | None = None) -> dict[Any, Any]:
-        """Get or refresh ezviz login token."""
+        """Get or refresh ezviz login token.
+
+        Threads sharing the client refresh the token one at a time, a thread
+        that waited for another one's refresh reuses the new token instead
+        of refreshing again with the same refresh session id.
+        """
+        session_id = self._token["session_id"]
+        with self._login_lock:
+            if session_id and self._token["session_id"] != session_id:
+                return self._token
+            return self._refresh_or_login(sms_code)
+
+    def _refresh_or_login(self, sms_code: int | None = None) -> dict[Any, Any]:
+        """Refresh the session, or log in with account and password."""
         if self._token["session_id"] and self._token["rf_session_id"]:
             try:
                 req = self._session.put(
@@ -1646,6 +1879,7 @@ class EzvizClient:
 
                 if not self._token.get("service_urls"):
                     self._token["service_urls"] = self.get_service_urls()
+                self._save_token()
 
                 return self._token
 
@@ -1659,6 +1893,7 @@ class EzvizClient:
                     }
                     return self.login()
 
+                self._delete_token()
                 raise EzvizAuthTokenExpired(
                     f"Token expired, Login with username and password required: {req.text}"
                 )
@@ -1702,10 +1937,11 @@ class EzvizClient:
 
     def set_camera_defence_old(self, serial: str, enable: int) -> bool:
         """Enable/Disable motion detection on camera."""
-        cas_client = EzvizCAS(self._token)
-        cas_client.set_camera_defence_state(serial, enable)
+        # Imported here, the CAS client pulls in pycryptodome.
+        from .cas import EzvizCAS  # pylint: disable=import-outside-toplevel
 
-        return True
+        cas_client = EzvizCAS(self._token)
+        return cas_client.set_camera_defence_state(serial, enable)
 
     def api_set_defence_schedule(
         self, serial: str, schedule: str, enable: int, max_retries: int = 0
@@ -2134,17 +2370,17 @@ class EzvizClient:
 
         return True
 
-    def _get_page_list(self) -> Any:
+    def _get_page_list(
+        self,
+        page_filter: str = "CLOUD, TIME_PLAN, CONNECTION, SWITCH,"
+        "STATUS, WIFI, NODISTURB, KMS,"
+        "P2P, TIME_PLAN, CHANNEL, VTM, DETECTOR,"
+        "FEATURE, CUSTOM_TAG, UPGRADE, VIDEO_QUALITY,"
+        "QOS, PRODUCTS_INFO, SIM_CARD, MULTI_UPGRADE_EXT,"
+        "FEATURE_INFO",
+    ) -> Any:
         """Get ezviz device info broken down in sections."""
-        return self._api_get_pagelist(
-            page_filter="CLOUD, TIME_PLAN, CONNECTION, SWITCH,"
-            "STATUS, WIFI, NODISTURB, KMS,"
-            "P2P, TIME_PLAN, CHANNEL, VTM, DETECTOR,"
-            "FEATURE, CUSTOM_TAG, UPGRADE, VIDEO_QUALITY,"
-            "QOS, PRODUCTS_INFO, SIM_CARD, MULTI_UPGRADE_EXT,"
-            "FEATURE_INFO",
-            json_key=None,
-        )
+        return self._api_get_pagelist(page_filter=page_filter, json_key=None)
 
     def get_device(self) -> Any:
         """Get ezviz devices filter."""
@@ -4,6 +4,8 @@ from enum import Enum, unique
 FEATURE_CODE = "1fc28fa018178a1cd1c091b13b2f9f02"
 XOR_KEY = b"\x0c\x0eJ^X\x15@Rr"
 DEFAULT_TIMEOUT = 25
+# Seconds device lookups reuse the last page list.
+DEFAULT_DEVICE_CACHE_TTL = 5
 MAX_RETRIES = 3
 REQUEST_HEADER = {
     "featureCode": FEATURE_CODE,
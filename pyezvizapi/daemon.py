@@ -0,0 +1,282 @@
+"""Keep a logged in client running behind a local Unix socket.
+
+The protocol is one JSON object per line in both directions. A request is
+either {"argv": [...]} with regular command line arguments, answered with
+{"ok": bool, "output": str, "error": str | None}, or {"command": name}
+for "ping", "status" and "stop".
+"""
+
+from __future__ import annotations
+
+import argparse
+from contextlib import redirect_stderr, redirect_stdout
+import io
+import json
+import logging
+import os
+import socket
+import time
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .client import EzvizClient
+    from .mqtt import MQTTClient
+
+_LOGGER = logging.getLogger(__name__)
+
+MAX_REQUEST_SIZE = 1024 * 1024
+
+# Commands that only read state, the device cache stays valid after them.
+READ_ONLY_ACTIONS = {
+    ("devices", None),
+    ("devices_light", "status"),
+    ("camera", "status"),
+    ("light", "status"),
+}
+
+
+def default_socket_path() -> str:
+    """Return the default control socket path for the current user."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "pyezvizapi.sock")
+    return os.path.join(os.path.expanduser("~"), ".cache", "pyezvizapi", "daemon.sock")
+
+
+def send_request(
+    request: dict[str, Any], socket_path: str | None = None, timeout: float = 60
+) -> dict[str, Any]:
+    """Send one request to a running daemon and return its reply.
+
+    Raises OSError (e.g. FileNotFoundError, ConnectionRefusedError) when no
+    daemon is listening.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path or default_socket_path())
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        with sock.makefile("rb") as reader:
+            line = reader.readline(MAX_REQUEST_SIZE)
+
+    if not line:
+        raise ConnectionResetError("Daemon closed the connection")
+    return json.loads(line)
+
+
+class EzvizDaemon:
+    """Serve CLI commands with one long lived EzvizClient.
+
+    The client keeps its HTTP connection pool and token between commands,
+    device details are cached for device_ttl seconds and an MQTTClient can
+    collect push messages in the background. Requests are handled one at a
+    time, in the order they arrive.
+    """
+
+    def __init__(
+        self,
+        client: EzvizClient,
+        account: str | None,
+        socket_path: str | None = None,
+        device_ttl: float = 30,
+        mqtt: bool = False,
+    ) -> None:
+        """Initialize the daemon."""
+        self._client = client
+        self._client.device_cache_ttl = device_ttl
+        self._account = account
+        self.socket_path = socket_path or default_socket_path()
+        self._device_ttl = device_ttl
+        self._use_mqtt = mqtt
+        self._mqtt: MQTTClient | None = None
+        self._devices: dict[str, Any] | None = None
+        self._devices_time = 0.0
+        self._started = time.monotonic()
+        self._requests = 0
+        self._running = False
+
+    def devices(self) -> dict[str, Any]:
+        """Return device details per serial, cached for device_ttl seconds."""
+        if (
+            self._devices is None
+            or time.monotonic() - self._devices_time > self._device_ttl
+        ):
+            self._devices = self._client.get_device_infos()
+            self._devices_time = time.monotonic()
+        return self._devices
+
+    def invalidate_devices(self) -> None:
+        """Drop cached device details."""
+        self._client.invalidate_device_cache()
+        self._devices = None
+
+    def _run_argv(self, argv: list[str]) -> dict[str, Any]:
+        """Run regular CLI arguments against the shared client."""
+        # pylint: disable=import-outside-toplevel
+        from .__main__ import HANDLERS, build_parser, runs_locally
+
+        output = io.StringIO()
+        with redirect_stdout(output), redirect_stderr(output):
+            try:
+                args = build_parser().parse_args(argv)
+
+            except SystemExit:
+                return {"ok": False, "output": output.getvalue(), "error": None}
+
+        if self._account and args.username != self._account:
+            return {
+                "ok": False,
+                "output": "",
+                "error": f"Daemon is logged in as {self._account}",
+            }
+
+        handler = HANDLERS.get(args.action)
+        if handler is None or runs_locally(args):
+            return {
+                "ok": False,
+                "output": "",
+                "error": f"Action not available in daemon: {args.action}",
+            }
+
+        sub_action = getattr(args, f"{args.action}_action", None)
+
+        with redirect_stdout(output):
+            try:
+                if args.action in ("camera", "light"):
+                    handler(self._client, args, devices=self.devices())
+                else:
+                    handler(self._client, args)
+
+            except Exception as exp:  # pylint: disable=broad-except
+                return {"ok": False, "output": output.getvalue(), "error": str(exp)}
+
+            finally:
+                if (args.action, sub_action) not in READ_ONLY_ACTIONS:
+                    self.invalidate_devices()
+
+        return {"ok": True, "output": output.getvalue(), "error": None}
+
+    def status(self) -> dict[str, Any]:
+        """Return daemon state for the status command."""
+        return {
+            "account": self._account,
+            "pid": os.getpid(),
+            "uptime": time.monotonic() - self._started,
+            "requests": self._requests,
+            "devices_cached": self._devices is not None,
+            "devices_age": time.monotonic() - self._devices_time
+            if self._devices is not None
+            else None,
+            "mqtt": self._mqtt is not None,
+            "mqtt_messages": self._mqtt.rcv_message if self._mqtt else {},
+        }
+
+    def handle(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Answer one request."""
+        self._requests += 1
+        command = request.get("command")
+
+        if "argv" in request:
+            return self._run_argv([str(arg) for arg in request["argv"]])
+        if command == "ping":
+            return {"ok": True, "output": "pong", "error": None}
+        if command == "status":
+            return {"ok": True, "output": self.status(), "error": None}
+        if command == "stop":
+            self._running = False
+            return {"ok": True, "output": "stopping", "error": None}
+
+        return {"ok": False, "output": "", "error": f"Unknown command: {command}"}
+
+    def _serve_connection(self, conn: socket.socket) -> None:
+        """Answer requests on one connection until the peer closes it."""
+        with conn, conn.makefile("rb") as reader:
+            for line in iter(lambda: reader.readline(MAX_REQUEST_SIZE), b""):
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("Request must be a JSON object")
+                    reply = self.handle(request)
+
+                except ValueError as err:
+                    reply = {"ok": False, "output": "", "error": str(err)}
+
+                conn.sendall(json.dumps(reply, default=str).encode() + b"\n")
+                if not self._running:
+                    return
+
+    def _start_mqtt(self) -> None:
+        """Start collecting push messages in the background."""
+        from .mqtt import MQTTClient  # pylint: disable=import-outside-toplevel
+
+        # pylint: disable=protected-access
+        self._mqtt = MQTTClient(self._client._token)
+        self._mqtt.run()
+
+    def serve_forever(self) -> None:
+        """Listen on the control socket until a stop command arrives."""
+        directory = os.path.dirname(os.path.abspath(self.socket_path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+        try:
+            send_request({"command": "ping"}, self.socket_path, timeout=1)
+
+        except OSError:
+            # Nobody answers, remove a socket left behind by a crashed daemon.
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+        else:
+            raise OSError(f"A daemon is already listening on {self.socket_path}")
+
+        if self._use_mqtt:
+            self._start_mqtt()
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            server.bind(self.socket_path)
+        finally:
+            os.umask(old_umask)
+        server.listen(16)
+        self._running = True
+        _LOGGER.info("Daemon listening on %s", self.socket_path)
+
+        try:
+            while self._running:
+                conn, _ = server.accept()
+                try:
+                    self._serve_connection(conn)
+
+                except OSError as err:
+                    _LOGGER.debug("Daemon connection failed: %s", err)
+
+        except KeyboardInterrupt:
+            pass
+
+        finally:
+            server.close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            if self._mqtt is not None:
+                try:
+                    self._mqtt.stop()
+                except Exception as err:  # pylint: disable=broad-except
+                    _LOGGER.debug("Could not stop MQTT: %s", err)
+            self._client.close_session()
+
+
+def run_daemon(client: EzvizClient, args: argparse.Namespace) -> None:
+    """Run the daemon command of the CLI."""
+    if args.daemon_action == "start":
+        EzvizDaemon(
+            client,
+            args.username,
+            args.socket,
+            device_ttl=args.device_ttl,
+            mqtt=args.mqtt,
+        ).serve_forever()
+        return
+
+    reply = send_request({"command": args.daemon_action}, args.socket)
+    output = reply["output"]
+    print(output if isinstance(output, str) else json.dumps(output, indent=2))
@@ -0,0 +1,255 @@
+"""Export the unified message history with resumable checkpoints."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+import json
+import logging
+import os
+import queue
+import threading
+from typing import TYPE_CHECKING, Any
+
+from .constants import MessageFilterType
+from .exceptions import PyEzvizError
+from .messages import EzvizMessage
+
+if TYPE_CHECKING:
+    from .client import EzvizClient
+
+_LOGGER = logging.getLogger(__name__)
+
+MESSAGE_COLUMNS = [
+    "serial",
+    "channel",
+    "time",
+    "time_str",
+    "sub_type",
+    "title",
+    "pic_url",
+]
+
+ALARM_COLUMNS = [
+    "deviceSerial",
+    "alarmType",
+    "alarmStartTimeStr",
+    "sampleName",
+    "picUrl",
+]
+
+# Write the checkpoint after this many messages, and after every day.
+CHECKPOINT_EVERY = 100
+
+# Messages a prefetched day may hold before its worker waits, a few pages.
+DAY_BUFFER = 200
+
+_DAY_DONE = object()
+
+
+class EzvizMessageHistory:
+    """Iterate over all messages of a query, newest first, across days.
+
+    Up to workers days are fetched at the same time, messages are still
+    returned in order and as soon as their page arrived. With a
+    checkpoint_path the position of the last returned message is saved
+    regularly, and a later run of the same query continues after it, even
+    when the default end date, today, has moved on since. The checkpoint is
+    removed once the walk finished.
+    """
+
+    def __init__(
+        self,
+        client: EzvizClient,
+        serials: list[str] | None = None,
+        s_type: int = MessageFilterType.FILTER_TYPE_ALL_ALARM.value,
+        tags: str = "ALL",
+        start_date: date | None = None,
+        end_date: date | None = None,
+        workers: int = 4,
+        checkpoint_path: str | None = None,
+    ) -> None:
+        """Initialize the history walk."""
+        self._client = client
+        self._end_date = end_date or datetime.today().date()
+        self._start_date = start_date or self._end_date
+        if self._start_date > self._end_date:
+            raise PyEzvizError("start_date must not be after end_date")
+
+        # Dates as given, the resolved ones are stored next to the query.
+        self._query = {
+            "serials": ",".join(serials) if serials else None,
+            "s_type": s_type,
+            "tags": tags,
+            "start_date": start_date.isoformat() if start_date else None,
+            "end_date": end_date.isoformat() if end_date else None,
+        }
+        self._workers = max(1, workers)
+        self._checkpoint_path = checkpoint_path
+        self.count = 0
+
+    def load_checkpoint(self) -> dict[str, Any] | None:
+        """Return the saved position of this query, None to start over."""
+        if not self._checkpoint_path:
+            return None
+
+        try:
+            with open(self._checkpoint_path, encoding="utf-8") as checkpoint:
+                state = json.load(checkpoint)
+
+        except FileNotFoundError:
+            return None
+
+        except (OSError, ValueError) as err:
+            raise PyEzvizError(
+                f"Unreadable checkpoint {self._checkpoint_path}"
+            ) from err
+
+        if state.get("query") != self._query:
+            raise PyEzvizError(
+                f"Checkpoint {self._checkpoint_path} belongs to another query"
+            )
+        return state
+
+    def _save_checkpoint(self, day: date, msg_id: str | None) -> None:
+        """Remember the last returned message, replacing the file atomically."""
+        if not self._checkpoint_path:
+            return
+
+        tmp_path = f"{self._checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as checkpoint:
+            json.dump(
+                {
+                    "query": self._query,
+                    "start_date": self._start_date.isoformat(),
+                    "end_date": self._end_date.isoformat(),
+                    "day": day.isoformat(),
+                    "msg_id": msg_id,
+                    "count": self.count,
+                },
+                checkpoint,
+            )
+        os.replace(tmp_path, self._checkpoint_path)
+
+    def _fetch_day(
+        self,
+        day: date,
+        end_time: str | None,
+        messages: queue.Queue,
+        closed: threading.Event,
+    ) -> None:
+        """Put the messages of one day into messages as pages arrive."""
+
+        def _put(item: Any) -> bool:
+            while not closed.is_set():
+                try:
+                    messages.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        try:
+            for message in self._client.iter_device_messages(
+                serials=self._query["serials"],
+                s_type=self._query["s_type"],
+                start_date=day,
+                end_date=day,
+                tags=self._query["tags"],
+                end_time=end_time,
+            ):
+                if not _put(message):
+                    return
+
+        except Exception as err:  # pylint: disable=broad-except
+            _put(err)
+            return
+
+        _put(_DAY_DONE)
+
+    def __iter__(self) -> Iterator[EzvizMessage]:
+        """Yield messages, continuing from the checkpoint if there is one."""
+        first_day, end_time = self._end_date, None
+        state = self.load_checkpoint()
+        if state:
+            self._start_date = date.fromisoformat(state["start_date"])
+            self._end_date = date.fromisoformat(state["end_date"])
+            first_day = date.fromisoformat(state["day"])
+            end_time = state["msg_id"]
+            self.count = state["count"]
+            _LOGGER.info("Resuming after %s messages on %s", self.count, first_day)
+
+        days = [
+            first_day - timedelta(days=offset)
+            for offset in range((first_day - self._start_date).days + 1)
+        ]
+
+        # Position after the last message the caller got, saved on close.
+        position: tuple[date, str | None] = (first_day, end_time)
+        pending: deque[tuple[date, queue.Queue, Future]] = deque()
+        next_day = iter(days)
+        closed = threading.Event()
+
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+
+            def _queue() -> None:
+                for day in next_day:
+                    cursor = end_time if day == first_day else None
+                    messages: queue.Queue = queue.Queue(DAY_BUFFER)
+                    future = executor.submit(
+                        self._fetch_day, day, cursor, messages, closed
+                    )
+                    pending.append((day, messages, future))
+                    if len(pending) >= self._workers:
+                        return
+
+            try:
+                _queue()
+                while pending:
+                    day, messages, _ = pending.popleft()
+                    _queue()
+
+                    while True:
+                        message = messages.get()
+                        if message is _DAY_DONE:
+                            break
+                        if isinstance(message, Exception):
+                            raise message
+                        yield message
+                        self.count += 1
+                        position = (day, message.msg_id)
+                        if self.count % CHECKPOINT_EVERY == 0:
+                            self._save_checkpoint(*position)
+
+                    # This day is done, continue with the day before.
+                    position = (day - timedelta(days=1), None)
+                    self._save_checkpoint(*position)
+
+            except BaseException:
+                closed.set()
+                for _, _, future in pending:
+                    future.cancel()
+                self._save_checkpoint(*position)
+                raise
+
+        if self._checkpoint_path and os.path.exists(self._checkpoint_path):
+            os.unlink(self._checkpoint_path)
+
+
+def message_rows(
+    messages: Iterator[EzvizMessage],
+) -> Iterator[tuple[str | None, dict[str, Any]]]:
+    """Return (msg_id, fields) pairs for the row writers."""
+    for message in messages:
+        yield message.msg_id, message.as_dict()
+
+
+def alarm_rows(
+    client: EzvizClient, serials: list[str], limit: int = 50
+) -> Iterator[tuple[str | None, dict[str, Any]]]:
+    """Return (alarmId, alarm) pairs of the latest alarms per camera."""
+    for serial in serials:
+        for alarm in client.get_alarminfo(serial, limit).get("alarms") or []:
+            yield alarm.get("alarmId"), alarm
@@ -0,0 +1,256 @@
+"""Append-only on-disk journal for push events."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any
+
+from .exceptions import PyEzvizError
+
+_LOGGER = logging.getLogger(__name__)
+
+INDEX_FILE = "index.json"
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".jsonl"
+
+
+class EzvizEventJournal:
+    """Store push events in rotating JSON-lines segment files.
+
+    Every segment keeps its time range, the serials it contains and a sparse
+    list of (time, byte offset) pairs in a small index file. Replaying "all
+    events since T" only opens segments that can contain matching events and
+    seeks close to the first one instead of scanning from the start.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_segment_bytes: int = 4 * 1024 * 1024,
+        max_segments: int | None = None,
+        index_interval: int = 64,
+        fsync: bool = False,
+    ) -> None:
+        """Open (or create) the journal directory."""
+        self._path = path
+        self._max_segment_bytes = max_segment_bytes
+        self._max_segments = max_segments
+        self._index_interval = index_interval
+        self._fsync = fsync
+        self._lock = threading.Lock()
+        self._file: Any = None
+        os.makedirs(self._path, exist_ok=True)
+        self._segments: list[dict[str, Any]] = self._load_index()
+
+    def _load_index(self) -> list[dict[str, Any]]:
+        """Read the segment index from disk."""
+        try:
+            with open(
+                os.path.join(self._path, INDEX_FILE), encoding="utf-8"
+            ) as index_file:
+                segments = json.load(index_file)["segments"]
+
+        except FileNotFoundError:
+            return []
+
+        except (ValueError, KeyError) as err:
+            raise PyEzvizError(
+                "Impossible to decode journal index: " + str(err)
+            ) from err
+
+        for segment in segments:
+            segment["serials"] = set(segment["serials"])
+
+        if segments:
+            self._recover_tail(segments[-1])
+
+        return segments
+
+    def _recover_tail(self, segment: dict[str, Any]) -> None:
+        """Catch up index stats for events written after the last index save."""
+        if segment["sparse"]:
+            count = (len(segment["sparse"]) - 1) * self._index_interval
+            offset = segment["sparse"][-1][1]
+        else:
+            count, offset = 0, 0
+
+        try:
+            with open(os.path.join(self._path, segment["file"]), "r+b") as tail:
+                tail.seek(offset)
+                for line in tail:
+                    try:
+                        record = json.loads(line)
+
+                    except ValueError:
+                        break
+
+                    if (
+                        count % self._index_interval == 0
+                        and count // self._index_interval >= len(segment["sparse"])
+                    ):
+                        segment["sparse"].append([record["t"], offset])
+                    offset += len(line)
+                    count += 1
+                    segment["last_time"] = max(segment["last_time"], record["t"])
+                    segment["serials"].add(record["serial"])
+
+                # Drop a partially written last line.
+                tail.truncate(offset)
+
+        except FileNotFoundError:
+            return
+
+        segment["count"] = count
+        segment["size"] = offset
+
+    def _save_index(self) -> None:
+        """Atomically write the segment index to disk."""
+        index_path = os.path.join(self._path, INDEX_FILE)
+        tmp_path = index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as index_file:
+            json.dump(
+                {
+                    "segments": [
+                        {**segment, "serials": sorted(segment["serials"])}
+                        for segment in self._segments
+                    ]
+                },
+                index_file,
+            )
+        os.replace(tmp_path, index_path)
+
+    def _new_segment(self, event_time: float) -> dict[str, Any]:
+        """Start a new segment file."""
+        if self._file:
+            self._file.close()
+            self._file = None
+
+        sequence = self._segments[-1]["sequence"] + 1 if self._segments else 0
+        segment = {
+            "file": f"{SEGMENT_PREFIX}{sequence:08d}{SEGMENT_SUFFIX}",
+            "sequence": sequence,
+            "first_time": event_time,
+            "last_time": event_time,
+            "count": 0,
+            "size": 0,
+            "serials": set(),
+            "sparse": [],
+        }
+        self._segments.append(segment)
+
+        if self._max_segments and len(self._segments) > self._max_segments:
+            for expired in self._segments[: -self._max_segments]:
+                try:
+                    os.remove(os.path.join(self._path, expired["file"]))
+                except FileNotFoundError:
+                    pass
+            del self._segments[: -self._max_segments]
+
+        self._save_index()
+
+        return segment
+
+    def append(
+        self, serial: str, event: dict[str, Any], event_time: float | None = None
+    ) -> None:
+        """Append one event for a device serial."""
+        event_time = time.time() if event_time is None else event_time
+        line = (
+            json.dumps(
+                {"t": event_time, "serial": serial, "event": event},
+                separators=(",", ":"),
+            )
+            + "\n"
+        ).encode("utf-8")
+
+        with self._lock:
+            segment = self._segments[-1] if self._segments else None
+            if segment is None or segment["size"] >= self._max_segment_bytes:
+                segment = self._new_segment(event_time)
+
+            if self._file is None:
+                self._file = open(  # pylint: disable=consider-using-with
+                    os.path.join(self._path, segment["file"]), "ab"
+                )
+                segment["size"] = self._file.tell()
+
+            if segment["count"] % self._index_interval == 0:
+                segment["sparse"].append([event_time, segment["size"]])
+
+            self._file.write(line)
+            self._file.flush()
+            if self._fsync:
+                os.fsync(self._file.fileno())
+
+            segment["size"] += len(line)
+            segment["count"] += 1
+            segment["last_time"] = max(segment["last_time"], event_time)
+            segment["serials"].add(serial)
+            if segment["count"] % self._index_interval == 0:
+                self._save_index()
+
+    def replay(
+        self, since: float = 0, serial: str | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """Yield journaled events received at or after since, oldest first.
+
+        Each item holds the receive time ("t"), the device "serial" and the
+        original push "event".
+        """
+        with self._lock:
+            if self._file:
+                self._file.flush()
+            segments = [
+                {**segment, "serials": set(segment["serials"])}
+                for segment in self._segments
+            ]
+
+        for segment in segments:
+            if segment["last_time"] < since:
+                continue
+            if serial and serial not in segment["serials"]:
+                continue
+
+            offset = 0
+            for sparse_time, sparse_offset in segment["sparse"]:
+                if sparse_time > since:
+                    break
+                offset = sparse_offset
+
+            try:
+                with open(
+                    os.path.join(self._path, segment["file"]), "rb"
+                ) as segment_file:
+                    segment_file.seek(offset)
+                    for line in segment_file:
+                        try:
+                            record = json.loads(line)
+
+                        except ValueError:
+                            _LOGGER.warning(
+                                "Skipping corrupt journal line in %s", segment["file"]
+                            )
+                            continue
+
+                        if record["t"] < since:
+                            continue
+                        if serial and record["serial"] != serial:
+                            continue
+                        yield record
+
+            except FileNotFoundError:
+                _LOGGER.warning("Journal segment %s is missing", segment["file"])
+
+    def close(self) -> None:
+        """Flush the index and close the active segment file."""
+        with self._lock:
+            if self._segments:
+                self._save_index()
+            if self._file:
+                self._file.close()
+                self._file = None
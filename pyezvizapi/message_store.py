@@ -0,0 +1,310 @@
+"""Local SQLite store for alarms and unified messages."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import json
+import sqlite3
+import threading
+from typing import TYPE_CHECKING, Any
+
+from .constants import MessageFilterType
+from .messages import EzvizMessage
+
+if TYPE_CHECKING:
+    from .client import EzvizClient
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alarms (
+    alarm_id TEXT PRIMARY KEY,
+    serial TEXT,
+    alarm_type TEXT,
+    alarm_time INTEGER,
+    time_str TEXT,
+    name TEXT,
+    pic_url TEXT,
+    raw TEXT
+);
+CREATE INDEX IF NOT EXISTS alarms_serial_time ON alarms (serial, alarm_time);
+CREATE INDEX IF NOT EXISTS alarms_type_time ON alarms (alarm_type, alarm_time);
+CREATE INDEX IF NOT EXISTS alarms_time ON alarms (alarm_time);
+
+CREATE TABLE IF NOT EXISTS messages (
+    msg_id TEXT PRIMARY KEY,
+    serial TEXT,
+    sub_type TEXT,
+    msg_time INTEGER,
+    time_str TEXT,
+    title TEXT,
+    pic_url TEXT,
+    ext TEXT
+);
+CREATE INDEX IF NOT EXISTS messages_serial_time ON messages (serial, msg_time);
+CREATE INDEX IF NOT EXISTS messages_type_time ON messages (sub_type, msg_time);
+CREATE INDEX IF NOT EXISTS messages_time ON messages (msg_time);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    source TEXT NOT NULL,
+    serial TEXT NOT NULL,
+    last_id TEXT,
+    last_time INTEGER,
+    PRIMARY KEY (source, serial)
+);
+"""
+
+# Hourly buckets are computed from millisecond epoch columns.
+HOUR_BUCKET = "strftime('%Y-%m-%d %H:00', {column} / 1000, 'unixepoch', 'localtime')"
+
+
+def _alarm_time(alarm: dict[str, Any]) -> int:
+    """Return the alarm start time in milliseconds, 0 if unknown."""
+    try:
+        return int(alarm.get("alarmStartTime") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class EzvizMessageStore:
+    """Keep alarms and unified messages in an indexed SQLite database.
+
+    sync_alarms() and sync_messages() only ask the API for entries newer than
+    the last stored one per serial, so dashboards can query history locally
+    instead of calling get_alarminfo or get_device_messages_list each time.
+    """
+
+    def __init__(self, path: str = ":memory:") -> None:
+        """Open (or create) the store."""
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def _get_sync_state(self, source: str, serial: str) -> tuple[Any, Any]:
+        """Return last seen id and time for a source and serial."""
+        row = self._conn.execute(
+            "SELECT last_id, last_time FROM sync_state WHERE source = ? AND serial = ?",
+            (source, serial),
+        ).fetchone()
+        return (row["last_id"], row["last_time"]) if row else (None, None)
+
+    def _set_sync_state(
+        self, source: str, serial: str, last_id: Any, last_time: Any
+    ) -> None:
+        """Remember last seen id and time for a source and serial."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO sync_state (source, serial, last_id, last_time) "
+            "VALUES (?, ?, ?, ?)",
+            (source, serial, last_id, last_time),
+        )
+
+    def add_alarms(self, alarms: list[dict[str, Any]]) -> int:
+        """Store alarms from the alarm info API, returns number of new rows."""
+        rows = [
+            (
+                str(alarm.get("alarmId")),
+                alarm.get("deviceSerial"),
+                str(alarm.get("alarmType")),
+                _alarm_time(alarm),
+                alarm.get("alarmStartTimeStr"),
+                alarm.get("sampleName"),
+                alarm.get("picUrl"),
+                json.dumps(alarm),
+            )
+            for alarm in alarms
+            if alarm.get("alarmId") is not None
+        ]
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO alarms VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            return self._conn.total_changes - before
+
+    def add_messages(self, messages: list[EzvizMessage]) -> int:
+        """Store unified message records, returns number of new rows."""
+        rows = [
+            (
+                message.msg_id,
+                message.serial,
+                message.sub_type,
+                message.time,
+                message.time_str,
+                message.title,
+                message.pic_url,
+                json.dumps(message.ext),
+            )
+            for message in messages
+            if message.msg_id is not None
+        ]
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO messages VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            return self._conn.total_changes - before
+
+    def sync_alarms(self, client: EzvizClient, serial: str, limit: int = 20) -> int:
+        """Fetch alarms newer than the last stored one for a camera.
+
+        The alarm info API only returns the latest alarms, so limit should
+        cover the number of alarms expected between two syncs.
+        """
+        with self._lock:
+            _, last_time = self._get_sync_state("alarms", serial)
+
+        alarms = client.get_alarminfo(serial, limit=limit).get("alarms") or []
+        new_alarms = [
+            alarm
+            for alarm in alarms
+            if last_time is None or _alarm_time(alarm) >= last_time
+        ]
+        added = self.add_alarms(new_alarms)
+
+        if new_alarms:
+            newest = max(new_alarms, key=_alarm_time)
+            with self._lock, self._conn:
+                self._set_sync_state(
+                    "alarms", serial, str(newest.get("alarmId")), _alarm_time(newest)
+                )
+
+        return added
+
+    def sync_messages(
+        self,
+        client: EzvizClient,
+        serial: str | None = None,
+        s_type: int = MessageFilterType.FILTER_TYPE_ALL_ALARM.value,
+        initial_days: int = 7,
+        batch_size: int = 500,
+    ) -> int:
+        """Fetch unified messages newer than the last stored one.
+
+        Without a serial the whole account is synced under one checkpoint.
+        The first sync goes back initial_days days.
+        """
+        key = serial or "*"
+        with self._lock:
+            last_id, last_time = self._get_sync_state(f"messages:{s_type}", key)
+
+        today = datetime.today().date()
+        if last_time:
+            start_date = datetime.fromtimestamp(last_time / 1000).date()
+        else:
+            start_date = today - timedelta(days=max(initial_days - 1, 0))
+
+        def _seen(message: EzvizMessage) -> bool:
+            # Messages sharing the checkpoint's millisecond are fetched again
+            # and deduplicated by INSERT OR IGNORE.
+            if last_time and message.time:
+                return message.time < last_time
+            return last_id is not None and message.msg_id == last_id
+
+        added = 0
+        newest: EzvizMessage | None = None
+        batch: list[EzvizMessage] = []
+        for message in client.iter_device_messages(
+            serials=serial, s_type=s_type, start_date=start_date, stop=_seen
+        ):
+            if newest is None or (message.time or 0) > (newest.time or 0):
+                newest = message
+            batch.append(message)
+            if len(batch) >= batch_size:
+                added += self.add_messages(batch)
+                batch = []
+
+        added += self.add_messages(batch)
+
+        # Only move the checkpoint once everything newer has been stored.
+        if newest is not None:
+            with self._lock, self._conn:
+                self._set_sync_state(
+                    f"messages:{s_type}", key, newest.msg_id, newest.time
+                )
+
+        return added
+
+    def last_alarms(self, serial: str, limit: int = 10) -> list[dict[str, Any]]:
+        """Return the latest stored alarms for a camera, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT raw FROM alarms WHERE serial = ? "
+                "ORDER BY alarm_time DESC LIMIT ?",
+                (serial, limit),
+            ).fetchall()
+        return [json.loads(row["raw"]) for row in rows]
+
+    def last_messages(
+        self, serial: str | None = None, limit: int = 10
+    ) -> list[EzvizMessage]:
+        """Return the latest stored unified messages, newest first."""
+        query = "SELECT * FROM messages"
+        params: list[Any] = []
+        if serial:
+            query += " WHERE serial = ?"
+            params.append(serial)
+        query += " ORDER BY msg_time DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        return [
+            EzvizMessage(
+                msg_id=row["msg_id"],
+                serial=row["serial"],
+                channel=None,
+                time=row["msg_time"],
+                time_str=row["time_str"],
+                sub_type=row["sub_type"],
+                title=row["title"],
+                pic_url=row["pic_url"],
+                ext=json.loads(row["ext"]) if row["ext"] else {},
+            )
+            for row in rows
+        ]
+
+    def _hourly_counts(
+        self,
+        table: str,
+        type_column: str,
+        time_column: str,
+        serial: str | None,
+        since: datetime | None,
+    ) -> list[dict[str, Any]]:
+        """Count rows per type per hour."""
+        bucket = HOUR_BUCKET.format(column=time_column)
+        query = (
+            f"SELECT {bucket} AS hour, {type_column} AS type, COUNT(*) AS count "
+            f"FROM {table} WHERE 1 = 1"
+        )
+        params: list[Any] = []
+        if serial:
+            query += " AND serial = ?"
+            params.append(serial)
+        if since:
+            query += f" AND {time_column} >= ?"
+            params.append(int(since.timestamp() * 1000))
+        query += " GROUP BY hour, type ORDER BY hour, type"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def alarm_counts_per_hour(
+        self, serial: str | None = None, since: datetime | None = None
+    ) -> list[dict[str, Any]]:
+        """Return stored alarm counts per alarm type per hour."""
+        return self._hourly_counts("alarms", "alarm_type", "alarm_time", serial, since)
+
+    def message_counts_per_hour(
+        self, serial: str | None = None, since: datetime | None = None
+    ) -> list[dict[str, Any]]:
+        """Return stored unified message counts per sub type per hour."""
+        return self._hourly_counts("messages", "sub_type", "msg_time", serial, since)
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,79 @@
+"""Unified message records."""
+
+from __future__ import annotations
+
+from typing import Any
+
+
+class EzvizMessage:
+    """Compact record for one unified message list entry."""
+
+    __slots__ = (
+        "msg_id",
+        "serial",
+        "channel",
+        "time",
+        "time_str",
+        "sub_type",
+        "title",
+        "pic_url",
+        "ext",
+    )
+
+    def __init__(
+        self,
+        msg_id: str | None,
+        serial: str | None,
+        channel: int | None,
+        time: int | None,
+        time_str: str | None,
+        sub_type: str | None,
+        title: str | None,
+        pic_url: str | None,
+        ext: dict[str, Any],
+    ) -> None:
+        """Initialize the message record."""
+        self.msg_id = msg_id
+        self.serial = serial
+        self.channel = channel
+        self.time = time
+        self.time_str = time_str
+        self.sub_type = sub_type
+        self.title = title
+        self.pic_url = pic_url
+        self.ext = ext
+
+    @classmethod
+    def from_json(cls, message: dict[str, Any]) -> EzvizMessage:
+        """Build a record from a unified message list item."""
+        ext = message.get("ext")
+        if not isinstance(ext, dict):
+            ext = {}
+
+        try:
+            msg_time: int | None = int(message.get("time"))  # type: ignore[arg-type]
+        except (TypeError, ValueError):
+            msg_time = None
+
+        return cls(
+            msg_id=message.get("msgId"),
+            serial=message.get("deviceSerial"),
+            channel=message.get("channel"),
+            time=msg_time,
+            time_str=message.get("timeStr"),
+            sub_type=message.get("subType"),
+            title=message.get("title") or message.get("detail"),
+            pic_url=message.get("pic") or message.get("defaultPic"),
+            ext=ext,
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the record as a plain dictionary."""
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __repr__(self) -> str:
+        """Return a short representation of the message."""
+        return (
+            f"EzvizMessage(msg_id={self.msg_id!r}, serial={self.serial!r}, "
+            f"time_str={self.time_str!r}, title={self.title!r})"
+        )
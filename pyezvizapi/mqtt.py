@@ -24,6 +24,7 @@ from .constants import (
     REQUEST_HEADER,
 )
 from .exceptions import HTTPError, InvalidURL, PyEzvizError
+from .journal import EzvizEventJournal
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -35,11 +36,15 @@ class MQTTClient(threading.Thread):
         self,
         token: dict,
         timeout: int = DEFAULT_TIMEOUT,
+        journal: EzvizEventJournal | None = None,
+        session: requests.Session | None = None,
     ) -> None:
         """Initialize the client object."""
         threading.Thread.__init__(self)
-        self._session = requests.session()
-        self._session.headers.update(REQUEST_HEADER)
+        if session is None:
+            session = requests.session()
+            session.headers.update(REQUEST_HEADER)
+        self._session = session
         self._token = token or {
             "session_id": None,
             "rf_session_id": None,
@@ -55,6 +60,7 @@ class MQTTClient(threading.Thread):
         }
         self.mqtt_client = None
         self.rcv_message: dict[Any, Any] = {}
+        self._journal = journal
 
     def on_subscribe(
         self, client: Any, userdata: Any, mid: Any, granted_qos: Any
@@ -78,10 +84,18 @@ class MQTTClient(threading.Thread):
         """On MQTT message receive."""
         # pylint: disable=unused-argument
         try:
-            mqtt_message = json.loads(msg.payload)
+            self._handle_message(msg.payload)
 
-        except ValueError as err:
+        except PyEzvizError:
             self.stop()
+            raise
+
+    def _handle_message(self, payload: bytes) -> None:
+        """Decode a push message and keep it as the latest of its device."""
+        try:
+            mqtt_message = json.loads(payload)
+
+        except ValueError as err:
             raise PyEzvizError(
                 "Impossible to decode mqtt message: " + str(err)
             ) from err
@@ -97,10 +111,20 @@ class MQTTClient(threading.Thread):
             "image": mqtt_message["ext"][16] if len(mqtt_message["ext"]) > 16 else None,
         }
 
+        if self._journal:
+            self._journal.append(
+                mqtt_message["ext"][2], self.rcv_message[mqtt_message["ext"][2]]
+            )
+
         _LOGGER.debug(self.rcv_message, exc_info=True)
 
-    def _mqtt(self) -> mqtt.Client:
-        """Receive MQTT messages from ezviz server."""
+    @property
+    def topic(self) -> str:
+        """Return the push topic for the current ticket."""
+        return f"{MQTT_APP_KEY}/ticket/{self._mqtt_data['ticket']}"
+
+    def _create_mqtt_client(self) -> mqtt.Client:
+        """Create the paho client with callbacks and credentials set."""
 
         ezviz_mqtt_client = mqtt.Client(
             client_id=self._mqtt_data["mqtt_clientid"], protocol=4, transport="tcp"
@@ -110,10 +134,14 @@ class MQTTClient(threading.Thread):
         ezviz_mqtt_client.on_message = self.on_message
         ezviz_mqtt_client.username_pw_set(MQTT_APP_KEY, APP_SECRET)
 
+        return ezviz_mqtt_client
+
+    def _mqtt(self) -> mqtt.Client:
+        """Receive MQTT messages from ezviz server."""
+
+        ezviz_mqtt_client = self._create_mqtt_client()
         ezviz_mqtt_client.connect(self._mqtt_data["push_url"], 1882, 60)
-        ezviz_mqtt_client.subscribe(
-            f"{MQTT_APP_KEY}/ticket/{self._mqtt_data['ticket']}", qos=2
-        )
+        ezviz_mqtt_client.subscribe(self.topic, qos=2)
 
         ezviz_mqtt_client.loop_start()
         return ezviz_mqtt_client
@@ -215,7 +243,8 @@ class MQTTClient(threading.Thread):
 
         finally:
             self._stop_event.set()
-            self.mqtt_client.loop_stop()
+            if self.mqtt_client:
+                self.mqtt_client.loop_stop()
 
     def _start_ezviz_push(self) -> None:
         """Send start for push messages to ezviz api."""
@@ -0,0 +1,351 @@
+"""Serve push connections for many Ezviz accounts from one thread."""
+
+from __future__ import annotations
+
+import logging
+import selectors
+import socket
+import threading
+import time
+from typing import Any
+
+import paho.mqtt.client as mqtt
+import requests
+from requests.adapters import HTTPAdapter
+
+from .constants import DEFAULT_TIMEOUT, REQUEST_HEADER
+from .exceptions import PyEzvizError
+from .journal import EzvizEventJournal
+from .mqtt import MQTTClient
+
+_LOGGER = logging.getLogger(__name__)
+
+RECONNECT_DELAY = 5
+RECONNECT_DELAY_MAX = 300
+
+
+class MQTTMultiplexer(threading.Thread):
+    """Drive the MQTT connections of many accounts with a single selector.
+
+    Each account still gets its own MQTTClient (push registration, ticket,
+    received messages), but none of them start a paho loop thread or a
+    private HTTP session. Sockets are watched by one selector in this thread
+    and register/start/stop calls share one pooled requests session.
+    """
+
+    def __init__(
+        self,
+        timeout: int = DEFAULT_TIMEOUT,
+        pool_maxsize: int = 10,
+        journal: EzvizEventJournal | None = None,
+    ) -> None:
+        """Initialize the multiplexer."""
+        threading.Thread.__init__(self, daemon=True)
+        self._timeout = timeout
+        self._journal = journal
+        self._session = requests.session()
+        self._session.headers.update(REQUEST_HEADER)
+        self._session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize),
+        )
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.RLock()
+        self._stop_event = threading.Event()
+        self._wakeup_read, self._wakeup_write = socket.socketpair()
+        self._wakeup_read.setblocking(False)
+        self._selector.register(self._wakeup_read, selectors.EVENT_READ, None)
+        self._accounts: dict[str, MQTTClient] = {}
+        self._metrics: dict[str, dict[str, Any]] = {}
+
+    def _wakeup(self) -> None:
+        """Interrupt a pending select so selector changes are picked up."""
+        try:
+            self._wakeup_write.send(b"\0")
+        except BlockingIOError:
+            pass
+
+    def add_account(self, name: str, token: dict) -> MQTTClient:
+        """Register push for an account and add its connection to the loop."""
+        if token.get("username") is None:
+            raise PyEzvizError(
+                "Ezviz internal username is required. Call EzvizClient login without token."
+            )
+
+        with self._lock:
+            if name in self._accounts:
+                raise PyEzvizError(f"Account {name} is already multiplexed")
+
+        client = MQTTClient(
+            token, self._timeout, journal=self._journal, session=self._session
+        )
+        client._register_ezviz_push()  # pylint: disable=protected-access
+        client._start_ezviz_push()  # pylint: disable=protected-access
+
+        paho_client = client._create_mqtt_client()  # pylint: disable=protected-access
+        paho_client.user_data_set(name)
+        paho_client.on_connect = self._on_connect
+        paho_client.on_disconnect = self._on_disconnect
+        paho_client.on_message = self._on_message
+        paho_client.on_socket_open = self._on_socket_open
+        paho_client.on_socket_close = self._on_socket_close
+        paho_client.on_socket_register_write = self._on_socket_register_write
+        paho_client.on_socket_unregister_write = self._on_socket_unregister_write
+        client.mqtt_client = paho_client
+
+        with self._lock:
+            self._accounts[name] = client
+            self._metrics[name] = {
+                "connected": False,
+                "messages": 0,
+                "errors": 0,
+                "reconnects": 0,
+                "last_message_time": None,
+                "next_reconnect": 0.0,
+                "reconnect_delay": RECONNECT_DELAY,
+            }
+
+        push_url = client._mqtt_data["push_url"]  # pylint: disable=protected-access
+        try:
+            paho_client.connect(push_url, 1882, 60)
+
+        except OSError as err:
+            _LOGGER.warning("Account %s could not connect: %s", name, err)
+            self._schedule_reconnect(name)
+
+        return client
+
+    def remove_account(self, name: str) -> None:
+        """Stop push for an account and drop its connection."""
+        with self._lock:
+            client = self._accounts.pop(name, None)
+            self._metrics.pop(name, None)
+
+        if client is None:
+            return
+
+        try:
+            client.stop()
+        finally:
+            if client.mqtt_client:
+                client.mqtt_client.disconnect()
+                sock = client.mqtt_client.socket()
+                if sock:
+                    self._unregister(sock)
+
+    def accounts(self) -> dict[str, MQTTClient]:
+        """Return the multiplexed MQTT clients by account name."""
+        with self._lock:
+            return dict(self._accounts)
+
+    def metrics(self) -> dict[str, dict[str, Any]]:
+        """Return per-account connection and message counters."""
+        with self._lock:
+            return {
+                name: {
+                    key: value
+                    for key, value in metrics.items()
+                    if key not in ("next_reconnect", "reconnect_delay")
+                }
+                for name, metrics in self._metrics.items()
+            }
+
+    def _register(self, sock: Any, name: str, events: int) -> None:
+        """Add or change selector interest for a socket."""
+        with self._lock:
+            try:
+                self._selector.modify(sock, events, name)
+            except KeyError:
+                self._selector.register(sock, events, name)
+        self._wakeup()
+
+    def _unregister(self, sock: Any) -> None:
+        """Remove a socket from the selector."""
+        with self._lock:
+            try:
+                self._selector.unregister(sock)
+            except (KeyError, ValueError):
+                pass
+
+    def _on_socket_open(self, client: Any, userdata: Any, sock: Any) -> None:
+        """Watch a newly opened MQTT socket."""
+        # pylint: disable=unused-argument
+        self._register(sock, userdata, selectors.EVENT_READ)
+
+    def _on_socket_close(self, client: Any, userdata: Any, sock: Any) -> None:
+        """Stop watching a closed MQTT socket."""
+        # pylint: disable=unused-argument
+        self._unregister(sock)
+
+    def _on_socket_register_write(self, client: Any, userdata: Any, sock: Any) -> None:
+        """Watch for writability while paho has outgoing data."""
+        # pylint: disable=unused-argument
+        self._register(sock, userdata, selectors.EVENT_READ | selectors.EVENT_WRITE)
+
+    def _on_socket_unregister_write(
+        self, client: Any, userdata: Any, sock: Any
+    ) -> None:
+        """Stop watching for writability."""
+        # pylint: disable=unused-argument
+        self._register(sock, userdata, selectors.EVENT_READ)
+
+    def _on_connect(
+        self, client: Any, userdata: Any, flags: Any, return_code: Any
+    ) -> None:
+        """Subscribe to the account ticket topic once connected."""
+        # pylint: disable=unused-argument
+        with self._lock:
+            account = self._accounts.get(userdata)
+            metrics = self._metrics.get(userdata)
+
+        if account is None or metrics is None:
+            return
+
+        if return_code == 0:
+            _LOGGER.info("Account %s connected", userdata)
+            metrics["connected"] = True
+            metrics["reconnect_delay"] = RECONNECT_DELAY
+            client.subscribe(account.topic, qos=2)
+        else:
+            _LOGGER.info(
+                "Account %s connection error with return code %s",
+                userdata,
+                return_code,
+            )
+            metrics["errors"] += 1
+
+    def _on_disconnect(self, client: Any, userdata: Any, return_code: Any) -> None:
+        """Plan a reconnect after an unexpected disconnect."""
+        # pylint: disable=unused-argument
+        with self._lock:
+            metrics = self._metrics.get(userdata)
+
+        if metrics is None:
+            return
+
+        metrics["connected"] = False
+        if return_code != 0:
+            _LOGGER.info("Account %s disconnected (%s)", userdata, return_code)
+            self._schedule_reconnect(userdata)
+
+    def _on_message(self, client: Any, userdata: Any, msg: Any) -> None:
+        """Hand a message to the account MQTTClient and count it."""
+        with self._lock:
+            account = self._accounts.get(userdata)
+            metrics = self._metrics.get(userdata)
+
+        if account is None or metrics is None:
+            return
+
+        # Unlike MQTTClient.on_message, a bad message never stops the account
+        # and nothing is raised into paho, which would end the shared loop.
+        try:
+            account._handle_message(msg.payload)  # pylint: disable=protected-access
+
+        except Exception as err:  # pylint: disable=broad-except
+            metrics["errors"] += 1
+            _LOGGER.warning("Account %s message dropped: %r", userdata, err)
+            return
+
+        metrics["messages"] += 1
+        metrics["last_message_time"] = time.time()
+
+    def _count_error(self, name: str) -> None:
+        """Count an error in the metrics of an account."""
+        with self._lock:
+            if name in self._metrics:
+                self._metrics[name]["errors"] += 1
+
+    def _schedule_reconnect(self, name: str) -> None:
+        """Set the next reconnect time with exponential backoff."""
+        with self._lock:
+            metrics = self._metrics.get(name)
+            if metrics is None:
+                return
+            metrics["next_reconnect"] = time.monotonic() + metrics["reconnect_delay"]
+            metrics["reconnect_delay"] = min(
+                metrics["reconnect_delay"] * 2, RECONNECT_DELAY_MAX
+            )
+
+    def _housekeeping(self) -> None:
+        """Run paho keepalive handling and due reconnects for every account."""
+        now = time.monotonic()
+        for name, account in self.accounts().items():
+            paho_client = account.mqtt_client
+            with self._lock:
+                metrics = self._metrics.get(name)
+            if paho_client is None or metrics is None:
+                continue
+
+            if metrics["next_reconnect"] and now >= metrics["next_reconnect"]:
+                metrics["next_reconnect"] = 0.0
+                metrics["reconnects"] += 1
+                try:
+                    paho_client.reconnect()
+                except OSError as err:
+                    _LOGGER.warning("Account %s reconnect failed: %s", name, err)
+                    self._schedule_reconnect(name)
+                continue
+
+            try:
+                paho_client.loop_misc()
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Account %s keepalive failed", name)
+                self._count_error(name)
+
+    def run(self) -> None:
+        """Serve all account sockets until stopped."""
+        last_housekeeping = 0.0
+
+        while not self._stop_event.is_set():
+            events = self._selector.select(timeout=1)
+
+            for key, mask in events:
+                if key.data is None:
+                    try:
+                        while self._wakeup_read.recv(512):
+                            pass
+                    except BlockingIOError:
+                        pass
+                    continue
+
+                with self._lock:
+                    account = self._accounts.get(key.data)
+                if account is None or account.mqtt_client is None:
+                    self._unregister(key.fileobj)
+                    continue
+
+                paho_client = account.mqtt_client
+                return_code = mqtt.MQTT_ERR_SUCCESS
+                try:
+                    if mask & selectors.EVENT_READ:
+                        return_code = paho_client.loop_read()
+                    if (
+                        mask & selectors.EVENT_WRITE
+                        and return_code == mqtt.MQTT_ERR_SUCCESS
+                    ):
+                        return_code = paho_client.loop_write()
+
+                except Exception:  # pylint: disable=broad-except
+                    # One account must not take down the loop of all others.
+                    _LOGGER.exception("Account %s socket handling failed", key.data)
+                    return_code = mqtt.MQTT_ERR_UNKNOWN
+
+                if return_code != mqtt.MQTT_ERR_SUCCESS:
+                    self._count_error(key.data)
+
+            if time.monotonic() - last_housekeeping >= 1:
+                self._housekeeping()
+                last_housekeeping = time.monotonic()
+
+    def stop(self) -> None:
+        """Stop push for every account and end the loop."""
+        for name in list(self.accounts()):
+            try:
+                self.remove_account(name)
+            except PyEzvizError as err:
+                _LOGGER.warning("Account %s did not stop cleanly: %s", name, err)
+
+        self._stop_event.set()
+        self._wakeup()
+        self._session.close()
@@ -0,0 +1,54 @@
+"""Row output formats for the command line."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+import csv
+import json
+import sys
+from typing import IO, Any
+
+from .table import format_table
+
+OUTPUT_FORMATS = ("table", "jsonl", "csv")
+
+
+def write_rows(
+    rows: Iterable[tuple[Any, dict[str, Any]]],
+    columns: Sequence[str],
+    output_format: str = "table",
+    stream: IO[str] | None = None,
+    index_name: str = "serial",
+    header: bool = True,
+) -> None:
+    """Write (key, row) pairs as they are produced.
+
+    jsonl writes every row as one JSON object with all its fields, csv
+    writes the given columns, both flush each row so the output can be
+    piped while the rest is still being fetched. table needs all rows to
+    align the columns and prints once the iterable is exhausted. header
+    set to False leaves out the csv header, e.g. when appending rows.
+    """
+    stream = stream or sys.stdout
+
+    if output_format == "table":
+        stream.write(format_table(dict(rows), columns) + "\n")
+        return
+
+    if output_format == "jsonl":
+        for key, row in rows:
+            stream.write(json.dumps({index_name: key, **row}, default=str) + "\n")
+            stream.flush()
+        return
+
+    if output_format == "csv":
+        writer = csv.writer(stream)
+        if header:
+            writer.writerow([index_name, *columns])
+            stream.flush()
+        for key, row in rows:
+            writer.writerow([key, *(row.get(column) for column in columns)])
+            stream.flush()
+        return
+
+    raise ValueError(f"Unknown output format: {output_format}")
@@ -0,0 +1,416 @@
+"""Probe RTSP stream availability and latency."""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+from collections.abc import Iterable, Mapping
+import hashlib
+import logging
+import statistics
+import time
+from typing import Any
+
+from .rtsp_scanner import (
+    DEFAULT_RTSP_PORT,
+    MAX_HEADER_SIZE,
+    RTSPResponse,
+    parse_digest_challenge,
+    read_rtsp_response,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_STREAM_PATH = "/H.264"
+RTP_CLOCK_RATE = 90000
+
+
+class RTSPProbeResult:
+    """Availability and timing of one RTSP stream.
+
+    stage is "ok" for an available stream, otherwise the step that failed:
+    connect, describe, setup, play or stream.
+    """
+
+    __slots__ = (
+        "host",
+        "port",
+        "serial",
+        "available",
+        "stage",
+        "status",
+        "error",
+        "time_to_first_packet",
+        "packets",
+        "bytes",
+        "lost",
+        "interarrival_ms",
+        "interarrival_stdev_ms",
+        "jitter_ms",
+        "elapsed",
+    )
+
+    def __init__(self, host: str, port: int, serial: str | None = None) -> None:
+        """Initialize an unfinished result."""
+        self.host = host
+        self.port = port
+        self.serial = serial
+        self.available = False
+        self.stage: str | None = None
+        self.status: int | None = None
+        self.error: str | None = None
+        self.time_to_first_packet: float | None = None
+        self.packets = 0
+        self.bytes = 0
+        self.lost = 0
+        self.interarrival_ms: float | None = None
+        self.interarrival_stdev_ms: float | None = None
+        self.jitter_ms: float | None = None
+        self.elapsed = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the result as a plain dictionary."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        """Return a short representation."""
+        return (
+            f"RTSPProbeResult(host={self.host!r}, port={self.port}, "
+            f"available={self.available}, stage={self.stage!r}, "
+            f"time_to_first_packet={self.time_to_first_packet}, "
+            f"packets={self.packets}, jitter_ms={self.jitter_ms}, "
+            f"error={self.error!r})"
+        )
+
+
+def parse_sdp_video(sdp: str) -> tuple[str | None, int]:
+    """Return the control attribute and clock rate of the first video track."""
+    control = None
+    clock_rate = RTP_CLOCK_RATE
+    in_video = False
+    for line in sdp.splitlines():
+        if line.startswith("m="):
+            if in_video:
+                break
+            in_video = line.startswith("m=video")
+        elif in_video and line.startswith("a=control:"):
+            control = line[len("a=control:") :].strip()
+        elif in_video and line.startswith("a=rtpmap:"):
+            # a=rtpmap:96 H264/90000
+            _, _, encoding = line.partition(" ")
+            parts = encoding.split("/")
+            if len(parts) > 1 and parts[1].isdigit():
+                clock_rate = int(parts[1])
+    return control, clock_rate
+
+
+def track_url(base: str, control: str | None) -> str:
+    """Resolve the SETUP url of a track from the base url and control."""
+    if not control or control == "*":
+        return base
+    if control.startswith("rtsp://"):
+        return control
+    return f"{base.rstrip('/')}/{control}"
+
+
+class _RTSPConnection:
+    """One RTSP control connection with Basic and Digest auth."""
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        username: str | None,
+        password: str | None,
+        user_agent: str,
+        timeout: float,
+    ) -> None:
+        """Initialize the connection."""
+        self.reader = reader
+        self.writer = writer
+        self._username = username
+        self._password = password
+        self._user_agent = user_agent
+        self._timeout = timeout
+        self._challenge: dict[str, str] | None = None
+        self._basic = False
+        self._seq = 0
+
+    def _authorization(self, method: str, url: str) -> str | None:
+        """Return the Authorization header for a request, if any."""
+        if self._username is None:
+            return None
+        if self._challenge is not None:
+            realm = self._challenge.get("realm", "")
+            nonce = self._challenge.get("nonce", "")
+            ha1 = hashlib.md5(
+                f"{self._username}:{realm}:{self._password}".encode()
+            ).hexdigest()
+            ha2 = hashlib.md5(f"{method}:{url}".encode()).hexdigest()
+            response = hashlib.md5(f"{ha1}:{nonce}:{ha2}".encode()).hexdigest()
+            return (
+                f'Digest username="{self._username}", realm="{realm}", '
+                f'algorithm="MD5", nonce="{nonce}", uri="{url}", '
+                f'response="{response}"'
+            )
+        if self._basic:
+            token = base64.b64encode(f"{self._username}:{self._password}".encode())
+            return f"Basic {token.decode()}"
+        return None
+
+    def send(self, method: str, url: str, headers: dict[str, str]) -> None:
+        """Write one request."""
+        self._seq += 1
+        lines = [f"{method} {url} RTSP/1.0", f"CSeq: {self._seq}"]
+        authorization = self._authorization(method, url)
+        if authorization:
+            lines.append(f"Authorization: {authorization}")
+        lines.append(f"User-Agent: {self._user_agent}")
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode())
+
+    async def request(
+        self, method: str, url: str, headers: dict[str, str] | None = None
+    ) -> RTSPResponse:
+        """Send a request and read its response, answering one auth challenge."""
+        headers = headers or {}
+        self.send(method, url, headers)
+        await asyncio.wait_for(self.writer.drain(), self._timeout)
+        response = await asyncio.wait_for(
+            read_rtsp_response(self.reader), self._timeout
+        )
+
+        if response.status == 401 and self._username is not None:
+            already_tried = self._challenge is not None or self._basic
+            challenge = parse_digest_challenge(response)
+            if challenge is not None and challenge != self._challenge:
+                self._challenge = challenge
+            elif already_tried:
+                return response
+            else:
+                self._basic = True
+
+            self.send(method, url, headers)
+            await asyncio.wait_for(self.writer.drain(), self._timeout)
+            response = await asyncio.wait_for(
+                read_rtsp_response(self.reader), self._timeout
+            )
+
+        return response
+
+    async def read_packet(self) -> tuple[int, bytes] | RTSPResponse:
+        """Read an interleaved (channel, payload) frame or an RTSP response."""
+        first = await self.reader.readexactly(1)
+        if first != b"$":
+            return await read_rtsp_response(self.reader, first)
+
+        header = await self.reader.readexactly(3)
+        payload = await self.reader.readexactly(int.from_bytes(header[1:], "big"))
+        return header[0], payload
+
+
+class RTSPStreamProbe:
+    """Measure RTSP stream health with DESCRIBE, SETUP, PLAY and TEARDOWN.
+
+    RTP is requested interleaved over the RTSP TCP connection. For each
+    stream the probe records the time from sending PLAY to the first RTP
+    packet, the mean and standard deviation of packet inter-arrival times
+    and the RFC 3550 interarrival jitter, over duration seconds or
+    max_packets packets, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 5,
+        duration: float = 2,
+        max_packets: int = 500,
+        max_concurrency: int = 50,
+        user_agent: str = "RTSP Client",
+    ) -> None:
+        """Initialize the probe."""
+        self._timeout = timeout
+        self._duration = duration
+        self._max_packets = max_packets
+        self._max_concurrency = max_concurrency
+        self._user_agent = user_agent
+
+    async def probe(
+        self,
+        host: str,
+        port: int = DEFAULT_RTSP_PORT,
+        username: str | None = "admin",
+        password: str | None = "",
+        path: str = DEFAULT_STREAM_PATH,
+        serial: str | None = None,
+    ) -> RTSPProbeResult:
+        """Probe one stream."""
+        result = RTSPProbeResult(host, port, serial)
+        started = time.monotonic()
+        url = f"rtsp://{host}:{port}{path}"
+        base = url
+        conn: _RTSPConnection | None = None
+        session_id = None
+
+        try:
+            result.stage = "connect"
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port, limit=MAX_HEADER_SIZE),
+                self._timeout,
+            )
+            conn = _RTSPConnection(
+                reader, writer, username, password, self._user_agent, self._timeout
+            )
+
+            result.stage = "describe"
+            response = await conn.request(
+                "DESCRIBE", url, {"Accept": "application/sdp"}
+            )
+            result.status = response.status
+            if response.status != 200:
+                raise ValueError(f"DESCRIBE failed: {response.status}")
+
+            control, clock_rate = parse_sdp_video(
+                response.body.decode("utf-8", "replace")
+            )
+            base = response.header("content-base") or url
+
+            result.stage = "setup"
+            response = await conn.request(
+                "SETUP",
+                track_url(base, control),
+                {"Transport": "RTP/AVP/TCP;unicast;interleaved=0-1"},
+            )
+            result.status = response.status
+            if response.status != 200 or not response.header("session"):
+                raise ValueError(f"SETUP failed: {response.status}")
+            session_id = response.header("session", "").split(";")[0].strip()
+
+            result.stage = "play"
+            play_sent = time.monotonic()
+            response = await conn.request(
+                "PLAY", base, {"Session": session_id, "Range": "npt=0.000-"}
+            )
+            result.status = response.status
+            if response.status != 200:
+                raise ValueError(f"PLAY failed: {response.status}")
+
+            result.stage = "stream"
+            await self._measure(conn, result, play_sent, clock_rate)
+            if not result.packets:
+                raise ValueError("No RTP packets received")
+            result.available, result.stage = True, "ok"
+
+        except asyncio.TimeoutError:
+            result.error = "Timed out"
+
+        except asyncio.IncompleteReadError:
+            result.error = "Connection closed by camera"
+
+        except (OSError, ValueError) as err:
+            result.error = str(err) or err.__class__.__name__
+
+        finally:
+            if conn is not None:
+                if session_id:
+                    await self._teardown(conn, base, session_id)
+                conn.writer.close()
+
+        result.elapsed = time.monotonic() - started
+        return result
+
+    async def _measure(
+        self,
+        conn: _RTSPConnection,
+        result: RTSPProbeResult,
+        play_sent: float,
+        clock_rate: int,
+    ) -> None:
+        """Read RTP packets on channel 0 and fill in the timing fields."""
+        deadline = None
+        arrivals: list[float] = []
+        jitter = 0.0
+        previous: tuple[float, int, int] | None = None
+
+        while result.packets < self._max_packets:
+            remaining = self._timeout
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+
+            try:
+                packet = await asyncio.wait_for(conn.read_packet(), remaining)
+
+            except asyncio.TimeoutError:
+                if deadline is None:
+                    raise
+                break
+
+            if isinstance(packet, RTSPResponse) or packet[0] != 0:
+                continue
+
+            payload = packet[1]
+            if len(payload) < 12 or payload[0] >> 6 != 2:
+                continue
+
+            arrival = time.monotonic()
+            sequence = int.from_bytes(payload[2:4], "big")
+            timestamp = int.from_bytes(payload[4:8], "big")
+
+            if deadline is None:
+                result.time_to_first_packet = arrival - play_sent
+                deadline = arrival + self._duration
+
+            if previous is not None:
+                last_arrival, last_sequence, last_timestamp = previous
+                result.lost += max(((sequence - last_sequence) & 0xFFFF) - 1, 0)
+                # RFC 3550 6.4.1, in timestamp units.
+                transit = (arrival - last_arrival) * clock_rate - (
+                    (timestamp - last_timestamp) & 0xFFFFFFFF
+                )
+                jitter += (abs(transit) - jitter) / 16
+
+            previous = (arrival, sequence, timestamp)
+            arrivals.append(arrival)
+            result.packets += 1
+            result.bytes += len(payload)
+
+        if len(arrivals) > 1:
+            gaps = [(b - a) * 1000 for a, b in zip(arrivals, arrivals[1:])]
+            result.interarrival_ms = statistics.fmean(gaps)
+            result.interarrival_stdev_ms = statistics.pstdev(gaps)
+            result.jitter_ms = jitter / clock_rate * 1000
+
+    async def _teardown(
+        self, conn: _RTSPConnection, url: str, session_id: str
+    ) -> None:
+        """Send TEARDOWN without waiting for the camera to answer."""
+        try:
+            conn.send("TEARDOWN", url, {"Session": session_id})
+            await asyncio.wait_for(conn.writer.drain(), self._timeout)
+
+        except (OSError, asyncio.TimeoutError) as err:
+            _LOGGER.debug("TEARDOWN to %s failed: %s", url, err)
+
+    async def probe_many(
+        self, targets: Iterable[Mapping[str, Any]]
+    ) -> list[RTSPProbeResult]:
+        """Probe many streams concurrently, results are in target order.
+
+        Targets use the keys of rtsp_scanner.targets_from_cameras(), plus an
+        optional path (default DEFAULT_STREAM_PATH).
+        """
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def _limited(target: Mapping[str, Any]) -> RTSPProbeResult:
+            async with semaphore:
+                return await self.probe(
+                    target["host"],
+                    int(target.get("port") or DEFAULT_RTSP_PORT),
+                    target.get("username", "admin"),
+                    target.get("password", ""),
+                    target.get("path", DEFAULT_STREAM_PATH),
+                    target.get("serial"),
+                )
+
+        return list(await asyncio.gather(*(_limited(t) for t in targets)))
@@ -0,0 +1,305 @@
+"""Check RTSP credentials of many cameras concurrently."""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+from collections.abc import Iterable, Mapping
+import logging
+import re
+import time
+from typing import Any
+
+from .test_cam_rtsp import TestRTSPAuth, genmsg_describe
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_RTSP_PORT = 554
+MAX_HEADER_SIZE = 64 * 1024
+STATUS_LINE_RE = re.compile(r"RTSP/\d\.\d\s+(\d{3})\s*(.*)")
+CHALLENGE_PARAM_RE = re.compile(r'(\w+)\s*=\s*(?:"([^"]*)"|([^,\s]*))')
+
+
+class RTSPResponse:
+    """Status, headers and body of one RTSP response."""
+
+    __slots__ = ("status", "reason", "headers", "body")
+
+    def __init__(
+        self, status: int, reason: str, headers: dict[str, list[str]], body: bytes
+    ) -> None:
+        """Initialize the response."""
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+    def header(self, name: str, default: str | None = None) -> str | None:
+        """Return the first value of a header, names are case insensitive."""
+        values = self.headers.get(name.lower())
+        return values[0] if values else default
+
+    def __repr__(self) -> str:
+        """Return a short representation."""
+        return f"RTSPResponse(status={self.status}, reason={self.reason!r})"
+
+
+def parse_rtsp_head(head: bytes) -> RTSPResponse:
+    """Parse the status line and headers of an RTSP response."""
+    lines = head.decode("utf-8", "replace").split("\r\n")
+    match = STATUS_LINE_RE.match(lines[0])
+    if match is None:
+        raise ValueError(f"Invalid RTSP status line: {lines[0]!r}")
+
+    headers: dict[str, list[str]] = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(":")
+        if sep:
+            headers.setdefault(name.strip().lower(), []).append(value.strip())
+
+    return RTSPResponse(int(match.group(1)), match.group(2).strip(), headers, b"")
+
+
+async def read_rtsp_response(
+    reader: asyncio.StreamReader, prefix: bytes = b""
+) -> RTSPResponse:
+    """Read one complete RTSP response, including its body.
+
+    prefix holds bytes of the response already read by the caller.
+    """
+    try:
+        head = prefix + await reader.readuntil(b"\r\n\r\n")
+
+    except asyncio.LimitOverrunError as err:
+        raise ValueError("RTSP response headers too large") from err
+
+    if len(head) > MAX_HEADER_SIZE:
+        raise ValueError("RTSP response headers too large")
+
+    response = parse_rtsp_head(head[:-4])
+    length = int(response.header("content-length", "0") or 0)
+    if length:
+        response.body = await reader.readexactly(length)
+    return response
+
+
+def parse_digest_challenge(response: RTSPResponse) -> dict[str, str] | None:
+    """Return the parameters of the Digest challenge, None if not offered."""
+    for value in response.headers.get("www-authenticate", []):
+        scheme, _, params = value.partition(" ")
+        if scheme.lower() == "digest":
+            return {
+                key.lower(): quoted if quoted or not bare else bare
+                for key, quoted, bare in CHALLENGE_PARAM_RE.findall(params)
+            }
+    return None
+
+
+class RTSPScanResult:
+    """Outcome of a credential check against one camera."""
+
+    __slots__ = (
+        "host",
+        "port",
+        "serial",
+        "valid",
+        "auth",
+        "status",
+        "error",
+        "elapsed",
+    )
+
+    def __init__(self, host: str, port: int, serial: str | None = None) -> None:
+        """Initialize an unfinished result."""
+        self.host = host
+        self.port = port
+        self.serial = serial
+        self.valid: bool | None = None
+        self.auth: str | None = None
+        self.status: int | None = None
+        self.error: str | None = None
+        self.elapsed = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the result as a plain dictionary."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        """Return a short representation."""
+        return (
+            f"RTSPScanResult(host={self.host!r}, port={self.port}, "
+            f"valid={self.valid}, auth={self.auth!r}, status={self.status}, "
+            f"error={self.error!r})"
+        )
+
+
+class RTSPCredentialScanner:
+    """Validate RTSP credentials on many cameras with asyncio.
+
+    Each target gets a DESCRIBE with Basic auth, then with Digest auth if
+    the camera asks for it, the same sequence as TestRTSPAuth. Results are
+    returned per camera; valid is None when the check could not complete,
+    e.g. on a timeout, with the reason in error.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 5,
+        max_concurrency: int = 100,
+        user_agent: str = "RTSP Client",
+    ) -> None:
+        """Initialize the scanner."""
+        self._timeout = timeout
+        self._max_concurrency = max_concurrency
+        self._user_agent = user_agent
+
+    async def _connect(
+        self, host: str, port: int
+    ) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """Open a connection with the connect timeout."""
+        return await asyncio.wait_for(
+            asyncio.open_connection(host, port, limit=MAX_HEADER_SIZE), self._timeout
+        )
+
+    async def _describe(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        url: str,
+        seq: int,
+        authorization: str,
+    ) -> RTSPResponse:
+        """Send a DESCRIBE request and read its response."""
+        request = genmsg_describe(url, seq, self._user_agent, authorization)
+        writer.write(request.encode())
+        await asyncio.wait_for(writer.drain(), self._timeout)
+        return await asyncio.wait_for(read_rtsp_response(reader), self._timeout)
+
+    async def check(
+        self,
+        host: str,
+        port: int = DEFAULT_RTSP_PORT,
+        username: str = "admin",
+        password: str = "",
+        test_uri: str = "",
+        serial: str | None = None,
+    ) -> RTSPScanResult:
+        """Check one set of credentials against one camera."""
+        result = RTSPScanResult(host, port, serial)
+        started = time.monotonic()
+        url = f"rtsp://{host}{test_uri}"
+        writer: asyncio.StreamWriter | None = None
+
+        try:
+            reader, writer = await self._connect(host, port)
+
+            basic = base64.b64encode(f"{username}:{password}".encode()).decode()
+            response = await self._describe(reader, writer, url, 1, f"Basic {basic}")
+            result.status = response.status
+
+            if response.status == 200:
+                result.valid, result.auth = True, "basic"
+
+            elif response.status == 401:
+                challenge = parse_digest_challenge(response)
+                if challenge is None:
+                    result.valid, result.auth = False, "basic"
+
+                else:
+                    digest = TestRTSPAuth(
+                        host, username, password, test_uri
+                    ).generate_auth_string(
+                        challenge.get("realm", "").encode(),
+                        "DESCRIBE",
+                        url,
+                        challenge.get("nonce", "").encode(),
+                    )
+                    try:
+                        response = await self._describe(reader, writer, url, 2, digest)
+
+                    except (asyncio.IncompleteReadError, ConnectionError):
+                        # Some cameras close the connection after a 401.
+                        writer.close()
+                        reader, writer = await self._connect(host, port)
+                        response = await self._describe(reader, writer, url, 2, digest)
+
+                    result.status = response.status
+                    result.auth = "digest"
+                    if response.status in (200, 401):
+                        result.valid = response.status == 200
+                    else:
+                        result.error = f"Unexpected response: {response.status}"
+
+            else:
+                result.error = f"Unexpected response: {response.status}"
+
+        except asyncio.TimeoutError:
+            result.error = "Timed out"
+
+        except asyncio.IncompleteReadError:
+            result.error = "Connection closed by camera"
+
+        except (OSError, ValueError) as err:
+            result.error = str(err) or err.__class__.__name__
+
+        finally:
+            if writer is not None:
+                writer.close()
+
+        result.elapsed = time.monotonic() - started
+        return result
+
+    async def scan(self, targets: Iterable[Mapping[str, Any]]) -> list[RTSPScanResult]:
+        """Check many targets concurrently, results are in target order.
+
+        Each target is a mapping with host and optionally port, username,
+        password, test_uri and serial, see targets_from_cameras().
+        """
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def _limited(target: Mapping[str, Any]) -> RTSPScanResult:
+            async with semaphore:
+                return await self.check(
+                    target["host"],
+                    int(target.get("port") or DEFAULT_RTSP_PORT),
+                    target.get("username", "admin"),
+                    target.get("password", ""),
+                    target.get("test_uri", ""),
+                    target.get("serial"),
+                )
+
+        results = list(await asyncio.gather(*(_limited(t) for t in targets)))
+        _LOGGER.debug(
+            "RTSP scan done: %d valid of %d",
+            sum(1 for result in results if result.valid),
+            len(results),
+        )
+        return results
+
+
+def targets_from_cameras(
+    cameras: Iterable[Mapping[str, Any]],
+    password: str | Mapping[str, str],
+    username: str = "admin",
+) -> list[dict[str, Any]]:
+    """Build scan targets from camera status dicts, e.g. load_cameras().values().
+
+    password is either one password for all cameras or a mapping from
+    serial to password. Cameras without a local IP are skipped.
+    """
+    targets = []
+    for camera in cameras:
+        if not camera.get("local_ip") or camera["local_ip"] == "0.0.0.0":
+            continue
+        targets.append(
+            {
+                "host": camera["local_ip"],
+                "port": int(camera.get("local_rtsp_port") or DEFAULT_RTSP_PORT),
+                "username": username,
+                "password": password
+                if isinstance(password, str)
+                else password.get(camera.get("serial"), ""),
+                "serial": camera.get("serial"),
+            }
+        )
+    return targets
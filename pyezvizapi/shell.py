@@ -0,0 +1,194 @@
+"""Interactive shell keeping one logged in client and its devices."""
+
+from __future__ import annotations
+
+import argparse
+import cmd
+import math
+import shlex
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .client import EzvizClient
+
+
+class EzvizShell(cmd.Cmd):
+    """Run CLI commands against one session and cached device details.
+
+    Device details are loaded once and reused by every camera and light
+    command until "refresh" is typed, so repeated moves or switch toggles
+    only cost the request that performs them.
+    """
+
+    intro = "pyezvizapi shell, type help or ? to list commands."
+    prompt = "ezviz> "
+
+    def __init__(self, client: EzvizClient, args: argparse.Namespace) -> None:
+        """Initialize the shell."""
+        super().__init__()
+        self._client = client
+        self._args = args
+        self._devices: dict[str, Any] | None = None
+        self._status: dict[str, Any] | None = None
+        # Keep the page list until refresh, status rows are built from it too.
+        client.device_cache_ttl = math.inf
+
+    @property
+    def devices(self) -> dict[str, Any]:
+        """Return device details per serial, loaded on first use."""
+        if self._devices is None:
+            self._devices = self._client.get_device_infos()
+        return self._devices
+
+    def _run(self, argv: list[str]) -> None:
+        """Parse arguments like the command line does and run the command."""
+        # pylint: disable=import-outside-toplevel
+        from .__main__ import HANDLERS, build_parser
+
+        base = ["-u", self._args.username, "-p", self._args.password]
+        base += ["--format", self._args.format]
+        if self._args.pandas:
+            base.append("--pandas")
+
+        try:
+            args = build_parser().parse_args(base + argv)
+
+        except SystemExit:
+            # argparse already printed the usage error.
+            return
+
+        try:
+            if args.action in ("camera", "light"):
+                HANDLERS[args.action](self._client, args, devices=self.devices)
+            else:
+                HANDLERS[args.action](self._client, args)
+
+        except Exception as exp:  # pylint: disable=broad-except
+            print(exp)
+
+    def _status_rows(self) -> dict[str, Any]:
+        """Return camera and light bulb status rows, loaded on first use."""
+        if self._status is None:
+            self._client.load_devices()
+            self._status = {
+                # pylint: disable=protected-access
+                "cameras": dict(self._client._cameras),
+                "light_bulbs": dict(self._client._light_bulbs),
+            }
+        return self._status
+
+    def _complete_serial(self, text: str) -> list[str]:
+        """Complete a serial from the cached devices."""
+        return [serial for serial in self.devices if serial.startswith(text)]
+
+    def onecmd(self, line: str) -> bool:
+        """Run one command, reporting lines that can not be split."""
+        try:
+            return super().onecmd(line)
+
+        except ValueError as err:
+            print(err)
+            return False
+
+    def emptyline(self) -> bool:
+        """Do nothing on an empty line instead of repeating the last command."""
+        return False
+
+    def default(self, line: str) -> None:
+        """Report unknown commands."""
+        print(f"Unknown command: {line.split()[0]}, type help for a list")
+
+    def do_refresh(self, arg: str) -> None:
+        """Reload device details and status from the API: refresh"""
+        self._client.invalidate_device_cache()
+        self._devices = None
+        self._status = None
+        print(f"{len(self.devices)} devices loaded")
+
+    def do_devices(self, arg: str) -> None:
+        """Show all cameras: devices [status|device|switch|connection]"""
+        # pylint: disable=import-outside-toplevel
+        from .__main__ import CAMERA_STATUS_COLUMNS, print_rows
+
+        words = shlex.split(arg) or ["status"]
+        if words == ["status"]:
+            rows = self._status_rows()["cameras"]
+            print_rows(self._args, rows.items(), CAMERA_STATUS_COLUMNS)
+            return
+        self._run(["devices", *words])
+
+    def do_devices_light(self, arg: str) -> None:
+        """Show all light bulbs: devices_light [status]"""
+        # pylint: disable=import-outside-toplevel
+        from .__main__ import LIGHT_STATUS_COLUMNS, print_rows
+
+        words = shlex.split(arg) or ["status"]
+        if words == ["status"]:
+            rows = self._status_rows()["light_bulbs"]
+            print_rows(self._args, rows.items(), LIGHT_STATUS_COLUMNS)
+            return
+        self._run(["devices_light", *words])
+
+    def do_camera(self, arg: str) -> None:
+        """Run a camera action: camera SERIAL ACTION [ARGS]
+
+        Besides the command line options, "move DIRECTION [SPEED]" and
+        "switch SWITCH [0|1]" are accepted, e.g. "camera C123 move left".
+        """
+        words = shlex.split(arg)
+        if len(words) < 2:
+            print("Usage: camera SERIAL ACTION [ARGS]")
+            return
+
+        serial, action, rest = words[0], words[1], words[2:]
+        options = {
+            "move": ("--direction", "--speed"),
+            "switch": ("--switch", "--enable"),
+        }
+        if action in options and rest and not rest[0].startswith("-"):
+            rest = [
+                word
+                for option, value in zip(options[action], rest)
+                for word in (option, value)
+            ]
+        self._run(["camera", "--serial", serial, action, *rest])
+
+    def complete_camera(self, text: str, line: str, *_: Any) -> list[str]:
+        """Complete camera serials."""
+        return self._complete_serial(text) if len(line.split()) <= 2 else []
+
+    def do_light(self, arg: str) -> None:
+        """Run a light bulb action: light SERIAL toggle|status"""
+        words = shlex.split(arg)
+        if len(words) != 2:
+            print("Usage: light SERIAL toggle|status")
+            return
+        self._run(["light", "--serial", words[0], words[1]])
+
+    def complete_light(self, text: str, line: str, *_: Any) -> list[str]:
+        """Complete light bulb serials."""
+        return self._complete_serial(text) if len(line.split()) <= 2 else []
+
+    def do_home_defence_mode(self, arg: str) -> None:
+        """Set the home defence mode: home_defence_mode HOME_MODE|AWAY_MODE"""
+        words = shlex.split(arg)
+        if len(words) != 1:
+            print("Usage: home_defence_mode HOME_MODE|AWAY_MODE")
+            return
+        self._run(["home_defence_mode", "--mode", words[0]])
+
+    def do_quit(self, arg: str) -> bool:
+        """Leave the shell: quit"""
+        return True
+
+    do_exit = do_quit
+
+    def do_EOF(self, arg: str) -> bool:  # pylint: disable=invalid-name
+        """Leave the shell on Ctrl-D."""
+        print()
+        return True
+
+
+def run_shell(client: EzvizClient, args: argparse.Namespace) -> None:
+    """Run the shell command of the CLI."""
+    EzvizShell(client, args).cmdloop()
@@ -0,0 +1,41 @@
+"""Plain text tables for the command line."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+
+def _cell(value: Any) -> str:
+    """Return the text of a table cell."""
+    return "" if value is None else str(value)
+
+
+def format_table(
+    rows: Mapping[Any, Mapping[str, Any]], columns: Sequence[str]
+) -> str:
+    """Format rows keyed by index as an aligned text table.
+
+    The layout follows what pandas prints for a DataFrame built with
+    DataFrame.from_dict(rows, orient="index", columns=columns): the index
+    on the left, one right aligned column per key.
+    """
+    index = [_cell(key) for key in rows]
+    cells = [[_cell(row.get(column)) for column in columns] for row in rows.values()]
+
+    index_width = max((len(value) for value in index), default=0)
+    widths = [
+        max([len(column)] + [len(row[pos]) for row in cells])
+        for pos, column in enumerate(columns)
+    ]
+
+    lines = [
+        " " * index_width
+        + "".join(f"  {column:>{width}}" for column, width in zip(columns, widths))
+    ]
+    for key, row in zip(index, cells):
+        lines.append(
+            f"{key:<{index_width}}"
+            + "".join(f"  {value:>{width}}" for value, width in zip(row, widths))
+        )
+    return "\n".join(lines)
@@ -47,7 +47,7 @@ class TestRTSPAuth:
             f"{self._rtsp_details['defaultPassword']}".encode()
         ).hexdigest()
         m_2 = hashlib.md5(f"{method}:{uri}".encode()).hexdigest()
-        response = hashlib.md5(f"{m_1}:{nonce}:{m_2}".encode()).hexdigest()
+        response = hashlib.md5(f"{m_1}:{nonce.decode()}:{m_2}".encode()).hexdigest()
 
         map_return_info = (
             f"Digest "
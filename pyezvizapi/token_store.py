@@ -0,0 +1,130 @@
+"""On-disk cache for Ezviz login tokens."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+import hashlib
+import json
+import logging
+import os
+from typing import Any
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover, Windows
+    fcntl = None  # type: ignore[assignment]
+
+_LOGGER = logging.getLogger(__name__)
+
+TOKEN_KEYS = ("session_id", "rf_session_id", "username", "api_url", "service_urls")
+
+
+def store_key(account: str, region: str) -> str:
+    """Return the key of an account's token, per API region."""
+    return f"{account}@{region}"
+
+
+def password_check(account: str, password_hash: str) -> str:
+    """Return a salted digest telling whether the password has changed.
+
+    password_hash is the md5 the client sends to the API, the digest
+    cannot be used to log in.
+    """
+    return hashlib.sha256(f"{account}:{password_hash}".encode()).hexdigest()
+
+
+def default_token_path() -> str:
+    """Return the default token file, below the user cache directory."""
+    cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_dir, "pyezvizapi", "tokens.json")
+
+
+class EzvizTokenStore:
+    """Keep login tokens per account in a JSON file.
+
+    The file is only readable by its owner and every read and write holds
+    a lock on a side file, so concurrent CLI invocations see whole tokens.
+    Passwords are never stored, only a digest to tell that a different
+    password was given, see password_check().
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        """Initialize the store."""
+        self.path = path or default_token_path()
+
+    @contextmanager
+    def _locked(self, exclusive: bool) -> Iterator[None]:
+        """Hold the lock file while reading or writing the tokens."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        lock_fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+
+        finally:
+            os.close(lock_fd)
+
+    def _read(self) -> dict[str, Any]:
+        """Return all stored tokens, empty if the file is missing or broken."""
+        try:
+            with open(self.path, encoding="utf-8") as token_file:
+                data = json.load(token_file)
+
+        except FileNotFoundError:
+            return {}
+
+        except (OSError, ValueError) as err:
+            _LOGGER.warning("Ignoring unreadable token file %s: %s", self.path, err)
+            return {}
+
+        return data if isinstance(data, dict) else {}
+
+    def _write(self, data: dict[str, Any]) -> None:
+        """Replace the token file atomically, readable by the owner only."""
+        tmp_path = f"{self.path}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as token_file:
+            json.dump(data, token_file)
+            token_file.flush()
+            os.fsync(token_file.fileno())
+        os.replace(tmp_path, self.path)
+
+    def load(
+        self, account: str, check: str | None = None
+    ) -> dict[str, Any] | None:
+        """Return the stored token of an account, None if there is none.
+
+        With a check from password_check(), a token saved with another
+        password, or without one, is not returned.
+        """
+        with self._locked(exclusive=False):
+            entry = self._read().get(account)
+
+        if not entry or not entry.get("session_id"):
+            return None
+        if check is not None and entry.get("password_check") != check:
+            return None
+        return {key: entry.get(key) for key in TOKEN_KEYS}
+
+    def save(
+        self, account: str, token: dict[str, Any], check: str | None = None
+    ) -> None:
+        """Store the token of an account, with an optional password check."""
+        with self._locked(exclusive=True):
+            data = self._read()
+            data[account] = {key: token.get(key) for key in TOKEN_KEYS}
+            if check is not None:
+                data[account]["password_check"] = check
+            self._write(data)
+
+    def delete(self, account: str) -> None:
+        """Forget the token of an account."""
+        with self._locked(exclusive=True):
+            data = self._read()
+            if data.pop(account, None) is not None:
+                self._write(data)
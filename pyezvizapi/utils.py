@@ -2,17 +2,18 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterable, Iterator
 from hashlib import md5
 import json
 import logging
-from typing import Any
-
-from Crypto.Cipher import AES
+from typing import Any, BinaryIO
 
 from .exceptions import PyEzvizError
 
 _LOGGER = logging.getLogger(__name__)
 
+AES_BLOCK_SIZE = 16
+
 
 def convert_to_dict(data: Any) -> Any:
     """Recursively convert a string representation of a dictionary to a dictionary."""
@@ -66,6 +67,61 @@ def fetch_nested_value(data: Any, keys: list, default_value: Any = None) -> Any:
         return default_value
 
 
+class ImageDecryptor:
+    """Decrypt images protected with one camera password.
+
+    The AES key, IV and expected header hash are derived once. Each call
+    uses a fresh cipher, so one instance can be shared between threads.
+    Nothing is cached at module level, keep an instance for as long as the
+    password itself should be kept.
+    """
+
+    def __init__(self, password: str) -> None:
+        """Derive the key material for the password."""
+        self.password = password
+        self.key = str.encode(password.ljust(16, "\u0000")[:16])
+        self.iv_code = bytes([48, 49, 50, 51, 52, 53, 54, 55, 0, 0, 0, 0, 0, 0, 0, 0])
+        self.password_hash = str.encode(return_password_hash(password))
+        # Imported on first use so plain API users do not load pycryptodome.
+        from Crypto.Cipher import AES  # pylint: disable=import-outside-toplevel
+
+        self._aes = AES
+
+    def new_cipher(self) -> Any:
+        """Return a new AES-CBC cipher for one image."""
+        return self._aes.new(self.key, self._aes.MODE_CBC, self.iv_code)
+
+    def decrypt(self, input_data: bytes) -> bytes:
+        """Decrypt one image, see decrypt_image."""
+        if len(input_data) < 48:
+            raise PyEzvizError("Invalid image data")
+
+        # check header
+        if input_data[:16] != b"hikencodepicture":
+            _LOGGER.debug("Image header doesn't contain 'hikencodepicture'")
+            return input_data
+
+        if input_data[16:48] != self.password_hash:
+            raise PyEzvizError("Invalid password")
+
+        # Decrypt straight from a view of the input into one preallocated buffer.
+        with memoryview(input_data) as view, view[48:] as encrypted:
+            if not encrypted or len(encrypted) % AES_BLOCK_SIZE:
+                raise PyEzvizError("Invalid image data")
+
+            output_data = bytearray(len(encrypted))
+            self.new_cipher().decrypt(encrypted, output=output_data)
+
+        padding_length = output_data[-1]
+        del output_data[len(output_data) - padding_length :]
+        return bytes(output_data)
+
+    def decrypt_many(self, images: Iterable[bytes]) -> Iterator[bytes]:
+        """Decrypt many images lazily, in order."""
+        for image in images:
+            yield self.decrypt(image)
+
+
 def decrypt_image(input_data: bytes, password: str) -> bytes:
     """Decrypts image data with provided password.
 
@@ -80,38 +136,102 @@ def decrypt_image(input_data: bytes, password: str) -> bytes:
         bytes: Decrypted image data
 
     """
+    return ImageDecryptor(password).decrypt(input_data)
+
+
+def decrypt_image_stream(
+    input_stream: BinaryIO,
+    password: str,
+    output_stream: BinaryIO,
+    chunk_size: int = 1024 * 1024,
+) -> int:
+    """Decrypt image data from a file-like object into another one.
+
+    Args:
+        input_stream (BinaryIO): Readable encrypted image data
+        password (string): Verification code
+        output_stream (BinaryIO): Writable destination
+        chunk_size (int): Bytes read per step
+
+    Raises:
+        PyEzvizError
+
+    Returns:
+        int: Number of bytes written
+
+    """
+    decryptor = ImageStreamDecryptor(password)
+    written = 0
+    for chunk in iter(lambda: input_stream.read(chunk_size), b""):
+        written += output_stream.write(decryptor.update(chunk))
+    written += output_stream.write(decryptor.finalize())
+    return written
+
+
+class ImageStreamDecryptor:
+    """Decrypt image data incrementally, chunk by chunk.
+
+    Feed encrypted chunks to update() and write whatever it returns, then
+    write the result of finalize(). Only the 48 byte header and the last
+    cipher block are held back, so large images never need to be buffered
+    whole. Data without the 'hikencodepicture' header is passed through.
+    """
 
-    if len(input_data) < 48:
-        raise PyEzvizError("Invalid image data")
-
-    # check header
-    if input_data[:16] != b"hikencodepicture":
-        _LOGGER.debug("Image header doesn't contain 'hikencodepicture'")
-        return input_data
-
-    file_hash = input_data[16:48]
-    passwd_hash = md5(str.encode(md5(str.encode(password)).hexdigest())).hexdigest()
-    if file_hash != str.encode(passwd_hash):
-        raise PyEzvizError("Invalid password")
-
-    key = str.encode(password.ljust(16, "\u0000")[:16])
-    iv_code = bytes([48, 49, 50, 51, 52, 53, 54, 55, 0, 0, 0, 0, 0, 0, 0, 0])
-    cipher = AES.new(key, AES.MODE_CBC, iv_code)
-
-    next_chunk = b""
-    output_data = b""
-    finished = False
-    i = 48  # offset hikencodepicture + hash
-    chunk_size = 1024 * AES.block_size
-    while not finished:
-        chunk, next_chunk = next_chunk, cipher.decrypt(input_data[i : i + chunk_size])
-        if len(next_chunk) == 0:
-            padding_length = chunk[-1]
-            chunk = chunk[:-padding_length]
-            finished = True
-        output_data += chunk
-        i += chunk_size
-    return output_data
+    def __init__(self, password: str) -> None:
+        """Initialize the decryptor."""
+        self._decryptor = ImageDecryptor(password)
+        self._cipher: Any = None
+        self._passthrough = False
+        self._pending = bytearray()
+
+    def update(self, chunk: bytes) -> bytes:
+        """Consume a chunk of encrypted data and return decrypted output."""
+        if self._passthrough:
+            return bytes(chunk)
+
+        self._pending += chunk
+
+        if self._cipher is None:
+            if len(self._pending) < 48:
+                return b""
+
+            if self._pending[:16] != b"hikencodepicture":
+                _LOGGER.debug("Image header doesn't contain 'hikencodepicture'")
+                self._passthrough = True
+                output = bytes(self._pending)
+                self._pending.clear()
+                return output
+
+            if self._pending[16:48] != self._decryptor.password_hash:
+                raise PyEzvizError("Invalid password")
+
+            self._cipher = self._decryptor.new_cipher()
+            del self._pending[:48]
+
+        # Keep the last block back, it holds the padding.
+        ready = (len(self._pending) - 1) // AES_BLOCK_SIZE * AES_BLOCK_SIZE
+        if ready <= 0:
+            return b""
+
+        with memoryview(self._pending) as pending:
+            output = self._cipher.decrypt(pending[:ready])
+        del self._pending[:ready]
+        return output
+
+    def finalize(self) -> bytes:
+        """Return the remaining decrypted data with padding removed."""
+        if self._passthrough:
+            return b""
+
+        if self._cipher is None:
+            raise PyEzvizError("Invalid image data")
+
+        if not self._pending or len(self._pending) % AES_BLOCK_SIZE:
+            raise PyEzvizError("Invalid image data")
+
+        output = self._cipher.decrypt(self._pending)
+        self._pending.clear()
+        return output[: -output[-1]]
 
 
 def return_password_hash(password: str) -> str:
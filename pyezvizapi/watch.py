@@ -0,0 +1,189 @@
+"""Poll camera status and print what changed."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+import datetime
+import json
+import sys
+import time
+from typing import IO, TYPE_CHECKING, Any
+
+from .output import write_rows
+
+if TYPE_CHECKING:
+    from .client import EzvizClient
+    from .mqtt import MQTTClient
+
+# Pagelist sections read by EzvizCamera.status(), the rest is not fetched.
+WATCH_SECTIONS = "CONNECTION,STATUS,SWITCH,TIME_PLAN,WIFI"
+
+# Alarm columns filled from MQTT push messages instead of the alarm list.
+MQTT_ALARM_COLUMNS = ["Motion_Trigger", "last_alarm_time", "last_alarm_type_code"]
+
+
+class StatusWatcher:
+    """Poll camera status every interval seconds and print only changes.
+
+    The first cycle prints every row, later cycles print the fields that
+    changed since the previous one and how long the fetch took. With an
+    MQTTClient the alarm columns come from push messages and the alarm
+    list is not requested for every camera.
+    """
+
+    def __init__(
+        self,
+        client: EzvizClient,
+        columns: Sequence[str],
+        interval: float,
+        output_format: str = "table",
+        stream: IO[str] | None = None,
+        mqtt: MQTTClient | None = None,
+    ) -> None:
+        """Initialize the watcher."""
+        self._client = client
+        self._mqtt = mqtt
+        self._columns = list(columns)
+        if mqtt is not None:
+            self._columns += [
+                column for column in MQTT_ALARM_COLUMNS if column not in columns
+            ]
+        self._interval = interval
+        self._format = output_format
+        self._stream = stream or sys.stdout
+        self._rows: dict[str, dict[str, Any]] = {}
+
+    def _mqtt_alarm(self, serial: str) -> dict[str, Any]:
+        """Return alarm columns from the latest push message of a camera."""
+        message = self._mqtt.rcv_message.get(serial) if self._mqtt else None
+        if not message:
+            return {"Motion_Trigger": False}
+
+        try:
+            alarm_time = datetime.datetime.strptime(
+                message["time"], "%Y-%m-%d %H:%M:%S"
+            )
+            motion = datetime.datetime.now() - alarm_time < datetime.timedelta(
+                seconds=60
+            )
+
+        except (TypeError, ValueError):
+            motion = False
+
+        return {
+            "Motion_Trigger": motion,
+            "last_alarm_time": message["time"],
+            "last_alarm_type_code": message["alert type"],
+        }
+
+    def fetch(self) -> tuple[dict[str, dict[str, Any]], float]:
+        """Return the watched columns per serial and the fetch time."""
+        start = time.perf_counter()
+        rows = {}
+        for serial, status in self._client.iter_cameras(
+            sections=WATCH_SECTIONS, refresh_alarm=self._mqtt is None
+        ):
+            if self._mqtt is not None:
+                status = {**status, **self._mqtt_alarm(serial)}
+            rows[serial] = {column: status.get(column) for column in self._columns}
+
+        return rows, time.perf_counter() - start
+
+    @staticmethod
+    def diff(
+        old: dict[str, dict[str, Any]], new: dict[str, dict[str, Any]]
+    ) -> dict[str, dict[str, Any] | None]:
+        """Return the changed fields per serial, None for removed devices."""
+        changes: dict[str, dict[str, Any] | None] = {
+            serial: None for serial in old if serial not in new
+        }
+        for serial, row in new.items():
+            previous = old.get(serial, {})
+            changed = {
+                column: value
+                for column, value in row.items()
+                if serial not in old or previous.get(column) != value
+            }
+            if changed:
+                changes[serial] = changed
+        return changes
+
+    def _write(self, text: str) -> None:
+        """Write and flush one line."""
+        self._stream.write(text + "\n")
+        self._stream.flush()
+
+    def _render_changes(
+        self, old: dict[str, dict[str, Any]], changes: dict[str, Any]
+    ) -> None:
+        """Print changed fields of the cycle."""
+        stamp = datetime.datetime.now().strftime("%H:%M:%S")
+
+        if self._format == "jsonl":
+            for serial, changed in changes.items():
+                row = {"serial": serial, "time": stamp, "removed": changed is None}
+                self._write(json.dumps({**row, **(changed or {})}, default=str))
+            return
+
+        if self._format == "csv":
+            write_rows(
+                (
+                    (serial, self._rows[serial])
+                    for serial in changes
+                    if serial in self._rows
+                ),
+                self._columns,
+                "csv",
+                self._stream,
+                header=False,
+            )
+            return
+
+        for serial, changed in changes.items():
+            if changed is None:
+                self._write(f"{stamp} {serial} removed")
+            elif serial not in old:
+                self._write(f"{stamp} {serial} added")
+                for column, value in changed.items():
+                    self._write(f"{stamp} {serial} {column}: {value}")
+            else:
+                for column, value in changed.items():
+                    previous = old[serial].get(column)
+                    self._write(f"{stamp} {serial} {column}: {previous} -> {value}")
+
+    def cycle(self, number: int) -> None:
+        """Fetch once and print the rows or what changed."""
+        rows, elapsed = self.fetch()
+        old, self._rows = self._rows, rows
+
+        if number == 0:
+            write_rows(rows.items(), self._columns, self._format, self._stream)
+            changed = len(rows)
+        else:
+            changes = self.diff(old, rows)
+            self._render_changes(old, changes)
+            changed = len(changes)
+
+        summary = (
+            f"cycle {number}: {len(rows)} cameras fetched in {elapsed:.2f}s, "
+            f"{changed} changed"
+        )
+        if self._format == "table":
+            self._write(summary)
+        else:
+            # Keep machine readable output clean.
+            sys.stderr.write(summary + "\n")
+
+    def run(self, cycles: int | None = None) -> None:
+        """Poll until interrupted, or for the given number of cycles."""
+        number = 0
+        try:
+            while cycles is None or number < cycles:
+                started = time.monotonic()
+                self.cycle(number)
+                number += 1
+                if cycles is None or number < cycles:
+                    time.sleep(max(0, self._interval - (time.monotonic() - started)))
+
+        except KeyboardInterrupt:
+            pass
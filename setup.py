@@ -12,18 +12,19 @@ setuptools.setup(
     description='Pilot your Ezviz cameras',
     long_description="Pilot your Ezviz cameras with this module. Please view readme on github",
     url='https://github.com/RenierM26/pyEzvizApi/',
-    packages=setuptools.find_packages(),
+    packages=setuptools.find_packages(exclude=["benchmarks", "benchmarks.*"]),
     setup_requires=[
         'requests',
         'setuptools'
     ],
     install_requires=[
         'requests',
-        'pandas',
         'paho-mqtt',
-        'xmltodict',
         'pycryptodome'
     ],
+    extras_require={
+        'pandas': ['pandas'],
+    },
     entry_points={
     'console_scripts': ['pyezvizapi = pyezvizapi.__main__:main']
     },